@@ -2,6 +2,7 @@ import streamlit as st
 import requests
 from urllib.parse import urlparse
 import os
+import json
 
 
 # API endpoint (adjust if needed)
@@ -375,58 +376,47 @@ elif st.session_state.step == 2:
                         projects = []
                         success_count = 0
                         
+                        urls = []
                         for url in repos.split("\n"):
                             url = url.strip()
                             if not url:
                                 continue
                             
                             # Get repository name
-                            repo_name = get_repo_name(url)
-                            if not repo_name:
+                            if not get_repo_name(url):
                                 st.error(f"Invalid GitHub URL: {url}")
                                 continue
-                            
-                            # Fetch README content
-                            readme_response = call_api("/get_readme", params={"url": url})
-                            if not readme_response:
-                                continue
-                            
-                            readme_data = readme_response.json()
-                            if "error" in readme_data:
-                                st.error(f"Failed to fetch README for {url}: {readme_data['error']}")
-                                continue
-                            
-                            readme_content = readme_data.get("content", "")
-                            
-                            # Generate description
-                            desc_response = call_api("/generate_description", "post", {
-                                "readme_content": readme_content,
-                                "job_description": st.session_state.personal_info["job_description"]
-                            })
-                            if not desc_response:
-                                continue
-                                
-                            desc_data = desc_response.json()
-                            description = desc_data.get("description", "")
-                            
-                            # Generate category
-                            cat_response = call_api("/generate_category", "post", {
-                                "readme_content": readme_content,
-                                "job_description": st.session_state.personal_info["job_description"]
-                            })
-                            if not cat_response:
-                                continue
+                            urls.append(url)
+                        
+                        # Analyze all repositories server-side; one JSON line arrives per repo
+                        try:
+                            response = requests.post(
+                                f"{API_BASE_URL}/analyze_repos",
+                                json={
+                                    "repo_urls": urls,
+                                    "job_description": st.session_state.personal_info["job_description"]
+                                },
+                                stream=True,
+                                timeout=300
+                            )
+                            response.raise_for_status()
+                            for line in response.iter_lines():
+                                if not line:
+                                    continue
+                                result = json.loads(line)
+                                if "error" in result:
+                                    st.error(f"Failed to analyze {result['url']}: {result['error']}")
+                                    continue
                                 
-                            cat_data = cat_response.json()
-                            category = cat_data.get("category", "Other")
-                            
-                            # Add project
-                            projects.append({
-                                "name": repo_name,
-                                "description": description,
-                                "category": category
-                            })
-                            success_count += 1
+                                # Add project
+                                projects.append({
+                                    "name": result["name"],
+                                    "description": result["description"],
+                                    "category": result.get("category", "Other")
+                                })
+                                success_count += 1
+                        except Exception as e:
+                            st.error(f"API Connection Error: {str(e)}")
                         
                         if success_count > 0:
                             st.session_state.projects = projects
@@ -0,0 +1,63 @@
+# bench_import_time.py
+"""Measure the cold-start cost of importing the API server.
+
+Each run starts a fresh interpreter with ``-X importtime`` and imports
+``main``, so nothing is shared between runs. Prints the mean wall-clock
+import time and the slowest modules (cumulative) from the last run.
+
+Usage, from the repository root:
+    python benchmarks/bench_import_time.py [runs] [top]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_once():
+    """Return (total microseconds, {module: cumulative microseconds}) for one fresh import.
+
+    Only modules imported directly by ``main`` are listed, so nothing is counted twice.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        # importtime indents each module two spaces per level below the importing one
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if name.strip() == "main":
+            total = int(cumulative)
+        elif depth == 1:
+            modules[name.strip()] = int(cumulative)
+    return total, modules
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    top = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    totals = []
+    modules = {}
+    for _ in range(runs):
+        total, modules = import_once()
+        totals.append(total / 1000)
+    print(f"import main: mean {statistics.mean(totals):.1f} ms, min {min(totals):.1f} ms over {runs} runs")
+    print("slowest imports made by main (last run, cumulative):")
+    for name, us in sorted(modules.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {name:<24} {us / 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
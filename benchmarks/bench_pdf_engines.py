@@ -0,0 +1,80 @@
+# bench_pdf_engines.py
+"""Compare PDF engines on a typical generated resume.
+
+Renders the same markdown repeatedly with every engine in ``pdf_renderer.ENGINES``
+in this process (no worker pool, no cache) and prints per-render latency.
+Engines that cannot run here (e.g. wkhtmltopdf not installed) are skipped.
+
+Usage, from the repository root:
+    python benchmarks/bench_pdf_engines.py [iterations]
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdf_renderer  # noqa: E402
+
+SAMPLE_RESUME = """# CONTACT INFORMATION
+- **Name:** Jane Doe
+- **Email:** jane.doe@example.com
+- **GitHub:** [github.com/janedoe](https://github.com/janedoe)
+- **LinkedIn:** [linkedin.com/in/janedoe](https://linkedin.com/in/janedoe)
+
+# OBJECTIVE
+Results-driven machine learning engineer with 3 years of experience building production ML systems. Seeking to apply expertise in **Python**, **PyTorch** and **MLOps** to deliver measurable impact at Acme Corp.
+
+# EDUCATION
+- **BSc in Computer Science**, XYZ University, 2019 - 2023
+- **MSc in Data Science**, ABC University, 2023 - 2024
+
+# WORK EXPERIENCE
+## Data Scientist, Foo Inc (2022 - 2024)
+- Developed a recommendation engine that increased click-through rate by 18% across 2M daily users.
+- Deployed containerized inference services on Kubernetes, reducing p95 latency from 420ms to 95ms.
+- Built automated data validation pipelines with Great Expectations, cutting bad-data incidents by 70%.
+
+# TECHNICAL PROJECTS
+- **Smart-Resume-Generator (Generative AI)**: Engineered a FastAPI service that generates job-tailored resumes with Gemini, streaming output to a vanilla JS frontend.
+- **Realtime-Fraud-Detector (Machine Learning)**: Trained gradient-boosted models on 10M transactions, achieving 0.94 AUC with sub-10ms online scoring.
+- **Docs-QA-Bot (NLP)**: Implemented retrieval-augmented question answering over 5k internal documents using sentence embeddings and FAISS.
+- **K8s-Autoscaler (DevOps)**: Designed a custom metrics autoscaler that reduced cloud spend by 25% during off-peak hours.
+
+# TECHNICAL SKILLS
+- **Languages:** Python, SQL, TypeScript
+- **ML:** PyTorch, scikit-learn, XGBoost, Hugging Face Transformers
+- **Infrastructure:** Docker, Kubernetes, AWS, GitHub Actions
+"""
+
+
+def bench(name, render, iterations):
+    try:
+        pdf = render(SAMPLE_RESUME, pdf_renderer.DEFAULT_THEME)
+    except Exception as e:
+        print(f"{name:<12} skipped: {str(e).splitlines()[0]}")
+        return
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        render(SAMPLE_RESUME, pdf_renderer.DEFAULT_THEME)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(
+        f"{name:<12} mean {statistics.mean(timings):8.2f} ms   p50 {statistics.median(timings):8.2f} ms   "
+        f"p95 {p95:8.2f} ms   size {len(pdf) / 1024:7.1f} KiB"
+    )
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    pdf_renderer._init_worker()
+    print(f"{iterations} renders per engine")
+    for name, render in pdf_renderer.ENGINES.items():
+        bench(name, render, iterations)
+
+
+if __name__ == "__main__":
+    main()
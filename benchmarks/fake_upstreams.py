@@ -0,0 +1,152 @@
+# fake_upstreams.py
+"""Local stand-ins for the Gemini API and raw.githubusercontent.com.
+
+Used by ``load_test.py`` so the API can be benchmarked without network
+access, API keys or quota. Point the server at it with::
+
+    GEMINI_BASE_URL=http://127.0.0.1:8765/
+    GITHUB_RAW_BASE_URL=http://127.0.0.1:8765/raw
+
+Gemini responses are synthetic markdown (or JSON when the request asks for
+structured output) of a configurable size, delivered after a configurable
+latency; streaming responses are spread over time at a configurable token
+rate. GitHub READMEs are generated per repository, served with an ETag, and
+repositories named ``*-master`` only exist on the ``master`` branch while
+``missing-*`` repositories do not exist at all.
+
+Settings (environment variables):
+    FAKE_GEMINI_LATENCY_MS       time to first token (default 800)
+    FAKE_GEMINI_TOKENS           output tokens per response (default 1200)
+    FAKE_GEMINI_TOKENS_PER_SEC   generation speed after the first token (default 250)
+    FAKE_GITHUB_LATENCY_MS       README response latency (default 60)
+
+Run standalone with ``python benchmarks/fake_upstreams.py [port]``.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sys
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+
+GEMINI_LATENCY_MS = float(os.getenv("FAKE_GEMINI_LATENCY_MS", "800"))
+GEMINI_TOKENS = int(os.getenv("FAKE_GEMINI_TOKENS", "1200"))
+GEMINI_TOKENS_PER_SEC = float(os.getenv("FAKE_GEMINI_TOKENS_PER_SEC", "250"))
+GITHUB_LATENCY_MS = float(os.getenv("FAKE_GITHUB_LATENCY_MS", "60"))
+
+# Roughly 1.3 tokens per word of English text.
+WORDS_PER_TOKEN = 0.75
+STREAM_CHUNK_TOKENS = 24
+
+SECTIONS = [
+    "CONTACT INFORMATION", "OBJECTIVE", "EDUCATION", "WORK EXPERIENCE", "TECHNICAL PROJECTS", "TECHNICAL SKILLS",
+]
+BULLET = (
+    "Engineered a **scalable** data pipeline in Python and SQL that reduced processing time by 35% "
+    "and improved reliability across 12 production services"
+)
+
+app = FastAPI(title="Fake upstreams")
+
+
+def fake_markdown(tokens: int) -> str:
+    """Resume-shaped markdown of roughly ``tokens`` tokens."""
+    words_wanted = int(tokens * WORDS_PER_TOKEN)
+    lines = []
+    words = 0
+    section = 0
+    while words < words_wanted:
+        if words == 0 or len(lines) % 6 == 0:
+            lines.append(f"\n# {SECTIONS[section % len(SECTIONS)]}")
+            section += 1
+        lines.append(f"- {BULLET}.")
+        words += len(BULLET.split())
+    return "\n".join(lines).strip() + "\n"
+
+
+def fake_readme(owner: str, repo: str) -> str:
+    return (
+        f"# {repo}\n\n"
+        f"[![Build](https://img.shields.io/badge/build-passing-green.svg)](https://github.com/{owner}/{repo})\n\n"
+        f"{repo} is a Python service by {owner} that ingests events, trains machine learning models "
+        "and serves predictions over a FastAPI REST API deployed with Docker on Kubernetes.\n\n"
+        "## Features\n\n" + "".join(f"- Feature {i}: {BULLET}.\n" for i in range(12)) +
+        "\n## Installation\n\n```bash\npip install -r requirements.txt\n```\n\n## License\n\nMIT\n"
+    )
+
+
+def _usage(prompt_chars: int, tokens: int) -> dict:
+    return {
+        "promptTokenCount": prompt_chars // 4,
+        "candidatesTokenCount": tokens,
+        "totalTokenCount": prompt_chars // 4 + tokens,
+    }
+
+
+def _candidate(text: str, finished: bool = True) -> dict:
+    candidate = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+    if finished:
+        candidate["finishReason"] = "STOP"
+    return candidate
+
+
+def _response_text(body: dict) -> str:
+    config = body.get("generationConfig") or {}
+    if config.get("responseMimeType") == "application/json":
+        return json.dumps({
+            "description": "Engineered a Python service delivering predictions over a REST API, "
+                           "cutting inference latency by 40% for 10k daily users.",
+            "category": "ML",
+        })
+    return fake_markdown(GEMINI_TOKENS)
+
+
+def _prompt_chars(body: dict) -> int:
+    return sum(len(part.get("text", "")) for content in body.get("contents", []) for part in content.get("parts", []))
+
+
+@app.post("/v1beta/models/{model_action}")
+async def gemini(model_action: str, request: Request):
+    body = await request.json()
+    text = _response_text(body)
+    tokens = max(1, int(len(text.split()) / WORDS_PER_TOKEN))
+    usage = _usage(_prompt_chars(body), tokens)
+    await asyncio.sleep(GEMINI_LATENCY_MS / 1000)
+
+    if model_action.endswith(":streamGenerateContent"):
+        async def events():
+            words = text.split(" ")
+            step = max(1, int(STREAM_CHUNK_TOKENS * WORDS_PER_TOKEN))
+            for start in range(0, len(words), step):
+                chunk = " ".join(words[start:start + step]) + (" " if start + step < len(words) else "")
+                last = start + step >= len(words)
+                payload = {"candidates": [_candidate(chunk, finished=last)], "usageMetadata": usage}
+                yield f"data: {json.dumps(payload)}\r\n\r\n"
+                if not last:
+                    await asyncio.sleep(STREAM_CHUNK_TOKENS / GEMINI_TOKENS_PER_SEC)
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    await asyncio.sleep(tokens / GEMINI_TOKENS_PER_SEC)
+    return {"candidates": [_candidate(text)], "usageMetadata": usage, "modelVersion": "fake"}
+
+
+@app.get("/raw/{owner}/{repo}/{branch}/README.md")
+async def raw_readme(owner: str, repo: str, branch: str, request: Request):
+    await asyncio.sleep(GITHUB_LATENCY_MS / 1000)
+    if repo.startswith("missing-") or (repo.endswith("-master") and branch != "master"):
+        return Response("404: Not Found", status_code=404)
+    content = fake_readme(owner, repo)
+    etag = '"%s"' % hashlib.sha1(content.encode("utf-8")).hexdigest()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content, media_type="text/plain; charset=utf-8", headers={"ETag": etag})
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
@@ -0,0 +1,381 @@
+# load_test.py
+"""Load test the API against local Gemini and GitHub stand-ins.
+
+Starts ``fake_upstreams.py`` and the server (``python server.py``) as
+subprocesses, drives a weighted mix of requests from concurrent clients for
+a fixed duration, then reports latency percentiles and throughput per
+endpoint. Results are written as JSON (with the git commit) so runs can be
+compared across commits with ``--compare``.
+
+Usage, from the repository root:
+    python benchmarks/load_test.py --duration 30 --concurrency 16
+    python benchmarks/load_test.py --compare benchmarks/results/<earlier>.json
+
+A share of requests (``--unique``) carries a payload never seen before, so
+the mix exercises both cache hits and full upstream round trips.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, "benchmarks")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+DEFAULT_MIX = "generate_resume=3,generate_resume_stream=2,generate_pdf=3,analyze_repos=2,generate_cover_letter=1,get_readme=1"
+
+JOB_DESCRIPTIONS = [
+    "Machine Learning Engineer building recommendation systems with Python, PyTorch and Kubernetes.",
+    "Backend Developer designing REST APIs with FastAPI, PostgreSQL and Docker on AWS.",
+    "Data Scientist running experiments, SQL analytics and dashboards for a growth team.",
+    "DevOps Engineer owning CI/CD pipelines, Terraform and observability for microservices.",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+# ---------- Payloads ----------
+
+class Payloads:
+    """Request bodies for each endpoint; ``unique`` is the share that never repeats."""
+
+    def __init__(self, unique: float, pdf_engine: Optional[str], seed: int = 7):
+        self.unique = unique
+        self.pdf_engine = pdf_engine
+        self.random = random.Random(seed)
+        self.counter = 0
+
+    def _variant(self) -> str:
+        # Repeat a small pool of variants, or mint a fresh one for a cache miss.
+        if self.random.random() < self.unique:
+            self.counter += 1
+            return f"u{self.counter}"
+        return f"r{self.random.randrange(4)}"
+
+    def job_description(self, variant: str) -> str:
+        base = JOB_DESCRIPTIONS[zlib.crc32(variant.encode("utf-8")) % len(JOB_DESCRIPTIONS)]
+        return f"{base} (posting {variant})"
+
+    def resume_data(self) -> dict:
+        variant = self._variant()
+        return {
+            "name": "Jane Doe",
+            "email": "jane.doe@example.com",
+            "phone": "+1 555 0100",
+            "github": "https://github.com/janedoe",
+            "linkedin": "https://linkedin.com/in/janedoe",
+            "education": "BSc in Computer Science, XYZ University, 2023",
+            "work_experience": "Data Scientist at Foo Inc (2022-2024): built recommendation models.",
+            "job_description": self.job_description(variant),
+            "projects": [
+                {"name": f"project-{i}", "category": "ML", "description": "Built an ML service with FastAPI and Docker."}
+                for i in range(4)
+            ],
+        }
+
+    def pdf(self) -> dict:
+        variant = self._variant()
+        markdown = (
+            f"# CONTACT INFORMATION\n- Name: Jane Doe ({variant})\n- Email: jane.doe@example.com\n\n"
+            "# OBJECTIVE\nResults-driven engineer with **3 years** of experience.\n\n"
+            "# TECHNICAL PROJECTS\n" + "".join(
+                f"- **project-{i} (ML)**: Engineered a FastAPI service that cut latency by {10 + i}%.\n" for i in range(8)
+            ) + "\n# TECHNICAL SKILLS\nPython, SQL, Docker, AWS, PyTorch, FastAPI, Kubernetes, Git\n"
+        )
+        body = {"markdown_text": markdown}
+        if self.pdf_engine:
+            body["engine"] = self.pdf_engine
+        return body
+
+    def analyze_repos(self) -> dict:
+        variant = self._variant()
+        repos = [f"https://github.com/bench-{variant}/service-{i}" for i in range(3)]
+        repos.append(f"https://github.com/bench-{variant}/legacy-master")
+        return {"repo_urls": repos, "job_description": self.job_description(variant)}
+
+    def cover_letter(self) -> dict:
+        variant = self._variant()
+        return {
+            "company_name": f"Acme {variant}",
+            "job_description": self.job_description(variant),
+            "github_projects": "project-0 (ML): Built an ML service with FastAPI and Docker.",
+            "candidate_name": "Jane Doe",
+            "Candidate_email": "jane.doe@example.com",
+            "Candidate_phone": "+1 555 0100",
+        }
+
+    def readme_url(self) -> str:
+        return f"https://github.com/bench-{self._variant()}/service-0"
+
+
+# ---------- Scenarios ----------
+
+async def _post_json(client: httpx.AsyncClient, path: str, body: dict) -> Tuple[bool, Optional[float]]:
+    response = await client.post(path, json=body)
+    return response.status_code == 200, None
+
+
+async def _post_stream(client: httpx.AsyncClient, path: str, body: dict) -> Tuple[bool, Optional[float]]:
+    """Read a streamed response to the end; also returns time to first byte."""
+    start = time.perf_counter()
+    first_byte = None
+    async with client.stream("POST", path, json=body) as response:
+        async for chunk in response.aiter_bytes():
+            if first_byte is None and chunk:
+                first_byte = time.perf_counter() - start
+            if b"event: error" in chunk:
+                return False, first_byte
+        return response.status_code == 200, first_byte
+
+
+def scenarios(payloads: Payloads) -> Dict[str, Callable]:
+    return {
+        "generate_resume": lambda c: _post_json(c, "/api/generate_resume", payloads.resume_data()),
+        "generate_resume_stream": lambda c: _post_stream(c, "/api/generate_resume/stream", payloads.resume_data()),
+        "generate_pdf": lambda c: _post_json(c, "/api/generate_pdf", payloads.pdf()),
+        "analyze_repos": lambda c: _post_stream(c, "/api/analyze_repos", payloads.analyze_repos()),
+        "generate_cover_letter": lambda c: _post_json(c, "/api/generate_cover_letter", payloads.cover_letter()),
+        "get_readme": lambda c: _get_readme(c, payloads.readme_url()),
+    }
+
+
+async def _get_readme(client: httpx.AsyncClient, url: str) -> Tuple[bool, Optional[float]]:
+    response = await client.get("/api/get_readme", params={"url": url})
+    return response.status_code == 200 and "error" not in response.json(), None
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        weights[name.strip()] = int(weight or 1)
+    return weights
+
+
+async def drive(base_url: str, args) -> Tuple[Dict[str, dict], float]:
+    payloads = Payloads(args.unique, args.pdf_engine)
+    available = scenarios(payloads)
+    weights = parse_mix(args.mix)
+    unknown = set(weights) - set(available)
+    if unknown:
+        raise SystemExit(f"Unknown endpoints in --mix: {', '.join(sorted(unknown))}")
+    names = list(weights)
+    rng = random.Random(11)
+
+    samples: Dict[str, dict] = defaultdict(lambda: {"latencies": [], "ttfb": [], "errors": 0})
+    deadline = time.perf_counter() + args.duration
+    timeout = httpx.Timeout(args.request_timeout)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        async def client_loop():
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, weights=[weights[n] for n in names])[0]
+                start = time.perf_counter()
+                try:
+                    ok, ttfb = await available[name](client)
+                except httpx.HTTPError:
+                    ok, ttfb = False, None
+                elapsed = time.perf_counter() - start
+                sample = samples[name]
+                sample["latencies"].append(elapsed * 1000)
+                if ttfb is not None:
+                    sample["ttfb"].append(ttfb * 1000)
+                if not ok:
+                    sample["errors"] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(args.concurrency)))
+        wall = time.perf_counter() - started
+    return samples, wall
+
+
+def summarize(samples: Dict[str, dict], wall: float) -> dict:
+    endpoints = {}
+    total = 0
+    for name, sample in sorted(samples.items()):
+        latencies = sorted(sample["latencies"])
+        total += len(latencies)
+        summary = {
+            "requests": len(latencies),
+            "errors": sample["errors"],
+            "throughput_rps": round(len(latencies) / wall, 3),
+            "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+        }
+        if sample["ttfb"]:
+            ttfb = sorted(sample["ttfb"])
+            summary["ttfb_p50_ms"] = round(percentile(ttfb, 50), 2)
+            summary["ttfb_p95_ms"] = round(percentile(ttfb, 95), 2)
+        endpoints[name] = summary
+    return {"wall_seconds": round(wall, 3), "total_requests": total,
+            "throughput_rps": round(total / wall, 3), "endpoints": endpoints}
+
+
+def print_report(result: dict, baseline: Optional[dict] = None) -> None:
+    header = f"{'endpoint':<24}{'reqs':>7}{'err':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    if baseline:
+        header += f"{'Δp50':>9}{'Δp95':>9}"
+    print(header)
+    for name, summary in result["summary"]["endpoints"].items():
+        line = (f"{name:<24}{summary['requests']:>7}{summary['errors']:>6}{summary['throughput_rps']:>9.2f}"
+                f"{summary['p50_ms']:>10.1f}{summary['p95_ms']:>10.1f}{summary['p99_ms']:>10.1f}")
+        before = (baseline or {}).get("summary", {}).get("endpoints", {}).get(name)
+        if before:
+            for key in ("p50_ms", "p95_ms"):
+                change = (summary[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+                line += f"{change:>+8.1f}%"
+        print(line)
+    print(f"total: {result['summary']['total_requests']} requests, "
+          f"{result['summary']['throughput_rps']:.2f} req/s over {result['summary']['wall_seconds']:.1f}s")
+
+
+# ---------- Process management ----------
+
+def start_process(cmd: List[str], env: dict, log_path: str) -> subprocess.Popen:
+    log = open(log_path, "w")
+    return subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+def wait_until_up(url: str, process: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Process exited early while waiting for {url}")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"Timed out waiting for {url}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30, help="seconds of traffic (default 30)")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients (default 16)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"endpoint=weight list (default {DEFAULT_MIX})")
+    parser.add_argument("--unique", type=float, default=0.3, help="share of never-seen payloads (default 0.3)")
+    parser.add_argument("--pdf-engine", default="native", help="engine for PDF requests; '' for the server default")
+    parser.add_argument("--server-workers", type=int, default=1, help="SERVER_WORKERS for the app (default 1)")
+    parser.add_argument("--gemini-latency-ms", type=float, default=800)
+    parser.add_argument("--gemini-tokens", type=int, default=1200)
+    parser.add_argument("--gemini-tokens-per-sec", type=float, default=250)
+    parser.add_argument("--github-latency-ms", type=float, default=60)
+    parser.add_argument("--request-timeout", type=float, default=120)
+    parser.add_argument("--output", help="results file (default benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare p50/p95 against")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="resume-bench-")
+    upstream_port, app_port = free_port(), free_port()
+    env = dict(os.environ)
+    env.update({
+        "FAKE_GEMINI_LATENCY_MS": str(args.gemini_latency_ms),
+        "FAKE_GEMINI_TOKENS": str(args.gemini_tokens),
+        "FAKE_GEMINI_TOKENS_PER_SEC": str(args.gemini_tokens_per_sec),
+        "FAKE_GITHUB_LATENCY_MS": str(args.github_latency_ms),
+        "GEMINI_BASE_URL": f"http://127.0.0.1:{upstream_port}/",
+        "GEMINI_API_KEY": "fake-key",
+        "GITHUB_RAW_BASE_URL": f"http://127.0.0.1:{upstream_port}/raw",
+        "PORT": str(app_port),
+        "SERVER_WORKERS": str(args.server_workers),
+        "PROFILE_DB_PATH": os.path.join(workdir, "profiles.db"),
+    })
+    # Every run starts cold: no cache files from earlier runs.
+    for name in ("SHARED_CACHE_PATH", "LLM_CACHE_PATH", "README_CACHE_PATH", "PDF_CACHE_PATH"):
+        env.pop(name, None)
+    # The README cache is on disk by default; keep it in this run's directory.
+    env["README_CACHE_PATH"] = os.path.join(workdir, "readmes.sqlite3")
+    if args.server_workers > 1:
+        env["SHARED_CACHE_PATH"] = os.path.join(workdir, "shared.sqlite3")
+
+    processes = []
+    try:
+        upstream = start_process(
+            [sys.executable, os.path.join(BENCH_DIR, "fake_upstreams.py"), str(upstream_port)],
+            env, os.path.join(workdir, "upstreams.log"),
+        )
+        processes.append(upstream)
+        wait_until_up(f"http://127.0.0.1:{upstream_port}/docs", upstream)
+        server = start_process([sys.executable, "server.py"], env, os.path.join(workdir, "server.log"))
+        processes.append(server)
+        wait_until_up(f"http://127.0.0.1:{app_port}/api/health", server)
+
+        print(f"Driving {args.concurrency} clients for {args.duration:g}s (logs in {workdir})")
+        samples, wall = asyncio.run(drive(f"http://127.0.0.1:{app_port}", args))
+        try:
+            cache_stats = httpx.get(f"http://127.0.0.1:{app_port}/api/cache/stats", timeout=5).json()
+        except (httpx.HTTPError, ValueError):
+            cache_stats = None
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    result = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "summary": summarize(samples, wall),
+        "server_cache_stats": cache_stats,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{result['commit'] or 'nogit'}.json")
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
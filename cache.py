@@ -0,0 +1,366 @@
+# cache.py
+"""Small caching toolkit shared by the API.
+
+``LRUCache`` is a bounded in-process tier, ``SQLiteCache`` an optional on-disk
+tier that survives restarts, and ``TieredCache`` puts the two together. Every
+cache keeps hit/miss counters that ``stats()`` reports for the stats endpoint.
+
+SQLite runs in WAL mode, so several server worker processes can share one
+database file. The disk tier is best-effort: a busy database counts as a miss
+(or a skipped write) after ``SQLITE_BUSY_TIMEOUT_SECONDS`` rather than
+stalling the request. Async callers reach it through ``aget``/``aset``, which
+run the SQLite calls in a thread so the event loop never waits on a lock.
+``compute_once`` uses short-lived leases in that file so a value missing from
+the shared cache is computed by one process while the others wait for it.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+# Returned by get() on a miss so that falsy values can still be cached.
+MISSING = object()
+
+# How long a SQLite call waits for another process holding the write lock before giving up.
+BUSY_TIMEOUT_SECONDS = float(os.getenv("SQLITE_BUSY_TIMEOUT_SECONDS", "0.5"))
+
+
+def make_key(*parts: Any) -> str:
+    """Build a content-addressed key from arbitrary JSON-serialisable parts."""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe in-memory LRU cache with optional TTL and byte budget."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or (lambda value: len(value) if isinstance(value, (str, bytes)) else 1)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            value, expires_at, size = entry
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(key)
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl else None
+        size = self._sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        with self._lock:
+            entries, size = len(self._entries), self._bytes
+        return {
+            "entries": entries,
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class SQLiteCache:
+    """Persistent key/value cache stored in one SQLite table.
+
+    Values go through ``dumps``/``loads`` (JSON by default) and are stored as
+    blobs. When ``max_entries`` is set, the least recently written rows are
+    pruned after each write.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table: str,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        dumps: Callable[[Any], bytes] = lambda value: json.dumps(value).encode("utf-8"),
+        loads: Callable[[bytes], Any] = lambda blob: json.loads(blob),
+    ):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table!r}")
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._dumps = dumps
+        self._loads = loads
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=BUSY_TIMEOUT_SECONDS)
+        with self._lock:
+            # WAL lets readers in every worker process proceed while one of them writes.
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            with self._conn:
+                self._conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} ("
+                    "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                    "expires_at REAL, updated_at REAL NOT NULL)"
+                )
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {table}_updated_at ON {table} (updated_at)"
+                )
+                self._conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table}_leases (key TEXT PRIMARY KEY, expires_at REAL NOT NULL)"
+                )
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] is not None and row[1] <= time.time():
+                    with self._conn:
+                        self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                    row = None
+            except sqlite3.OperationalError:
+                # Locked by another process for longer than the busy timeout.
+                row = None
+            if row is None:
+                self.misses += 1
+                return MISSING
+            blob = row[0]
+            self.hits += 1
+        return self._loads(blob)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        blob = self._dumps(value)
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, updated_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, blob, expires_at, now),
+                )
+                if self.max_entries is not None:
+                    self._conn.execute(
+                        f"DELETE FROM {self.table} WHERE key IN ("
+                        f"SELECT key FROM {self.table} ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                        (self.max_entries,),
+                    )
+        except sqlite3.OperationalError:
+            # Skipped rather than waited for; the memory tier still has the value.
+            pass
+
+    def delete(self, key: str) -> None:
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+        except sqlite3.OperationalError:
+            pass
+
+    def clear(self) -> None:
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(f"DELETE FROM {self.table}")
+        except sqlite3.OperationalError:
+            pass
+
+    def acquire_lease(self, key: str, seconds: float) -> bool:
+        """Claim ``key`` for ``seconds``; False while another holder's lease is live."""
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    f"DELETE FROM {self.table}_leases WHERE key = ? AND expires_at <= ?", (key, now)
+                )
+                return self._conn.execute(
+                    f"INSERT OR IGNORE INTO {self.table}_leases (key, expires_at) VALUES (?, ?)",
+                    (key, now + seconds),
+                ).rowcount == 1
+        except sqlite3.OperationalError:
+            # Busy: the caller polls again, and computes itself once its deadline passes.
+            return False
+
+    def release_lease(self, key: str) -> None:
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(f"DELETE FROM {self.table}_leases WHERE key = ?", (key,))
+        except sqlite3.OperationalError:
+            # The lease expires on its own.
+            pass
+
+    def _count(self) -> Optional[int]:
+        try:
+            with self._lock:
+                return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        except sqlite3.OperationalError:
+            # Busy: unknown rather than an error on the stats endpoint.
+            return None
+
+    def __len__(self) -> int:
+        return self._count() or 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._count(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class TieredCache:
+    """Memory tier in front of an optional disk tier; disk hits are promoted."""
+
+    def __init__(self, memory: LRUCache, disk: Optional[SQLiteCache] = None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Any:
+        value = self.memory.get(key)
+        if value is MISSING and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not MISSING:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            self.disk.set(key, value, ttl)
+
+    async def aget(self, key: str) -> Any:
+        """``get`` for async callers: the disk tier is read in a worker thread."""
+        value = self.memory.get(key)
+        if value is MISSING and self.disk is not None:
+            value = await asyncio.to_thread(self.disk.get, key)
+            if value is not MISSING:
+                self.memory.set(key, value)
+        return value
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """``set`` for async callers: the disk tier is written in a worker thread."""
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, value, ttl)
+
+    async def adelete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.delete, key)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> dict:
+        stats = {"memory": self.memory.stats()}
+        if self.disk is not None:
+            stats["disk"] = self.disk.stats()
+        return stats
+
+
+async def compute_once(
+    cache: TieredCache,
+    key: str,
+    fn: Callable[[], Awaitable[Any]],
+    lease_seconds: float,
+    poll_seconds: float = 0.1,
+    refresh: bool = False,
+) -> Any:
+    """Return ``await fn()``, letting only one process sharing ``cache.disk`` run it per key.
+
+    ``fn`` is expected to store its result in ``cache``. A process that finds
+    the key leased by another waits for the lease to go away and then uses the
+    cached result; if the holder died or failed it computes the value itself.
+    With ``refresh`` it always computes the value itself, after the wait.
+    ``lease_seconds`` must cover the whole of ``fn``, retries included.
+    Without a disk tier this is just ``await fn()``.
+    """
+    disk = cache.disk
+    if disk is None:
+        return await fn()
+    deadline = time.monotonic() + lease_seconds
+    waited = False
+    while not await asyncio.to_thread(disk.acquire_lease, key, lease_seconds):
+        if time.monotonic() >= deadline:
+            return await fn()
+        waited = True
+        await asyncio.sleep(poll_seconds)
+    try:
+        if waited and not refresh:
+            value = await cache.aget(key)
+            if value is not MISSING:
+                return value
+        return await fn()
+    finally:
+        await asyncio.to_thread(disk.release_lease, key)
@@ -0,0 +1,284 @@
+# category_classifier.py
+"""Local project category classifier.
+
+Picking one of the fixed project categories does not need a language model
+when a README plainly says what the project is. ``classify`` scores the
+README against a curated vocabulary per category, weighting each term by how
+specific it is to its category (inverse document frequency across the
+vocabularies), adds signals from the repository language, and reports a
+confidence from the margin between the two best categories and the amount of
+evidence found. Callers answer locally above a threshold and ask Gemini
+otherwise.
+"""
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# Answers below this confidence are left to Gemini; above 1 every README goes to Gemini.
+CONFIDENCE_THRESHOLD = float(os.getenv("CATEGORY_CONFIDENCE_THRESHOLD", "0.6"))
+# Score at which the evidence term of the confidence reaches about 63%.
+EVIDENCE_SCALE = 6.0
+# A single keyword ("uses an API", "built with React") is never enough to skip Gemini.
+MIN_DISTINCT_TERMS = 2
+# Only the start of a long README is scored; preprocessing puts the best sections there.
+MAX_CHARS = 20000
+# Terms among the first LEAD_TOKENS words count LEAD_WEIGHT times.
+LEAD_TOKENS = 60
+LEAD_WEIGHT = 2
+
+VOCABULARIES: Dict[str, List[str]] = {
+    "Data Science": [
+        "data science", "pandas", "numpy", "scipy", "jupyter", "notebook", "statistics", "statistical",
+        "regression", "hypothesis testing", "exploratory data analysis", "eda", "feature engineering",
+        "scikit-learn", "sklearn", "kaggle", "dataset", "matplotlib", "seaborn", "correlation", "clustering",
+    ],
+    "Data Analyst": [
+        "data analysis", "dashboard", "tableau", "power bi", "powerbi", "excel", "kpi", "kpis", "reporting",
+        "business intelligence", "looker", "pivot", "sales", "insights", "trends", "sql queries",
+    ],
+    "Web Dev": [
+        "website", "web app", "web application", "html", "css", "responsive", "wordpress", "bootstrap",
+        "landing page", "web development", "seo", "browser", "static site",
+    ],
+    "Backend Dev": [
+        "backend", "back end", "rest api", "api", "server", "microservices", "fastapi", "flask", "django",
+        "express", "spring boot", "graphql", "grpc", "endpoints", "jwt", "redis", "rabbitmq", "kafka",
+    ],
+    "Frontend Dev": [
+        "frontend", "front end", "react", "vue", "angular", "svelte", "tailwind", "next.js", "nextjs", "redux",
+        "webpack", "vite", "single page application", "ui components",
+    ],
+    "Full Stack": [
+        "full stack", "fullstack", "mern", "mean stack", "frontend and backend", "client and server",
+    ],
+    "DevOps": [
+        "devops", "ci cd", "jenkins", "github actions", "gitlab ci", "kubernetes", "k8s", "terraform", "ansible",
+        "helm", "infrastructure as code", "prometheus", "grafana", "monitoring", "docker compose",
+    ],
+    "ML": [
+        "machine learning", "deep learning", "neural network", "pytorch", "tensorflow", "keras", "training",
+        "trained", "classifier", "classification", "accuracy", "xgboost", "random forest", "cnn", "lstm",
+        "inference", "fine tuning", "hyperparameter", "model", "computer vision", "opencv", "object detection",
+        "yolo", "image classification", "reinforcement learning",
+    ],
+    "Java Dev": [
+        "java", "spring", "spring boot", "maven", "gradle", "jvm", "hibernate", "junit", "jdk",
+    ],
+    "JS Dev": [
+        "javascript", "typescript", "node.js", "nodejs", "npm", "yarn", "deno", "es6",
+    ],
+    "Python Dev": [
+        "python", "python3", "pip", "pypi", "virtualenv", "venv", "poetry", "command line", "cli", "automation",
+        "script",
+    ],
+    "Mobile Dev": [
+        "android", "ios", "flutter", "react native", "kotlin", "swift", "swiftui", "mobile app", "xcode", "dart",
+        "app store", "play store", "jetpack compose",
+    ],
+    "Cloud": [
+        "aws", "azure", "gcp", "google cloud", "lambda", "s3", "ec2", "serverless", "cloud", "cloudformation",
+        "cloud run", "firebase",
+    ],
+    "Security": [
+        "security", "vulnerability", "vulnerabilities", "encryption", "penetration testing", "pentest", "malware",
+        "xss", "sql injection", "cve", "firewall", "cryptography", "exploit", "ctf", "owasp",
+    ],
+    "QA": [
+        "test automation", "selenium", "cypress", "playwright", "unit tests", "integration tests", "qa",
+        "test cases", "jest", "testing framework", "end to end tests",
+    ],
+    "Database": [
+        "database", "postgresql", "postgres", "mysql", "mongodb", "sqlite", "schema", "indexing", "orm", "nosql",
+        "cassandra", "migrations", "stored procedures", "sql",
+    ],
+    "Embedded": [
+        "embedded", "microcontroller", "arduino", "stm32", "firmware", "rtos", "freertos", "gpio", "uart", "i2c",
+        "spi", "avr", "bare metal",
+    ],
+    "Networking": [
+        "networking", "network", "tcp", "udp", "socket", "sockets", "packet", "packets", "routing", "router",
+        "protocol", "dns", "wireshark", "vpn", "bandwidth", "cisco",
+    ],
+    "AI": [
+        "artificial intelligence", "ai", "llm", "llms", "large language model", "gpt", "openai", "chatbot",
+        "langchain", "rag", "generative", "transformer", "prompt", "agent", "agents", "nlp", "gemini",
+        "embeddings", "hugging face", "huggingface",
+    ],
+    "Robotics": [
+        "robot", "robots", "robotics", "ros", "ros2", "gazebo", "slam", "motion planning", "kinematics", "lidar",
+        "drone", "servo", "autonomous",
+    ],
+    "IoT": [
+        "iot", "internet of things", "sensor", "sensors", "mqtt", "esp8266", "esp32", "raspberry pi", "smart home",
+        "home assistant", "zigbee", "telemetry",
+    ],
+    "Blockchain": [
+        "blockchain", "ethereum", "solidity", "smart contract", "smart contracts", "web3", "nft", "cryptocurrency",
+        "bitcoin", "defi", "hardhat", "truffle",
+    ],
+    "AR/VR": [
+        "augmented reality", "virtual reality", "ar", "vr", "arkit", "arcore", "oculus", "openxr", "mixed reality",
+        "webxr", "headset",
+    ],
+    "Game Dev": [
+        "game", "games", "unity", "unreal", "godot", "pygame", "gameplay", "player", "sprite", "multiplayer",
+        "game engine", "phaser",
+    ],
+    "UI/UX": [
+        "ui ux", "ux", "user experience", "figma", "wireframe", "wireframes", "prototype", "design system",
+        "usability", "user research", "mockups",
+    ],
+    "Tech Writing": [
+        "documentation", "tutorial", "tutorials", "guide", "blog", "technical writing", "handbook", "mkdocs",
+        "sphinx", "book", "articles",
+    ],
+    "Research": [
+        "research", "paper", "arxiv", "experiments", "thesis", "benchmark", "state of the art", "ablation",
+        "citation", "publication", "reproduce",
+    ],
+}
+
+# Repository language -> category score bonuses. General-purpose languages get small bonuses
+# so that the README's own words decide.
+LANGUAGE_SIGNALS: Dict[str, Dict[str, float]] = {
+    "python": {"Python Dev": 0.5},
+    "jupyter notebook": {"Data Science": 1.5, "ML": 0.5},
+    "java": {"Java Dev": 2.0},
+    "javascript": {"JS Dev": 1.0, "Web Dev": 0.5},
+    "typescript": {"JS Dev": 1.0, "Frontend Dev": 0.5},
+    "html": {"Web Dev": 1.5},
+    "css": {"Web Dev": 1.0, "Frontend Dev": 0.5},
+    "vue": {"Frontend Dev": 1.5},
+    "kotlin": {"Mobile Dev": 1.5},
+    "swift": {"Mobile Dev": 2.0},
+    "dart": {"Mobile Dev": 2.0},
+    "objective-c": {"Mobile Dev": 2.0},
+    "c": {"Embedded": 1.0},
+    "c++": {"Embedded": 0.5, "Game Dev": 0.5},
+    "c#": {"Game Dev": 1.0},
+    "gdscript": {"Game Dev": 2.0},
+    "solidity": {"Blockchain": 3.0},
+    "hcl": {"DevOps": 2.0, "Cloud": 1.0},
+    "dockerfile": {"DevOps": 1.5},
+    "shell": {"DevOps": 0.5},
+    "go": {"Backend Dev": 1.0},
+    "rust": {"Backend Dev": 0.5},
+    "php": {"Web Dev": 1.0, "Backend Dev": 0.5},
+    "ruby": {"Web Dev": 0.5, "Backend Dev": 0.5},
+    "r": {"Data Science": 1.5, "Data Analyst": 0.5},
+    "sql": {"Database": 1.5, "Data Analyst": 0.5},
+    "plpgsql": {"Database": 2.0},
+    "tex": {"Research": 1.5},
+}
+# Code fence tags and install commands that reveal the language when none is given.
+_LANGUAGE_HINTS: List[Tuple["re.Pattern", str]] = [
+    (re.compile(r"```(python|py)\b|\bpip3? install\b", re.I), "python"),
+    (re.compile(r"```(javascript|js|jsx)\b|\bnpm (install|i|run)\b|\byarn (add|install)\b", re.I), "javascript"),
+    (re.compile(r"```(typescript|ts|tsx)\b", re.I), "typescript"),
+    (re.compile(r"```java\b|\bmvn\b|\bgradlew?\b", re.I), "java"),
+    (re.compile(r"```(kotlin|kt)\b", re.I), "kotlin"),
+    (re.compile(r"```swift\b|\bpod install\b", re.I), "swift"),
+    (re.compile(r"```dart\b|\bflutter (run|pub)\b", re.I), "dart"),
+    (re.compile(r"```(cpp|c\+\+)\b|\bcmake\b", re.I), "c++"),
+    (re.compile(r"```(csharp|cs)\b|\bdotnet\b", re.I), "c#"),
+    (re.compile(r"```solidity\b", re.I), "solidity"),
+    (re.compile(r"```(hcl|terraform)\b|\bterraform (init|apply)\b", re.I), "hcl"),
+    (re.compile(r"```go\b|\bgo (get|run|build)\b", re.I), "go"),
+    (re.compile(r"```rust\b|\bcargo (run|build|install)\b", re.I), "rust"),
+    (re.compile(r"```php\b|\bcomposer (install|require)\b", re.I), "php"),
+    (re.compile(r"```r\b|\binstall\.packages\(", re.I), "r"),
+    (re.compile(r"```sql\b", re.I), "sql"),
+]
+# Weight of a language the caller knows (e.g. GitHub's repository language) versus one guessed from the README.
+KNOWN_LANGUAGE_WEIGHT = 1.0
+GUESSED_LANGUAGE_WEIGHT = 0.5
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+
+def _tokens(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def _build_index() -> Tuple[Dict[Tuple[str, ...], Dict[str, float]], int]:
+    """Map each vocabulary term (as a token tuple) to its categories and IDF weight."""
+    categories_by_term: Dict[Tuple[str, ...], List[str]] = {}
+    for category, terms in VOCABULARIES.items():
+        for term in terms:
+            categories_by_term.setdefault(tuple(_tokens(term)), []).append(category)
+    total = len(VOCABULARIES)
+    index = {
+        term: {category: math.log(total / len(categories)) + 1 for category in categories}
+        for term, categories in categories_by_term.items()
+    }
+    return index, max(len(term) for term in index)
+
+
+_INDEX, _MAX_NGRAM = _build_index()
+
+
+@dataclass
+class Classification:
+    category: str
+    confidence: float
+    scores: Dict[str, float]
+
+
+def detect_languages(readme: str) -> List[str]:
+    return [language for pattern, language in _LANGUAGE_HINTS if pattern.search(readme)]
+
+
+def classify(readme: str, language: Optional[str] = None, raw_readme: Optional[str] = None) -> Classification:
+    """Score ``readme`` against the category vocabularies.
+
+    ``language`` is the repository's main language when known; otherwise
+    languages are guessed from code fences and install commands in
+    ``raw_readme`` (the README before preprocessing, which shortens code).
+    Only the first ``MAX_CHARS`` characters of either are read.
+    """
+    tokens = _tokens(readme[:MAX_CHARS])
+    counts: Counter = Counter()
+    # Longest match wins, so "rest api" is not also counted as "api".
+    position = 0
+    while position < len(tokens):
+        for size in range(min(_MAX_NGRAM, len(tokens) - position), 0, -1):
+            gram = tuple(tokens[position:position + size])
+            if gram in _INDEX:
+                # The title and opening lines say what the project is; they count double.
+                counts[gram] += LEAD_WEIGHT if position < LEAD_TOKENS else 1
+                position += size
+                break
+        else:
+            position += 1
+
+    scores: Dict[str, float] = Counter()
+    distinct_terms: Counter = Counter()
+    for term, count in counts.items():
+        for category, idf in _INDEX[term].items():
+            scores[category] += (1 + math.log(count)) * idf
+            distinct_terms[category] += 1
+
+    if language:
+        signals = [(language.lower(), KNOWN_LANGUAGE_WEIGHT)]
+    else:
+        guessed = detect_languages((raw_readme or readme)[:MAX_CHARS])
+        signals = [(guess, GUESSED_LANGUAGE_WEIGHT) for guess in guessed]
+    for name, weight in signals:
+        for category, bonus in LANGUAGE_SIGNALS.get(name, {}).items():
+            scores[category] += bonus * weight
+
+    ranked = sorted(scores.items(), key=lambda item: -item[1])
+    if not ranked or ranked[0][1] <= 0:
+        return Classification("Other", 0.0, {})
+    best, best_score = ranked[0]
+    runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+    # Confident only when one category clearly leads and there is enough evidence for it.
+    margin = 1 - runner_up / best_score
+    evidence = 1 - math.exp(-best_score / EVIDENCE_SCALE)
+    if distinct_terms[best] < MIN_DISTINCT_TERMS:
+        evidence = 0.0
+    top = {category: round(score, 2) for category, score in ranked[:5]}
+    return Classification(best, round(margin * evidence, 3), top)
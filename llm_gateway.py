@@ -0,0 +1,281 @@
+# llm_gateway.py
+"""Async gateway for every Gemini call made by the API.
+
+All endpoints route through this module instead of touching ``genai.Client``
+directly, so concurrency limits, timeouts and response caching are enforced
+in one place and no handler ever blocks the event loop on a synchronous SDK
+call.
+"""
+import asyncio
+import json
+import os
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Optional
+
+import metrics
+import timing
+from cache import MISSING, LRUCache, SQLiteCache, TieredCache, compute_once, make_key
+from singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    # google.genai takes a few hundred milliseconds to import, so it is loaded on first use.
+    from google import genai
+    from google.genai import types
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+# Point the SDK at another Gemini-compatible endpoint, e.g. the benchmark stand-in.
+BASE_URL = os.getenv("GEMINI_BASE_URL")
+
+# Upper bound on Gemini calls in flight per worker; extra callers wait their turn.
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+# Per-call timeout in seconds (covers waiting for a slot and the call itself).
+TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "90"))
+# Calls made for one generate(): a response that fails validation is retried once.
+ATTEMPTS = 2
+
+# Response cache: bounded memory tier, plus a SQLite tier when LLM_CACHE_PATH is set.
+CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+# SHARED_CACHE_PATH is the one database all server workers share (see main.py).
+CACHE_PATH = os.getenv("LLM_CACHE_PATH") or os.getenv("SHARED_CACHE_PATH")
+
+response_cache = TieredCache(
+    LRUCache(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS),
+    SQLiteCache(CACHE_PATH, "llm_responses", ttl=CACHE_TTL_SECONDS) if CACHE_PATH else None,
+)
+
+# Identical non-streaming calls already in flight are shared rather than repeated.
+in_flight = SingleFlight()
+
+_client: Optional["genai.Client"] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+class LLMError(Exception):
+    """Raised when a Gemini call fails or returns no usable text."""
+
+
+class LLMTimeoutError(LLMError):
+    """Raised when a Gemini call does not finish within its timeout."""
+
+
+def get_client() -> "genai.Client":
+    """Return the shared Gemini client, creating it on first use."""
+    global _client
+    if _client is None:
+        from google import genai
+        from google.genai import types
+
+        http_options = types.HttpOptions(base_url=BASE_URL) if BASE_URL else None
+        _client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"), http_options=http_options)
+    return _client
+
+
+def preload() -> None:
+    """Import the Gemini SDK ahead of the first call; the app runs this in the background."""
+    import google.genai  # noqa: F401
+    from google.genai import types  # noqa: F401
+
+
+def make_config(**kwargs) -> "types.GenerateContentConfig":
+    """Build a ``GenerateContentConfig`` without callers having to import google.genai."""
+    from google.genai import types
+
+    return types.GenerateContentConfig(**kwargs)
+
+
+def cache_key(prompt: str, config: "types.GenerateContentConfig", model: str) -> str:
+    """Content-addressed cache key for a (model, prompt, config) triple."""
+    return make_key(model, prompt, config.model_dump(exclude_none=True))
+
+
+def _finish_reason(response: "types.GenerateContentResponse") -> Optional[str]:
+    candidates = response.candidates or []
+    reason = candidates[0].finish_reason if candidates else None
+    return getattr(reason, "value", reason)
+
+
+def _default_validator(config: "types.GenerateContentConfig") -> Optional[Callable[[str], Any]]:
+    # Structured output must at least be complete JSON before it is worth caching.
+    if config.response_schema is not None or config.response_mime_type == "application/json":
+        return json.loads
+    return None
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    return _semaphore
+
+
+async def generate(
+    prompt: str,
+    config: "types.GenerateContentConfig",
+    model: str = DEFAULT_MODEL,
+    timeout: Optional[float] = None,
+    refresh: bool = False,
+    validate: Optional[Callable[[str], Any]] = None,
+) -> str:
+    """Run a single non-streaming generation and return the response text.
+
+    Identical requests are answered from ``response_cache``; ``refresh`` skips
+    the lookup but still stores the new response. Concurrent identical
+    requests that miss the cache share one upstream call.
+
+    Only complete responses (finish reason STOP) are cached. ``validate``
+    (default: JSON parsing for structured output) is applied before caching;
+    a response it rejects is retried once and then raised as ``LLMError``.
+    """
+    timeout = TIMEOUT_SECONDS if timeout is None else timeout
+    validate = validate or _default_validator(config)
+    key = cache_key(prompt, config, model)
+    if not refresh:
+        cached = await response_cache.aget(key)
+        if cached is not MISSING:
+            metrics.record_llm_call(model, "cache_hit")
+            return cached
+
+    async def _call() -> "types.GenerateContentResponse":
+        loop = asyncio.get_running_loop()
+        queued = loop.time()
+        async with _get_semaphore():
+            timing.record("llm_queue", (loop.time() - queued) * 1000)
+            return await get_client().aio.models.generate_content(
+                contents=prompt,
+                model=model,
+                config=config,
+            )
+
+    async def _attempt() -> "types.GenerateContentResponse":
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            response = await asyncio.wait_for(_call(), timeout=timeout)
+        except asyncio.TimeoutError:
+            metrics.record_llm_call(model, "timeout", loop.time() - started)
+            raise LLMTimeoutError(f"Gemini call timed out after {timeout:g}s")
+        except Exception:
+            metrics.record_llm_call(model, "error", loop.time() - started)
+            raise
+
+        metrics.record_llm_call(
+            model, "ok" if response.text is not None else "error", loop.time() - started, response.usage_metadata,
+        )
+        if response.text is None:
+            raise LLMError("Gemini returned an empty response")
+        return response
+
+    async def _fetch() -> str:
+        for attempt in range(ATTEMPTS):
+            response = await _attempt()
+            reason = _finish_reason(response)
+            if validate is not None:
+                try:
+                    validate(response.text)
+                except Exception as e:
+                    if attempt < ATTEMPTS - 1:
+                        continue
+                    raise LLMError(f"Gemini returned an invalid response (finish reason {reason}): {e}")
+            # A response cut short (e.g. MAX_TOKENS) is returned but not kept.
+            if reason == "STOP":
+                await response_cache.aset(key, response.text)
+            return response.text
+
+    # Single-flight dedupes within this process, the lease across worker processes.
+    with timing.span("llm"):
+        # The lease must outlast every attempt, or another worker starts the same call.
+        return await in_flight.do(
+            key, lambda: compute_once(response_cache, key, _fetch, ATTEMPTS * timeout, refresh=refresh)
+        )
+
+
+async def stream(
+    prompt: str,
+    config: "types.GenerateContentConfig",
+    model: str = DEFAULT_MODEL,
+    timeout: Optional[float] = None,
+    refresh: bool = False,
+) -> AsyncIterator[str]:
+    """Stream a generation, yielding text chunks as Gemini produces them.
+
+    The concurrency slot is held until the stream is exhausted or closed, and
+    the timeout bounds the whole stream rather than each chunk. A cached
+    response is replayed as a single chunk; a stream that ends with finish
+    reason STOP is cached. Concurrent identical streams share one upstream
+    stream, which is closed once none of them is reading it any more.
+    """
+    timeout = TIMEOUT_SECONDS if timeout is None else timeout
+    key = cache_key(prompt, config, model)
+    if not refresh:
+        cached = await response_cache.aget(key)
+        if cached is not MISSING:
+            metrics.record_llm_call(model, "cache_hit")
+            yield cached
+            return
+    async for chunk in in_flight.stream(key, lambda: _stream_upstream(prompt, config, model, timeout, key)):
+        yield chunk
+
+
+async def _stream_upstream(
+    prompt: str,
+    config: "types.GenerateContentConfig",
+    model: str,
+    timeout: float,
+    key: str,
+) -> AsyncIterator[str]:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    def remaining() -> float:
+        return max(deadline - loop.time(), 0)
+
+    semaphore = _get_semaphore()
+    started = loop.time()
+    try:
+        await asyncio.wait_for(semaphore.acquire(), timeout=remaining())
+    except asyncio.TimeoutError:
+        raise LLMTimeoutError(f"Gemini call timed out after {timeout:g}s")
+    timing.record("llm_queue", (loop.time() - started) * 1000)
+    # Stays "cancelled" if the consumer closes the stream before it finishes.
+    outcome = "cancelled"
+    usage = None
+    reason = None
+    try:
+        try:
+            chunks = await asyncio.wait_for(
+                get_client().aio.models.generate_content_stream(
+                    contents=prompt,
+                    model=model,
+                    config=config,
+                ),
+                timeout=remaining(),
+            )
+            iterator = chunks.__aiter__()
+            parts = []
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(iterator.__anext__(), timeout=remaining())
+                except StopAsyncIteration:
+                    break
+                # Usage is reported on the final chunks; keep the latest.
+                if chunk.usage_metadata is not None:
+                    usage = chunk.usage_metadata
+                reason = _finish_reason(chunk) or reason
+                if chunk.text:
+                    if not parts:
+                        timing.record("llm_first_token", (loop.time() - started) * 1000)
+                    parts.append(chunk.text)
+                    yield chunk.text
+            if parts and reason == "STOP":
+                await response_cache.aset(key, "".join(parts))
+            outcome = "ok" if parts else "error"
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            raise LLMTimeoutError(f"Gemini call timed out after {timeout:g}s")
+        except Exception:
+            outcome = "error"
+            raise
+    finally:
+        semaphore.release()
+        timing.record("llm", (loop.time() - started) * 1000)
+        metrics.record_llm_call(model, outcome, loop.time() - started, usage)
@@ -1,25 +1,77 @@
 # main.py
-from fastapi import FastAPI, HTTPException, status, Request
+if __name__ == "__main__":
+    # Hand over to server.py before importing the app. The PDF workers are spawned, and spawn
+    # re-runs the parent's __main__ module in every worker; server.py keeps that to milliseconds.
+    import os
+    import runpy
+    runpy.run_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py"), run_name="__main__")
+    raise SystemExit
+from fastapi import Depends, FastAPI, HTTPException, Query, status, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel
-from typing import Optional, List
-import requests
-from urllib.parse import urlparse
-from google import genai
+from pydantic import BaseModel, Field, field_validator
+from typing import TYPE_CHECKING, Literal, Optional, List
+import asyncio
+import base64
+import contextlib
+import json
+import logging
 import os
-import markdown2
-import pdfkit
-from google.genai import types
-import tempfile
 import dotenv
 from datetime import datetime
-# Load environment variables from .env file
+from contextlib import asynccontextmanager
+# Load environment variables from .env file (before local modules read their settings)
 dotenv.load_dotenv()
 
-app = FastAPI(title="Smart Resume Generator")
+import llm_gateway
+from llm_gateway import LLMTimeoutError
+import readme_fetcher
+import pdf_renderer
+import resume_sections
+import prompt_budget
+import readme_preprocess
+import category_classifier
+from prompt_budget import PromptPart
+import timing
+import metrics
+import profile_store
+from profile_store import ProfileNotFoundError
+from pdf_renderer import RendererBusyError, UnknownEngineError, UnknownThemeError
+from fastapi.concurrency import run_in_threadpool
+
+if TYPE_CHECKING:
+    from google.genai import types
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up the PDF worker processes and the Gemini SDK in the background so the
+    # server accepts requests right away; early requests just wait for what they need.
+    warm_up = asyncio.gather(
+        run_in_threadpool(pdf_renderer.start),
+        run_in_threadpool(llm_gateway.preload),
+        return_exceptions=True,
+    )
+    yield
+    warm_up.cancel()
+    # Wait for warm-up to stop so it does not race the shutdown below
+    with contextlib.suppress(asyncio.CancelledError):
+        await warm_up
+    # Release pooled upstream connections and worker processes on shutdown
+    await readme_fetcher.aclose()
+    pdf_renderer.shutdown()
+
+class TimedJSONResponse(JSONResponse):
+    """JSON response whose serialization is recorded as the ``serialize`` span"""
+
+    def render(self, content) -> bytes:
+        with timing.span("serialize"):
+            return super().render(content)
+
+logger = logging.getLogger(__name__)
+
+app = FastAPI(title="Smart Resume Generator", lifespan=lifespan, default_response_class=TimedJSONResponse)
 
 # Configure CORS
 app.add_middleware(
@@ -30,14 +82,69 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Server-Timing headers and the rolling latency window behind /api/debug/profile
+app.add_middleware(timing.TimingMiddleware)
+# Request, token and cost counters behind /api/metrics
+app.add_middleware(metrics.MetricsMiddleware)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Setup Jinja2 templates
 templates = Jinja2Templates(directory="templates")
 
-# Initialize Gemini client
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+# Maximum repositories analyzed at once by a single /api/analyze_repos request
+ANALYZE_MAX_PARALLEL_REPOS = int(os.getenv("ANALYZE_MAX_PARALLEL_REPOS", "8"))
+# Most repositories accepted by a single /api/analyze_repos request
+ANALYZE_MAX_REPOS = int(os.getenv("ANALYZE_MAX_REPOS", "30"))
+
+# Most job descriptions accepted by a single /api/generate_resumes request
+MULTI_JOB_MAX_JOBS = int(os.getenv("MULTI_JOB_MAX_JOBS", "20"))
+
+# Keep proxies from buffering Server-Sent Events responses
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+PROJECT_CATEGORIES = [
+    "Data Science", "Data Analyst", "Web Dev", "Backend Dev", "Frontend Dev", "Full Stack", "DevOps",
+    "ML", "Java Dev", "JS Dev", "Python Dev", "Mobile Dev", "Cloud", "Security", "QA", "Database",
+    "Embedded", "Networking", "AI", "Robotics", "IoT", "Blockchain", "AR/VR", "Game Dev", "UI/UX",
+    "Tech Writing", "Research", "Other",
+]
+# Sent to Gemini as an enum in the structured-output schema
+ProjectCategory = Literal[tuple(PROJECT_CATEGORIES)]
+# Category names without case, spaces or punctuation, for matching near misses
+_CATEGORY_KEYS = {"".join(ch for ch in category.lower() if ch.isalnum()): category for category in PROJECT_CATEGORIES}
+
+# Per-section guidance and output cap for /api/regenerate_sections, matching the full resume prompt
+SECTION_GUIDELINES = {
+    "CONTACT INFORMATION": (
+        "Keep the same contact details as bullet points (Name, Email, Phone, GitHub, LinkedIn).", 800),
+    "OBJECTIVE": (
+        "Craft a concise, role-focused objective (2-3 lines) summarizing the candidate's intent and qualifications, "
+        "tailored to the job description and the candidate's strengths in projects, education, or experience.", 800),
+    "EDUCATION": (
+        "Keep the same degrees, formatted as: Degree, Major, University, Year.", 1000),
+    "WORK EXPERIENCE": (
+        "Keep the same roles, companies and dates. Start each bullet point with a strong action verb and "
+        "emphasize measurable outcomes relevant to the job description.", 2000),
+    "TECHNICAL PROJECTS": (
+        "Keep the same projects. Write exactly three bullet points per project, emphasizing measurable outcomes "
+        "and starting each with a strong action verb (e.g., Developed, Deployed, Engineered). "
+        "Align language and terminology with keywords from the job description.", 3000),
+    "TECHNICAL SKILLS": (
+        "List up to 10 of the most relevant technical skills from the rest of the resume in a comma-separated list, "
+        "prioritizing skills that match the job description.", 800),
+}
+
+# Prompt size limits in (approximate) tokens; oversized inputs are cut at section or sentence boundaries
+PROMPT_TOKEN_BUDGETS = {
+    "project_summary": 2000,
+    "resume": 5000,
+    "section": 4000,
+    "cover_letter": 3000,
+}
+# Short single-value fields such as names and emails
+FIELD_MAX_TOKENS = 50
 
 # ========== Pydantic Models ==========
 class GenerateDescriptionRequest(BaseModel):
@@ -47,13 +154,36 @@ class GenerateDescriptionRequest(BaseModel):
 class GenerateCategoryRequest(BaseModel):
     readme_content: str
     job_description: str
+    language: Optional[str] = None  # the repository's main language, e.g. from GitHub
+
+class GenerateProjectSummaryRequest(BaseModel):
+    readme_content: str
+    job_description: str
+
+class ProjectSummary(BaseModel):
+    description: str
+    category: ProjectCategory
+
+    @field_validator("category", mode="before")
+    @classmethod
+    def known_category(cls, value):
+        """Map variants such as "web dev" onto the vocabulary and anything outside it to Other"""
+        if not isinstance(value, str):
+            return value
+        return _CATEGORY_KEYS.get("".join(ch for ch in value.lower() if ch.isalnum()), "Other")
+
+class AnalyzeReposRequest(BaseModel):
+    repo_urls: List[str] = Field(min_length=1, max_length=ANALYZE_MAX_REPOS)
+    job_description: str = ""
+    profile_id: Optional[str] = None  # save the analyzed projects to this profile
 
 class ProjectData(BaseModel):
     name: str
     description: str
     category: str
+    url: Optional[str] = None
 
-class ResumeData(BaseModel):
+class ResumeProfile(BaseModel):
     name: str
     email: str
     phone: Optional[str] = None
@@ -62,11 +192,44 @@ class ResumeData(BaseModel):
     skills: Optional[str] = None
     education: str
     work_experience: Optional[str] = None
-    job_description: str
     projects: List[ProjectData]
 
+class ResumeData(ResumeProfile):
+    job_description: str
+
+class ProfileUpdate(BaseModel):
+    """Any subset of a profile's fields; only the fields sent are changed."""
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    github: Optional[str] = None
+    linkedin: Optional[str] = None
+    skills: Optional[str] = None
+    education: Optional[str] = None
+    work_experience: Optional[str] = None
+    job_description: Optional[str] = None
+    projects: Optional[List[ProjectData]] = None
+
+class GenerateResumesRequest(BaseModel):
+    profile: ResumeProfile
+    job_descriptions: List[str] = Field(min_length=1, max_length=MULTI_JOB_MAX_JOBS)
+
+class RegenerateSectionsRequest(BaseModel):
+    resume_markdown: str
+    sections: List[str]
+    job_description: str
+    instructions: Optional[str] = None
+
 class GeneratePDFRequest(BaseModel):
     markdown_text: str
+    theme: str = pdf_renderer.DEFAULT_THEME
+    engine: Optional[str] = None  # "wkhtmltopdf" or "native"; defaults to PDF_ENGINE
+
+class BatchPDFDocument(GeneratePDFRequest):
+    filename: str = "resume.pdf"
+
+class GeneratePDFBatchRequest(BaseModel):
+    documents: List[BatchPDFDocument]
 
 class GenerateCoverLetterRequest(BaseModel):
     company_name: str
@@ -76,6 +239,11 @@ class GenerateCoverLetterRequest(BaseModel):
     Candidate_email: Optional[str] = None
     Candidate_phone: Optional[str] = None
 
+class ApplicationPackageRequest(ResumeData):
+    company_name: str
+    theme: str = pdf_renderer.DEFAULT_THEME
+    engine: Optional[str] = None
+
 # ========== Frontend Routes ==========
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
@@ -91,84 +259,548 @@ def api_root():
 def health_check():
     return {"status": "OK", "message": "API is running!"}
 
+@app.get("/api/cache/stats")
+def cache_stats():
+    """Hit/miss counters and sizes for the server-side caches"""
+    return {
+        "llm": llm_gateway.response_cache.stats(),
+        "llm_single_flight": llm_gateway.in_flight.stats(),
+        "readme": readme_fetcher.cache_stats(),
+        "readme_single_flight": readme_fetcher.in_flight.stats(),
+        "pdf": pdf_renderer.stats(),
+    }
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Request rates, latency histograms and Gemini token usage in Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def require_debug_endpoints():
+    """Hide the debug endpoints unless DEBUG_ENDPOINTS_ENABLED=1"""
+    if not timing.DEBUG_ENDPOINTS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+@app.get("/api/debug/profile", dependencies=[Depends(require_debug_endpoints)])
+def debug_profile(path: Optional[str] = None, recent: int = 20):
+    """Per-endpoint and per-stage latency over the most recent requests"""
+    return timing.summary(path, recent)
+
+@app.get("/api/debug/profile/{profile_id}", response_class=PlainTextResponse, dependencies=[Depends(require_debug_endpoints)])
+def debug_profile_report(profile_id: str):
+    """Profiler report for a request sent with X-Profile: 1 (needs PROFILING_ENABLED=1)"""
+    report = timing.profiles.get(profile_id)
+    if report is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return report
+
 @app.post("/api/generate_description")
 async def generate_description_endpoint(request: GenerateDescriptionRequest):
     try:
-        prompt = f"""Create a concise resume project description using this README:
-        {request.readme_content[:5000]}
-        
-        Requirements:
-        - Focus on technical achievements and outcomes
-        - Use action verbs: Developed, Implemented, Optimized
-        - Max 5 bullet points
-        - No markdown formatting
-        - Technical details only"""
-        
-        if request.job_description:
-            prompt += f"\n\nAlign with this job description:\n{request.job_description[:1000]}"
-        
-        config = types.GenerateContentConfig(max_output_tokens=1550, temperature=0.3)
-        response = client.models.generate_content(
-            contents=prompt,
-            model="gemini-2.5-flash",
-            config=config
+        summary = await generate_project_summary(request.readme_content, request.job_description)
+        return {"description": summary["description"]}
+    except LLMTimeoutError as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Error generating description: {str(e)}"
         )
-        return {"description": response.text.strip()}
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error generating description: {str(e)}"
         )
 
+@app.post("/api/generate_project_summary")
+async def generate_project_summary_endpoint(request: GenerateProjectSummaryRequest):
+    try:
+        return await generate_project_summary(request.readme_content, request.job_description)
+    except LLMTimeoutError as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Error generating project summary: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error generating project summary: {str(e)}"
+        )
+
 @app.post("/api/generate_category")
 async def generate_category_endpoint(request: GenerateCategoryRequest):
+    """Categorize a project locally when the classifier is confident, otherwise with Gemini.
+
+    ``confidence`` is always the local classifier's, so the threshold can be tuned
+    against how often Gemini agrees with ``local_category``.
+    """
+    local = await run_in_threadpool(classify_readme, request.readme_content, request.language)
+    metrics.category_confidence.observe(local.confidence)
+    if local.confidence >= category_classifier.CONFIDENCE_THRESHOLD:
+        metrics.category_classifications.inc(source="local")
+        return {"category": local.category, "confidence": local.confidence, "source": "local"}
     try:
-        prompt = f"""Classify this project into ONE category:
-        like = [Data Science, Data Analyst, Web Dev, Backend Dev, Frontend Dev, Full Stack, DevOps, ML, Java Dev, JS Dev, Python Dev, Mobile Dev, Cloud, Security, QA, Database, Embedded, Networking, AI, Robotics, IoT, Blockchain, AR/VR, Game Dev, UI/UX, Tech Writing, Research, Other]
-        
-        README: {request.readme_content[:4000]}
+        summary = await generate_project_summary(request.readme_content, request.job_description)
+        metrics.category_classifications.inc(source="llm")
+        metrics.category_llm_agreement.inc(agrees=str(summary["category"] == local.category).lower())
+        return {
+            "category": summary["category"],
+            "confidence": local.confidence,
+            "source": "llm",
+            "local_category": local.category,
+        }
+    except LLMTimeoutError as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Error generating category: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error generating category: {str(e)}"
+        )
+
+@app.post("/api/generate_resume")
+async def generate_resume_endpoint(resume_data: ResumeData, refresh: bool = False):
+    try:
+        with timing.span("prompt_build"):
+            prompt = build_resume_prompt(resume_data)
         
-        Job Context: {request.job_description[:1000] or "General technical role"}
+        config = llm_gateway.make_config(max_output_tokens=6050, temperature=0.3)
+        text = await llm_gateway.generate(prompt, config, refresh=refresh)
+        return {"resume_markdown": text}
+    except LLMTimeoutError as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Error generating resume: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error generating resume: {str(e)}"
+        )
+
+@app.post("/api/generate_resume/stream")
+async def generate_resume_stream_endpoint(resume_data: ResumeData, refresh: bool = False):
+    """Stream the resume markdown as Server-Sent Events while Gemini generates it"""
+    with timing.span("prompt_build"):
+        prompt = build_resume_prompt(resume_data)
+    config = llm_gateway.make_config(max_output_tokens=6050, temperature=0.3)
+    return StreamingResponse(
+        stream_generation(prompt, config, "Error generating resume", refresh),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+@app.post("/api/generate_resumes")
+async def generate_resumes_endpoint(request: GenerateResumesRequest, refresh: bool = False):
+    """Tailor one profile to many job descriptions concurrently, streaming one NDJSON line per resume"""
+    # The projects section is the same for every job, so it is formatted once
+    projects_section = format_projects(request.profile.projects)
+    config = llm_gateway.make_config(max_output_tokens=6050, temperature=0.3)
+
+    async def generate(index: int, job_description: str) -> dict:
+        resume_data = ResumeData(**request.profile.model_dump(), job_description=job_description)
+        with timing.span("prompt_build"):
+            prompt = build_resume_prompt(resume_data, projects_section)
+        try:
+            # Identical job descriptions share one generation through the gateway's single-flight
+            text = await llm_gateway.generate(prompt, config, refresh=refresh)
+            return {"index": index, "resume_markdown": text}
+        except Exception as e:
+            return {"index": index, "error": f"Error generating resume: {str(e)}"}
+
+    async def stream_results():
+        tasks = [asyncio.ensure_future(generate(i, job)) for i, job in enumerate(request.job_descriptions)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield json.dumps(await finished) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@app.post("/api/regenerate_sections")
+async def regenerate_sections_endpoint(request: RegenerateSectionsRequest, refresh: bool = False):
+    """Regenerate only the requested sections of an existing resume and splice them back in"""
+    titles = []
+    for name in request.sections:
+        title = resume_sections.normalize_title(name)
+        if title is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown section '{name}'. Available sections: {', '.join(resume_sections.SECTIONS)}"
+            )
+        if title not in titles:
+            titles.append(title)
+    if not titles:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No sections requested")
+
+    try:
+        _, current = resume_sections.split_sections(request.resume_markdown)
+        bodies = await asyncio.gather(*(
+            regenerate_section(title, dict(current), request, refresh) for title in titles
+        ))
+        replacements = dict(zip(titles, bodies))
+        return {
+            "resume_markdown": resume_sections.replace_sections(request.resume_markdown, replacements),
+            "sections": replacements,
+        }
+    except LLMTimeoutError as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Error regenerating sections: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error regenerating sections: {str(e)}"
+        )
+
+# The profile handlers are plain functions so FastAPI runs their SQLite calls in its threadpool
+@app.post("/api/profiles", status_code=status.HTTP_201_CREATED)
+def create_profile_endpoint(profile: ProfileUpdate):
+    """Store a profile and return it with the ID later requests refer to"""
+    return profile_store.get_store().create(profile.model_dump(exclude_unset=True))
+
+@app.get("/api/profiles/{profile_id}")
+def get_profile_endpoint(profile_id: str):
+    return get_profile_or_404(profile_id)
+
+@app.patch("/api/profiles/{profile_id}")
+def update_profile_endpoint(profile_id: str, changes: ProfileUpdate):
+    """Change only the fields sent in the body"""
+    return update_profile_or_404(profile_id, changes)
+
+@app.delete("/api/profiles/{profile_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_profile_endpoint(profile_id: str):
+    try:
+        profile_store.get_store().delete(profile_id)
+    except ProfileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+
+@app.delete("/api/profiles/{profile_id}/projects")
+def remove_profile_projects_endpoint(profile_id: str, url: List[str] = Query(...)):
+    """Remove the projects analyzed from the given repository URLs"""
+    try:
+        return profile_store.get_store().remove_projects(profile_id, url)
+    except ProfileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+
+@app.post("/api/profiles/{profile_id}/generate_resume")
+async def generate_profile_resume_endpoint(profile_id: str, changes: Optional[ProfileUpdate] = None, refresh: bool = False):
+    """Generate a resume from a stored profile, applying any changed fields sent first"""
+    resume_data = await run_in_threadpool(profile_resume_data, profile_id, changes)
+    return await generate_resume_endpoint(resume_data, refresh)
+
+@app.post("/api/profiles/{profile_id}/generate_resume/stream")
+async def generate_profile_resume_stream_endpoint(profile_id: str, changes: Optional[ProfileUpdate] = None, refresh: bool = False):
+    """Stream a resume for a stored profile as Server-Sent Events"""
+    resume_data = await run_in_threadpool(profile_resume_data, profile_id, changes)
+    return await generate_resume_stream_endpoint(resume_data, refresh)
+
+@app.get("/api/get_readme")
+async def get_readme_content(url: str):
+    try:
+        return await readme_fetcher.fetch_readme(url)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching README: {str(e)}"
+        )
+
+@app.post("/api/analyze_repos")
+async def analyze_repos_endpoint(request: AnalyzeReposRequest):
+    """Analyze many repositories concurrently, streaming one NDJSON line per repo as it finishes"""
+    semaphore = asyncio.Semaphore(ANALYZE_MAX_PARALLEL_REPOS)
+
+    if request.profile_id is not None:
+        await run_in_threadpool(get_profile_or_404, request.profile_id)
+
+    async def analyze(index: int, url: str) -> dict:
+        result = {"index": index, "url": url}
+        async with semaphore:
+            try:
+                readme = await readme_fetcher.fetch_readme(url)
+                if "error" in readme:
+                    result["error"] = readme["error"]
+                    return result
+                summary = await generate_project_summary(readme["content"], request.job_description)
+                result.update(name=readme["repo_name"], **summary)
+                if request.profile_id is not None:
+                    project = ProjectData(name=readme["repo_name"], url=url, **summary)
+                    await run_in_threadpool(
+                        profile_store.get_store().merge_projects, request.profile_id, [project.model_dump()]
+                    )
+            except Exception as e:
+                result["error"] = str(e)
+        return result
+
+    async def stream_results():
+        urls = [url.strip() for url in request.repo_urls if url.strip()]
+        tasks = [asyncio.ensure_future(analyze(i, url)) for i, url in enumerate(urls)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield json.dumps(await finished) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@app.post("/api/generate_pdf")
+async def generate_pdf_endpoint(request: GeneratePDFRequest):
+    try:
+        pdf = await pdf_renderer.render_pdf(request.markdown_text, request.theme, request.engine)
+        return Response(
+            content=pdf,
+            media_type="application/pdf",
+            headers={"Content-Disposition": 'attachment; filename="resume.pdf"'}
+        )
+    except (UnknownThemeError, UnknownEngineError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"PDF generation failed: {str(e)}"
+        )
+    except RendererBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"PDF generation failed: {str(e)}",
+            headers={"Retry-After": "5"}
+        )
+    except Exception as e:
+        # If wkhtmltopdf is not installed, raise a more specific error
+        error_message = str(e)
+        if "No wkhtmltopdf executable found" in error_message:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"PDF generation failed: {error_message}\nPlease install wkhtmltopdf - https://github.com/JazzCore/python-pdfkit/wiki/Installing-wkhtmltopdf"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"PDF generation failed: {error_message}"
+        )
+
+@app.post("/api/generate_pdf/batch")
+async def generate_pdf_batch_endpoint(request: GeneratePDFBatchRequest):
+    """Render many resumes in parallel and stream them back as one ZIP archive."""
+    if not request.documents:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No documents provided")
+    if len(request.documents) > pdf_renderer.BATCH_MAX_DOCUMENTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many documents: at most {pdf_renderer.BATCH_MAX_DOCUMENTS} per batch"
+        )
+    try:
+        for document in request.documents:
+            pdf_renderer.validate(document.theme, document.engine)
+    except (UnknownThemeError, UnknownEngineError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"PDF generation failed: {str(e)}"
+        )
+
+    return StreamingResponse(
+        pdf_renderer.render_zip([document.model_dump() for document in request.documents]),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="resumes.zip"'}
+    )
+    
+# New Function for generating cover letters with agents for research purposes
+@app.post("/api/generate_cover_letter")
+async def generate_cover_letter_endpoint(request: GenerateCoverLetterRequest, refresh: bool = False):
+    try:
+        # Contact details stay out of the logs
+        logger.debug("Cover letter request for %s", request.company_name)
         
-        Respond ONLY with the category name."""
+        with timing.span("prompt_build"):
+            prompt = build_cover_letter_prompt(request)
+
+        config = llm_gateway.make_config(max_output_tokens=6000, temperature=0.3)
+        text = await llm_gateway.generate(prompt, config, refresh=refresh)
         
-        config = types.GenerateContentConfig(max_output_tokens=650, temperature=0.3)
-        response = client.models.generate_content(
-            contents=prompt,
-            model="gemini-2.5-flash",
-            config=config
+        return {"cover_letter": text.strip()}
+    except LLMTimeoutError as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Error generating cover letter: {str(e)}"
         )
-        return {"category": response.text.strip()}
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error generating category: {str(e)}"
+            detail=f"Error generating cover letter: {str(e)}"
         )
 
-@app.post("/api/generate_resume")
-async def generate_resume_endpoint(resume_data: ResumeData):
+@app.post("/api/generate_application")
+async def generate_application_endpoint(request: ApplicationPackageRequest, refresh: bool = False):
+    """Generate the resume, its PDF and a cover letter in one request.
+
+    The resume and cover letter are generated concurrently and the PDF is
+    rendered as soon as the resume is ready, so the response takes as long as
+    the slower branch rather than the sum of all three steps. A failed PDF or
+    cover letter is reported in ``pdf_error`` or ``cover_letter_error`` next to
+    the resume instead of failing the whole request.
+    """
+    try:
+        pdf_renderer.validate(request.theme, request.engine)
+    except (UnknownThemeError, UnknownEngineError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"PDF generation failed: {str(e)}"
+        )
+
+    # Both prompts describe the same projects; format them once
+    projects_section = format_projects(request.projects)
+    cover_letter_request = GenerateCoverLetterRequest(
+        company_name=request.company_name,
+        job_description=request.job_description,
+        github_projects=projects_section,
+        candidate_name=request.name,
+        Candidate_email=request.email,
+        Candidate_phone=request.phone,
+    )
+
+    async def resume_and_pdf() -> dict:
+        with timing.span("prompt_build"):
+            prompt = build_resume_prompt(request, projects_section)
+        config = llm_gateway.make_config(max_output_tokens=6050, temperature=0.3)
+        resume_markdown = await llm_gateway.generate(prompt, config, refresh=refresh)
+        result = {"resume_markdown": resume_markdown, "pdf_base64": None}
+        try:
+            pdf = await pdf_renderer.render_pdf(resume_markdown, request.theme, request.engine)
+            result["pdf_base64"] = base64.b64encode(pdf).decode("ascii")
+        except Exception as e:
+            # The texts are still worth returning; the client can retry the PDF alone
+            result["pdf_error"] = f"PDF generation failed: {str(e)}"
+        return result
+
+    async def cover_letter() -> str:
+        with timing.span("prompt_build"):
+            prompt = build_cover_letter_prompt(cover_letter_request)
+        config = llm_gateway.make_config(max_output_tokens=6000, temperature=0.3)
+        return (await llm_gateway.generate(prompt, config, refresh=refresh)).strip()
+
     try:
-        prompt = f"""Generate a professional resume in markdown format with the following structure, optimized for relevance to the job description below.
-Job description: {resume_data.job_description[:4500]}
+        # Both branches run to completion; a failed cover letter does not discard the resume
+        resume, letter = await asyncio.gather(resume_and_pdf(), cover_letter(), return_exceptions=True)
+        if isinstance(resume, BaseException):
+            raise resume
+        if isinstance(letter, BaseException):
+            return {**resume, "cover_letter": None, "cover_letter_error": f"Error generating cover letter: {str(letter)}"}
+        return {**resume, "cover_letter": letter}
+    except LLMTimeoutError as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Error generating application: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error generating application: {str(e)}"
+        )
+
+@app.post("/api/generate_cover_letter/stream")
+async def generate_cover_letter_stream_endpoint(request: GenerateCoverLetterRequest, refresh: bool = False):
+    """Stream the cover letter as Server-Sent Events while Gemini generates it"""
+    with timing.span("prompt_build"):
+        prompt = build_cover_letter_prompt(request)
+    config = llm_gateway.make_config(max_output_tokens=6000, temperature=0.3)
+    return StreamingResponse(
+        stream_generation(prompt, config, "Error generating cover letter", refresh),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+# ========== Helper Functions ==========
+async def generate_project_summary(readme_content: str, job_description: str) -> dict:
+    """Generate a project's resume description and category in a single structured-output call"""
+    if job_description:
+        job_context = f"Align with this job description:\n{job_description}"
+    else:
+        job_context = "Job Context: General technical role"
+    with timing.span("prompt_build"):
+        # Drop badges, images, install scripts and boilerplate; the best sections come first.
+        # Off the event loop: a large README takes tens of milliseconds.
+        readme_content = await run_in_threadpool(readme_preprocess.preprocess, readme_content)
+        prompt = prompt_budget.render(
+            """Analyze this project README for a resume:
+        {readme}
+        
+        Return JSON with two fields:
+        
+        "description" - a concise resume project description:
+        - Focus on technical achievements and outcomes
+        - Use action verbs: Developed, Implemented, Optimized
+        - Max 5 bullet points
+        - No markdown formatting
+        - Technical details only
+        
+        "category" - classify this project into ONE category from:
+        [{categories}]
+        Use ONLY the category name.
+
+{job_context}""",
+            PROMPT_TOKEN_BUDGETS["project_summary"],
+            [
+                PromptPart("categories", ", ".join(PROJECT_CATEGORIES), priority=0),
+                PromptPart("readme", readme_content, priority=1),
+                PromptPart("job_context", job_context, priority=2, min_tokens=100, max_tokens=300),
+            ],
+        )
+    
+    config = llm_gateway.make_config(
+        max_output_tokens=2200,
+        temperature=0.3,
+        response_mime_type="application/json",
+        response_schema=ProjectSummary,
+    )
+    # Validated in the gateway before caching, so a malformed response is retried, never cached
+    text = await llm_gateway.generate(prompt, config, validate=ProjectSummary.model_validate_json)
+    summary = ProjectSummary.model_validate_json(text)
+    return {"description": summary.description.strip(), "category": summary.category.strip()}
+
+def classify_readme(readme_content: str, language: Optional[str] = None) -> "category_classifier.Classification":
+    """Run the local category classifier on a README; CPU-bound, so callers use the threadpool"""
+    return category_classifier.classify(
+        readme_preprocess.preprocess(readme_content), language, raw_readme=readme_content
+    )
+
+def build_resume_prompt(resume_data: ResumeData, projects_section: Optional[str] = None) -> str:
+    if projects_section is None:
+        projects_section = format_projects(resume_data.projects)
+    work_experience_section = (
+        f"# WORK EXPERIENCE\n{resume_data.work_experience}" if resume_data.work_experience else ""
+    )
+    contact = [
+        PromptPart(field, value, priority=0, max_tokens=FIELD_MAX_TOKENS)
+        for field, value in (
+            ("name", resume_data.name),
+            ("email", resume_data.email),
+            ("phone", resume_data.phone or 'Not provided'),
+            ("github", resume_data.github or 'Not provided'),
+            ("linkedin", resume_data.linkedin or 'Not provided'),
+        )
+    ]
+    return prompt_budget.render(
+        """Generate a professional resume in markdown format with the following structure, optimized for relevance to the job description below.
+Job description: {job_description}
 # CONTACT INFORMATION
-- Name: {resume_data.name}
-- Email: {resume_data.email}
-- Phone: {resume_data.phone or 'Not provided'}
-- GitHub: {resume_data.github or 'Not provided'}
-- LinkedIn: {resume_data.linkedin or 'Not provided'}
+- Name: {name}
+- Email: {email}
+- Phone: {phone}
+- GitHub: {github}
+- LinkedIn: {linkedin}
 
 # OBJECTIVE
 Craft a concise, role-focused objective (2-3 lines) summarizing the candidate's intent and qualifications. Tailor this section based on the job description provided below and the candidate's strengths in projects, education, or experience.
 
 # EDUCATION
-{resume_data.education} # Format as: Degree, Major, University, Year.
+{education} # Format as: Degree, Major, University, Year.
 Example:'BSc in Computer Science, XYZ University, 2023
          Msc in Data Science, ABC University, 2024'
 
-{f"# WORK EXPERIENCE\\n{resume_data.work_experience}" if resume_data.work_experience else ""}
+{work_experience_section}
 
 # TECHNICAL PROJECTS
-{format_projects(resume_data.projects)}
+{projects_section}
 
 # TECHNICAL SKILLS
 - Extract and list the most relevant technical skills from the project descriptions, work experience, and education.
@@ -187,248 +819,104 @@ Instructions:
 - Avoid vague or generic phrases (e.g., “worked on”, “helped with”).
 - Ensure the resume is ATS-friendly: no special characters, excessive formatting, or unrelated jargon.
 - Do not include any text, explanation, or sections outside the defined structure.
-"""
-        
-        config = types.GenerateContentConfig(max_output_tokens=6050, temperature=0.3)
-        response = client.models.generate_content(
-            contents=prompt,
-            model="gemini-2.5-flash",
-            config=config
-        )
-        return {"resume_markdown": response.text}
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error generating resume: {str(e)}"
-        )
+""",
+        PROMPT_TOKEN_BUDGETS["resume"],
+        contact + [
+            # The candidate's own material comes first; the job description keeps a guaranteed share.
+            PromptPart("education", resume_data.education, priority=1, max_tokens=400),
+            PromptPart("work_experience_section", work_experience_section, priority=2, max_tokens=1200),
+            PromptPart("projects_section", projects_section, priority=3, max_tokens=2000),
+            PromptPart("job_description", resume_data.job_description, priority=4, min_tokens=400, max_tokens=1200),
+        ],
+    )
 
-@app.get("/api/get_readme")
-async def get_readme_content(url: str):
+def get_profile_or_404(profile_id: str) -> dict:
     try:
-        parsed = urlparse(url)
-        path_parts = parsed.path.strip('/').split('/')
-        
-        if len(path_parts) < 2:
-            return {"error": "Invalid URL format"}
-        
-        username, repo = path_parts[:2]
-        
-        # Get actual repository name (second path component)
-        repo_name = path_parts[1] if len(path_parts) >= 2 else None
-        
-        for branch in ['main', 'master']:
-            raw_url = f"https://raw.githubusercontent.com/{username}/{repo_name}/{branch}/README.md"
-            response = requests.get(raw_url)
-            if response.status_code == 200:
-                return {"content": response.text, "repo_name": repo_name}
-        return {"error": "README not found"}
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching README: {str(e)}"
-        )
+        return profile_store.get_store().get(profile_id)
+    except ProfileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
 
-@app.post("/api/generate_pdf")
-async def generate_pdf_endpoint(request: GeneratePDFRequest):
+def update_profile_or_404(profile_id: str, changes: Optional[ProfileUpdate]) -> dict:
     try:
-        # Convert markdown to HTML with extra features enabled
-        html = markdown2.markdown(request.markdown_text, extras=["tables", "cuddled-lists", "header-ids"])
-        
-        # Create a professional and elegant HTML template
-        full_html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-          <meta charset="utf-8">
-          <style>
-            @import url('https://fonts.googleapis.com/css2?family=Roboto:wght@300;400;500;700&family=Open+Sans:wght@300;400;600&display=swap');
-            
-            body {{
-                font-family: 'Open Sans', Arial, sans-serif;
-                color: #333;
-                line-height: 1.6;
-                margin: 0;
-                padding: 12px 10px;
-                max-width: 100%;
-                font-size: 11pt;
-                background: #fff;
-            }}
-            
-            .resume-container {{
-                max-width: 8.5in;
-                margin: 0 auto;
-                border: none;
-                box-shadow: none;
-            }}
-            
-            h1 {{
-                font-family: 'Roboto', sans-serif;
-                font-size: 18pt;
-                font-weight: 700;
-                color: #1a365d;
-                margin-bottom: 10px;
-                padding-bottom: 5px;
-                border-bottom: 2px solid #3182ce;
-            }}
-            
-            h2 {{
-                font-family: 'Roboto', sans-serif;
-                font-size: 14pt;
-                font-weight: 600;
-                color: #2c5282;
-                margin-top: 20px;
-                margin-bottom: 10px;
-                padding-bottom: 3px;
-                border-bottom: 1px solid #bee3f8;
-            }}
-            
-            ul {{
-                margin-top: 8px;
-                margin-left: 20px;
-                padding-left: 0;
-            }}
-            
-            ul li {{
-                margin-bottom: 6px;
-                list-style-type: square;
-            }}
-            
-            /* Contact information section */
-            .contact-info {{
-                display: flex;
-                flex-wrap: wrap;
-                gap: 12px;
-                margin-bottom: 15px;
-                font-size: 10pt;
-            }}
-            
-            .contact-info p {{
-                margin: 0;
-                display: inline-block;
-            }}
-            
-            /* Education section */
-            .education-entry {{
-                margin-bottom: 12px;
-            }}
-            
-            /* Projects section */
-            .project-title {{
-                font-weight: 600;
-            }}
-            
-            /* Skills section */
-            .skills-list {{
-                display: flex;
-                flex-wrap: wrap;
-                gap: 8px;
-                margin-top: 8px;
-            }}
-            
-            .skill-item {{
-                background-color: #e2e8f0;
-                padding: 3px 8px;
-                border-radius: 3px;
-                font-size: 9pt;
-            }}
-            
-            /* Page break handling */
-            .page-break {{
-                page-break-after: always;
-            }}
-            
-            /* Print-specific styles */
-            @media print {{
-                body {{
-                    padding: 0;
-                    margin: 12mm 10mm 12mm 10mm;
-                }}
-                
-                .resume-container {{
-                    box-shadow: none;
-                    border: none;
-                }}
-            }}
-          </style>
-        </head>
-        <body>
-          <div class="resume-container">
-            {html}
-          </div>
-        </body>
-        </html>
-        """
-        
-        # Configure PDF rendering options for better quality
-        options = {
-            'quiet': '',
-            'encoding': "UTF-8",
-            'enable-local-file-access': '',
-            'margin-top': '12mm',     # 1.2 cm top margin
-            'margin-right': '10mm',   # 1.0 cm right margin
-            'margin-bottom': '12mm',  # 1.2 cm bottom margin
-            'margin-left': '10mm',    # 1.0 cm left margin
-            'page-size': 'Letter',
-            'dpi': '300',
-            'image-quality': '100',
-            'enable-smart-shrinking': '',
-        }
-        
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            try:
-                pdfkit.from_string(full_html, tmp.name, options=options)
-                return FileResponse(
-                    tmp.name,
-                    media_type="application/pdf",
-                    filename="resume.pdf"
-                )
-            except Exception as e:
-                # If wkhtmltopdf is not installed, raise a more specific error
-                error_message = str(e)
-                if "No wkhtmltopdf executable found" in error_message:
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"PDF generation failed: {error_message}\nPlease install wkhtmltopdf - https://github.com/JazzCore/python-pdfkit/wiki/Installing-wkhtmltopdf"
-                    )
-                else:
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"PDF generation failed: {error_message}"
-                    )
-    except HTTPException:
-        raise
-    except Exception as e:
+        return profile_store.get_store().update(
+            profile_id, changes.model_dump(exclude_unset=True) if changes else {}
+        )
+    except ProfileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+
+def profile_resume_data(profile_id: str, changes: Optional[ProfileUpdate]) -> ResumeData:
+    """Save ``changes`` to the profile and return it as ResumeData, or 400 if fields are missing"""
+    profile = update_profile_or_404(profile_id, changes)
+    missing = [field for field in ("name", "email", "education", "job_description") if not profile.get(field)]
+    if missing:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"PDF generation failed: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Profile is missing required fields: {', '.join(missing)}"
         )
-    
-# New Function for generating cover letters with agents for research purposes
-@app.post("/api/generate_cover_letter")
-async def generate_cover_letter_endpoint(request: GenerateCoverLetterRequest):
-    try:
-        # Log candidate information
-        print(f"Cover letter request - Name: {request.candidate_name}, Email: {request.Candidate_email}, Phone: {request.Candidate_phone}")
-        
-        # Prepare the prompt for cover letter generation
-        prompt = f"""
+    return ResumeData(**{**profile, "projects": profile.get("projects") or []})
+
+def build_section_prompt(title: str, current: dict, request: RegenerateSectionsRequest) -> str:
+    guidelines, _ = SECTION_GUIDELINES[title]
+    context = "\n\n".join(f"# {other}\n{body}" for other, body in current.items() if other != title)
+    extra_instructions = (
+        f"- {prompt_budget.truncate(request.instructions, 200)}\n" if request.instructions else ""
+    )
+    return prompt_budget.render(
+        """Rewrite the {title} section of the resume below, optimized for relevance to the job description.
+Job description: {job_description}
+
+Rest of the resume (for context only, do not repeat it):
+{context}
+
+Current {title} section:
+{section}
+
+Instructions:
+- {guidelines}
+{extra_instructions}- Use markdown formatting: `-` for bullet points.
+- Maintain a professional, concise tone and keep the resume ATS-friendly.
+- Output only the body of the {title} section, without the section header or any explanation.
+""",
+        PROMPT_TOKEN_BUDGETS["section"],
+        [
+            PromptPart("title", title, priority=0),
+            PromptPart("guidelines", guidelines, priority=0),
+            PromptPart("section", current.get(title) or 'Not provided', priority=1, max_tokens=1500),
+            PromptPart("extra_instructions", extra_instructions, priority=0),
+            PromptPart("job_description", request.job_description, priority=2, min_tokens=300, max_tokens=1200),
+            # Other sections are only context; they get whatever budget is left
+            PromptPart("context", context or 'Not provided', priority=3),
+        ],
+    )
+
+async def regenerate_section(title: str, current: dict, request: RegenerateSectionsRequest, refresh: bool = False) -> str:
+    _, max_output_tokens = SECTION_GUIDELINES[title]
+    config = llm_gateway.make_config(max_output_tokens=max_output_tokens, temperature=0.3)
+    with timing.span("prompt_build"):
+        prompt = build_section_prompt(title, current, request)
+    text = await llm_gateway.generate(prompt, config, refresh=refresh)
+    return resume_sections.strip_heading(title, text)
+
+def build_cover_letter_prompt(request: GenerateCoverLetterRequest) -> str:
+    return prompt_budget.render(
+        """
 You are an expert career coach and professional writer. 
-Generate a compelling and polished cover letter for {request.candidate_name or 'the candidate'} applying to {request.company_name}.
+Generate a compelling and polished cover letter for {candidate} applying to {company_name}.
 
 Candidate Information:
-- Name: {request.candidate_name}
-- Email: {request.Candidate_email}
-- Phone: {request.Candidate_phone}
+- Name: {name}
+- Email: {email}
+- Phone: {phone}
 
 Job Description:
-{request.job_description}
+{job_description}
 
 GitHub Projects / Experience:
-{request.github_projects or 'No specific projects mentioned'}
+{github_projects}
 
 Instructions:
 1. Use a formal business letter format with the candidate’s details at the top.  
-2. Address the letter to the Hiring Manager at {request.company_name}.  
+2. Address the letter to the Hiring Manager at {company_name}.  
 3. In the introduction: clearly state the role being applied for and show enthusiasm.  
 4. In the body:  
    - Highlight the candidate’s strongest skills and align them with the job description.  
@@ -437,32 +925,39 @@ Instructions:
 5. Keep the letter concise (3-4 short paragraphs, max 300 words).  
 6. End with a confident closing: express eagerness for an interview, thank the employer, and sign off professionally.  
 
-Output should be ready-to-send, professional, and tailored to {request.company_name}.
-"""
+Output should be ready-to-send, professional, and tailored to {company_name}.
+""",
+        PROMPT_TOKEN_BUDGETS["cover_letter"],
+        [
+            PromptPart("candidate", request.candidate_name or 'the candidate', priority=0, max_tokens=FIELD_MAX_TOKENS),
+            PromptPart("company_name", request.company_name, priority=0, max_tokens=FIELD_MAX_TOKENS),
+            PromptPart("name", str(request.candidate_name), priority=0, max_tokens=FIELD_MAX_TOKENS),
+            PromptPart("email", str(request.Candidate_email), priority=0, max_tokens=FIELD_MAX_TOKENS),
+            PromptPart("phone", str(request.Candidate_phone), priority=0, max_tokens=FIELD_MAX_TOKENS),
+            PromptPart("job_description", request.job_description, priority=1, min_tokens=400, max_tokens=1500),
+            PromptPart(
+                "github_projects", request.github_projects or 'No specific projects mentioned',
+                priority=2, max_tokens=1500,
+            ),
+        ],
+    )
 
-        config = types.GenerateContentConfig(max_output_tokens=6000, temperature=0.3)
-        response = client.models.generate_content(
-            contents=prompt,
-            model="gemini-2.5-flash",
-            config=config
-        )
-        
-        return {"cover_letter": response.text.strip()}
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    """Format a Server-Sent Events message carrying a JSON payload"""
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data)}\n\n"
+
+async def stream_generation(prompt: str, config: "types.GenerateContentConfig", error_prefix: str, refresh: bool = False):
+    """Relay a streaming Gemini generation as SSE text events, ending with a done or error event"""
+    try:
+        async for chunk in llm_gateway.stream(prompt, config, refresh=refresh):
+            yield sse_event({"text": chunk})
+        yield sse_event({}, event="done")
     except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error generating cover letter: {str(e)}"
-        )
+        yield sse_event({"detail": f"{error_prefix}: {str(e)}"}, event="error")
 
-# ========== Helper Functions ==========
 def format_projects(projects: List[ProjectData]) -> str:
     return "\n".join(
         f"- {p.name} ({p.category}): {p.description}"
         for p in projects
     )
-
-if __name__ == "__main__":
-    import uvicorn
-    # Get port from environment variable or use default 8000 7860 FOR HUGGINGFACE SPACES.
-    port = int(os.environ.get("PORT", 7860))
-    uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
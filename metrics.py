@@ -0,0 +1,212 @@
+# metrics.py
+"""Request, LLM token and cost metrics in the Prometheus text format.
+
+``MetricsMiddleware`` counts every HTTP request and its latency by route, and
+remembers which route is being served so that ``llm_gateway`` can attribute
+each Gemini call (tokens, latency, outcome) to the endpoint that made it.
+``render()`` produces the body served at ``/api/metrics``.
+
+Counters live in the memory of each server process: with ``SERVER_WORKERS``
+above 1 every scrape sees only the worker that answered it.
+"""
+import os
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# USD per million tokens: (uncached input, cached input, output incl. thinking).
+# Override the default model's prices with LLM_PRICE_{INPUT,CACHED,OUTPUT}_PER_MTOK.
+PRICES_PER_MTOK: Dict[str, Tuple[float, float, float]] = {
+    "gemini-2.5-flash": (
+        float(os.getenv("LLM_PRICE_INPUT_PER_MTOK", "0.30")),
+        float(os.getenv("LLM_PRICE_CACHED_PER_MTOK", "0.075")),
+        float(os.getenv("LLM_PRICE_OUTPUT_PER_MTOK", "2.50")),
+    ),
+}
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+LLM_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 90)
+
+_scope: ContextVar[Optional[dict]] = ContextVar("metrics_scope", default=None)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[Labels, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] += amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float]):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        # Per label set: [count in each bucket (not cumulative), sum, count]
+        self._values: Dict[Labels, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (bucket_counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    cumulative += bucket_count
+                    bucket_labels = labels + (("le", _format_value(bound)),)
+                    lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        '%s="%s"' % (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+http_requests = Counter("http_requests_total", "HTTP requests by method, route and status code.")
+http_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency until the last body byte, by route.", HTTP_BUCKETS,
+)
+llm_requests = Counter(
+    "llm_requests_total", "Gemini calls by endpoint, model and outcome (ok, error, timeout, cancelled, cache_hit).",
+)
+llm_duration = Histogram(
+    "llm_request_duration_seconds", "Latency of Gemini calls that reached the API, by endpoint and model.",
+    LLM_BUCKETS,
+)
+llm_tokens = Counter(
+    "llm_tokens_total", "Tokens billed by Gemini, by endpoint, model and type (prompt, cached, output, thinking).",
+)
+llm_cost = Counter("llm_cost_usd_total", "Estimated Gemini cost in USD, by endpoint and model.")
+
+category_classifications = Counter(
+    "category_classifications_total", "Project categorizations by path taken (local classifier or llm).",
+)
+category_confidence = Histogram(
+    "category_local_confidence", "Confidence of the local category classifier.",
+    (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1),
+)
+category_llm_agreement = Counter(
+    "category_llm_agreement_total", "Gemini categorizations by whether they match the local classifier's guess.",
+)
+
+REGISTRY = (
+    http_requests, http_duration, llm_requests, llm_duration, llm_tokens, llm_cost,
+    category_classifications, category_confidence, category_llm_agreement,
+)
+
+
+def current_endpoint() -> str:
+    """Route template of the request being served, or ``none`` outside a request."""
+    scope = _scope.get()
+    if scope is None:
+        return "none"
+    route = scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+def record_llm_call(model: str, outcome: str, duration: Optional[float] = None, usage=None) -> None:
+    """Record one Gemini call made for the current endpoint.
+
+    ``usage`` is the response's ``usage_metadata``; ``prompt_token_count``
+    already includes ``cached_content_token_count``.
+    """
+    endpoint = current_endpoint()
+    llm_requests.inc(endpoint=endpoint, model=model, outcome=outcome)
+    if duration is not None:
+        llm_duration.observe(duration, endpoint=endpoint, model=model)
+    if usage is None:
+        return
+    prompt = usage.prompt_token_count or 0
+    cached = usage.cached_content_token_count or 0
+    output = usage.candidates_token_count or 0
+    # Thinking tokens are only reported by newer SDK versions; they are billed as output.
+    thinking = getattr(usage, "thoughts_token_count", None) or 0
+    for kind, count in (("prompt", prompt), ("cached", cached), ("output", output), ("thinking", thinking)):
+        if count:
+            llm_tokens.inc(count, endpoint=endpoint, model=model, type=kind)
+    prices = PRICES_PER_MTOK.get(model)
+    if prices is not None:
+        input_price, cached_price, output_price = prices
+        cost = ((prompt - cached) * input_price + cached * cached_price + (output + thinking) * output_price) / 1e6
+        llm_cost.inc(cost, endpoint=endpoint, model=model)
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and latency per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        token = _scope.set(scope)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _scope.reset(token)
+            # The router stores the matched route in the scope; unmatched paths share one label.
+            path = getattr(scope.get("route"), "path", "unmatched")
+            http_requests.inc(method=scope["method"], path=path, status=str(status))
+            http_duration.observe(time.perf_counter() - start, method=scope["method"], path=path)
@@ -0,0 +1,457 @@
+# native_pdf.py
+"""Pure-Python PDF renderer for the markdown the resume prompt produces.
+
+Handles headers, bullet and numbered lists, paragraphs, horizontal rules,
+bold/italic text, inline code and links. It writes the PDF directly using the
+standard Helvetica fonts (metrics in ``pdf_font_metrics``), so there is no
+subprocess and no font embedding and a resume renders in milliseconds. It
+does not support arbitrary HTML or CSS; styling mirrors the default theme.
+"""
+import re
+import zlib
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, Union
+
+from pdf_font_metrics import FIRST_CHAR, WIDTHS
+
+try:
+    from unidecode import unidecode
+except ImportError:  # optional: without it, characters outside WinAnsi become '?'
+    unidecode = None
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792  # US Letter, in points
+MARGIN_X = 40
+MARGIN_TOP = 40
+MARGIN_BOTTOM = 40
+
+BODY_SIZE = 10.5
+LEADING = 1.45
+TEXT_COLOR = "#333333"
+LINK_COLOR = "#2b6cb0"
+BULLET_INDENT = 14
+PARAGRAPH_SPACING = 4
+LIST_ITEM_SPACING = 1.5
+
+# level -> (font size, color, rule color, rule width, space before, space after)
+HEADING_STYLES = {
+    1: (17, "#1a365d", "#3182ce", 1.5, 4, 8),
+    2: (13.5, "#2c5282", "#bee3f8", 0.75, 14, 6),
+    3: (11.5, "#2c5282", None, 0, 10, 4),
+}
+
+# (bold, italic) -> (resource name, base font)
+FONTS = {
+    (False, False): ("F1", "Helvetica"),
+    (True, False): ("F2", "Helvetica-Bold"),
+    (False, True): ("F3", "Helvetica-Oblique"),
+    (True, True): ("F4", "Helvetica-BoldOblique"),
+}
+
+_ESCAPABLE = "\\`*_{}[]()#+-.!|"
+
+
+@dataclass(frozen=True)
+class Span:
+    text: str
+    bold: bool = False
+    italic: bool = False
+    url: Optional[str] = None
+
+
+# ---------- Markdown parsing ----------
+
+# Italic text stops at the next marker of its kind, so an unclosed run of markers such as
+# "_a _b _c" costs linear rather than quadratic time. Link URLs may hold one level of
+# balanced parentheses, as in Wikipedia links.
+_INLINE = re.compile(
+    r"\*\*(?P<b1>.+?)\*\*"
+    r"|__(?P<b2>.+?)__"
+    r"|\[(?P<link_text>[^\]]+)\]\((?P<link_url>(?:[^()\s]|\([^()\s]*\))+)\)"
+    r"|`(?P<code>[^`]+)`"
+    r"|<(?P<autolink>https?://[^>\s]+)>"
+    r"|(?<![\w*])\*(?!\s)(?P<i1>[^*\n]+)(?<!\s)\*(?![\w*])"
+    r"|(?<![\w_])_(?!\s)(?P<i2>[^_\n]+)(?<!\s)_(?![\w_])"
+)
+# Closing hashes only count after whitespace, so "C#" keeps its "#".
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)(?:\s+#+)?\s*$")
+_RULE = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+_BULLET = re.compile(r"^(\s*)[-*+]\s+(.*)$")
+_NUMBERED = re.compile(r"^(\s*)(\d+)[.)]\s+(.*)$")
+_TABLE_SEPARATOR = re.compile(r"^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$")
+
+
+def _protect_escapes(text: str) -> str:
+    return re.sub(r"\\([%s])" % re.escape(_ESCAPABLE), lambda m: chr(0xE000 + ord(m.group(1))), text)
+
+
+def _restore_escapes(text: str) -> str:
+    return re.sub("[\ue000-\ue0ff]", lambda m: chr(ord(m.group(0)) - 0xE000), text)
+
+
+def parse_inline(text: str, bold: bool = False, italic: bool = False, url: Optional[str] = None) -> List[Span]:
+    spans = []
+    pos = 0
+    for m in _INLINE.finditer(text):
+        if m.start() > pos:
+            spans.append(Span(_restore_escapes(text[pos:m.start()]), bold, italic, url))
+        groups = m.groupdict()
+        if groups["b1"] or groups["b2"]:
+            spans += parse_inline(groups["b1"] or groups["b2"], True, italic, url)
+        elif groups["link_text"]:
+            spans += parse_inline(groups["link_text"], bold, italic, _restore_escapes(groups["link_url"]))
+        elif groups["code"]:
+            spans.append(Span(_restore_escapes(groups["code"]), bold, italic, url))
+        elif groups["autolink"]:
+            spans.append(Span(groups["autolink"], bold, italic, groups["autolink"]))
+        else:
+            spans += parse_inline(groups["i1"] or groups["i2"], bold, True, url)
+        pos = m.end()
+    if pos < len(text):
+        spans.append(Span(_restore_escapes(text[pos:]), bold, italic, url))
+    return spans
+
+
+def parse_blocks(markdown_text: str) -> List[tuple]:
+    """Split markdown into ("heading", level, text), ("bullet", depth, marker, text),
+    ("paragraph", text), ("code", text) and ("rule",) blocks.
+
+    Inline markup is left in the text for ``parse_inline``; code lines are literal.
+    """
+    blocks: List[list] = []
+    paragraph: List[str] = []
+    in_code = False
+
+    def flush_paragraph():
+        if paragraph:
+            blocks.append(["paragraph", " ".join(paragraph)])
+            paragraph.clear()
+
+    for raw_line in _protect_escapes(markdown_text.replace("\t", "    ")).splitlines():
+        line = raw_line.rstrip()
+        if line.lstrip().startswith("```"):
+            flush_paragraph()
+            in_code = not in_code
+            continue
+        if in_code:
+            if line.strip():
+                blocks.append(["code", _restore_escapes(line.strip())])
+            continue
+        if not line.strip():
+            flush_paragraph()
+            continue
+        if _TABLE_SEPARATOR.match(line) and "-" in line and "|" in line:
+            continue
+
+        heading = _HEADING.match(line)
+        bullet = _BULLET.match(line)
+        numbered = _NUMBERED.match(line)
+        if heading:
+            flush_paragraph()
+            blocks.append(["heading", min(len(heading.group(1)), 3), heading.group(2)])
+        elif _RULE.match(line):
+            flush_paragraph()
+            blocks.append(["rule"])
+        elif bullet:
+            flush_paragraph()
+            blocks.append(["bullet", min(len(bullet.group(1)) // 2, 3), None, bullet.group(2)])
+        elif numbered:
+            flush_paragraph()
+            blocks.append(["bullet", min(len(numbered.group(1)) // 2, 3), numbered.group(2) + ".", numbered.group(3)])
+        elif "|" in line and line.strip().startswith("|"):
+            flush_paragraph()
+            cells = [cell.strip() for cell in line.strip().strip("|").split("|")]
+            blocks.append(["paragraph", "   ".join(cells)])
+        elif blocks and blocks[-1][0] == "bullet" and not paragraph and raw_line[:1].isspace():
+            # Indented continuation of the previous list item
+            blocks[-1][3] += " " + line.strip()
+        else:
+            paragraph.append(line.strip())
+    flush_paragraph()
+    return [tuple(block) for block in blocks]
+
+
+# ---------- Text measurement ----------
+
+def _encode(text: str) -> bytes:
+    out = bytearray()
+    for char in text:
+        try:
+            out += char.encode("cp1252")
+        except UnicodeEncodeError:
+            fallback = unidecode(char) if unidecode is not None else "?"
+            out += fallback.encode("cp1252", errors="replace")
+    return bytes(out)
+
+
+def _text_width(data: bytes, font: str, size: float) -> float:
+    widths = WIDTHS[font]
+    return sum(widths[b - FIRST_CHAR] for b in data if b >= FIRST_CHAR) * size / 1000
+
+
+def _escape(data: bytes) -> bytes:
+    return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _rgb(color: str) -> Tuple[float, float, float]:
+    color = color.lstrip("#")
+    return tuple(int(color[i:i + 2], 16) / 255 for i in (0, 2, 4))
+
+
+def _color_op(color: str, operator: str) -> str:
+    r, g, b = _rgb(color)
+    return f"{r:.3f} {g:.3f} {b:.3f} {operator}"
+
+
+# ---------- Layout ----------
+
+@dataclass
+class _Fragment:
+    data: bytes
+    span: Span
+    width: float
+
+
+class _Page:
+    def __init__(self):
+        self.ops: List[str] = []
+        self.links: List[Tuple[float, float, float, float, str]] = []
+
+
+class _Layout:
+    def __init__(self):
+        self.pages: List[_Page] = []
+        self._new_page()
+
+    def _new_page(self):
+        self.page = _Page()
+        self.pages.append(self.page)
+        self.y = PAGE_HEIGHT - MARGIN_TOP
+
+    @property
+    def at_page_top(self) -> bool:
+        return self.y >= PAGE_HEIGHT - MARGIN_TOP
+
+    def ensure_space(self, height: float):
+        if self.y - height < MARGIN_BOTTOM and not self.at_page_top:
+            self._new_page()
+
+    def skip(self, height: float):
+        if not self.at_page_top:
+            self.y -= height
+
+    def wrap(self, spans: List[Span], size: float, width: float) -> List[List[Tuple[float, _Fragment]]]:
+        """Greedy line breaking at whitespace; returns lines of (x offset, fragment)."""
+        words: List[Tuple[bool, List[_Fragment]]] = []
+        current: List[_Fragment] = []
+        space_before = space_pending = False
+        for span in spans:
+            font = FONTS[(span.bold, span.italic)][1]
+            for piece in re.findall(r"\S+|\s+", span.text):
+                if piece.isspace():
+                    if current:
+                        words.append((space_before, current))
+                        current = []
+                    space_pending = True
+                    continue
+                if not current:
+                    space_before, space_pending = space_pending, False
+                data = _encode(piece)
+                current.append(_Fragment(data, span, _text_width(data, font, size)))
+        if current:
+            words.append((space_before, current))
+
+        space_width = WIDTHS["Helvetica"][0] * size / 1000
+        lines: List[List[Tuple[float, _Fragment]]] = [[]]
+        x = 0.0
+        for has_space, fragments in words:
+            word_width = sum(fragment.width for fragment in fragments)
+            gap = space_width if has_space and lines[-1] else 0.0
+            if lines[-1] and x + gap + word_width > width:
+                lines.append([])
+                x, gap = 0.0, 0.0
+            x += gap
+            for fragment in fragments:
+                if fragment.width > width - x and fragment.width > width:
+                    # A single unbreakable token wider than the line (e.g. a long URL)
+                    for chunk in self._split_long(fragment, size, width, x):
+                        if x > 0 and x + chunk.width > width:
+                            lines.append([])
+                            x = 0.0
+                        lines[-1].append((x, chunk))
+                        x += chunk.width
+                    continue
+                lines[-1].append((x, fragment))
+                x += fragment.width
+        return [line for line in lines if line]
+
+    @staticmethod
+    def _split_long(fragment: _Fragment, size: float, width: float, x: float) -> List[_Fragment]:
+        font = FONTS[(fragment.span.bold, fragment.span.italic)][1]
+        chunks, start, available = [], 0, width - x
+        for end in range(1, len(fragment.data) + 1):
+            if _text_width(fragment.data[start:end], font, size) > available and end - 1 > start:
+                chunks.append(fragment.data[start:end - 1])
+                start, available = end - 1, width
+        chunks.append(fragment.data[start:])
+        return [_Fragment(chunk, fragment.span, _text_width(chunk, font, size)) for chunk in chunks]
+
+    def draw_lines(self, lines, size: float, x0: float, color: str, on_first_line=None):
+        line_height = size * LEADING
+        for index, line in enumerate(lines):
+            self.ensure_space(line_height)
+            baseline = self.y - (line_height - size) / 2 - size * 0.8
+            if index == 0 and on_first_line is not None:
+                on_first_line(baseline)
+            link_start = None
+            for position, (x, fragment) in enumerate(line):
+                span = fragment.span
+                resource = FONTS[(span.bold, span.italic)][0]
+                fill = LINK_COLOR if span.url else color
+                self.page.ops.append(
+                    f"BT /{resource} {size:g} Tf {_color_op(fill, 'rg')} "
+                    f"{x0 + x:.2f} {baseline:.2f} Td ({_escape(fragment.data).decode('latin-1')}) Tj ET"
+                )
+                if span.url:
+                    self.page.ops.append(
+                        f"{_color_op(LINK_COLOR, 'RG')} 0.5 w {x0 + x:.2f} {baseline - 1.5:.2f} m "
+                        f"{x0 + x + fragment.width:.2f} {baseline - 1.5:.2f} l S"
+                    )
+                    if link_start is None:
+                        link_start = x
+                    following = line[position + 1][1].span.url if position + 1 < len(line) else None
+                    if following != span.url:
+                        self.page.links.append(
+                            (x0 + link_start, baseline - 3, x0 + x + fragment.width, baseline + size * 0.8, span.url)
+                        )
+                        link_start = None
+            self.y -= line_height
+
+    def heading(self, level: int, text: str):
+        size, color, rule_color, rule_width, before, after = HEADING_STYLES[level]
+        spans = [Span(s.text, True, s.italic, s.url) for s in parse_inline(text)]
+        lines = self.wrap(spans, size, PAGE_WIDTH - 2 * MARGIN_X)
+        self.skip(before)
+        # Keep the heading together with at least two lines of what follows
+        self.ensure_space(len(lines) * size * LEADING + after + 2 * BODY_SIZE * LEADING)
+        self.draw_lines(lines, size, MARGIN_X, color)
+        if rule_color:
+            self.y -= 1
+            self.page.ops.append(
+                f"{_color_op(rule_color, 'RG')} {rule_width:g} w "
+                f"{MARGIN_X} {self.y:.2f} m {PAGE_WIDTH - MARGIN_X} {self.y:.2f} l S"
+            )
+        self.y -= after
+
+    def paragraph(self, text: str, literal: bool = False):
+        spans = [Span(text)] if literal else parse_inline(text)
+        lines = self.wrap(spans, BODY_SIZE, PAGE_WIDTH - 2 * MARGIN_X)
+        self.draw_lines(lines, BODY_SIZE, MARGIN_X, TEXT_COLOR)
+        self.y -= PARAGRAPH_SPACING
+
+    def bullet(self, depth: int, marker: Optional[str], text: str):
+        indent = MARGIN_X + BULLET_INDENT * (depth + 1)
+        lines = self.wrap(parse_inline(text), BODY_SIZE, PAGE_WIDTH - MARGIN_X - indent)
+
+        def draw_marker(baseline: float):
+            if marker:
+                data = _encode(marker)
+                width = _text_width(data, "Helvetica", BODY_SIZE)
+                self.page.ops.append(
+                    f"BT /F1 {BODY_SIZE:g} Tf {_color_op(TEXT_COLOR, 'rg')} "
+                    f"{indent - 4 - width:.2f} {baseline:.2f} Td ({_escape(data).decode('latin-1')}) Tj ET"
+                )
+            else:
+                # Square bullet, matching the theme's list-style-type: square
+                self.page.ops.append(
+                    f"{_color_op(TEXT_COLOR, 'rg')} {indent - 9:.2f} {baseline + BODY_SIZE * 0.25:.2f} 3.5 3.5 re f"
+                )
+
+        self.draw_lines(lines, BODY_SIZE, indent, TEXT_COLOR, on_first_line=draw_marker)
+        self.y -= LIST_ITEM_SPACING
+
+    def rule(self):
+        self.ensure_space(12)
+        self.y -= 6
+        self.page.ops.append(
+            f"{_color_op('#cbd5e0', 'RG')} 0.75 w {MARGIN_X} {self.y:.2f} m {PAGE_WIDTH - MARGIN_X} {self.y:.2f} l S"
+        )
+        self.y -= 6
+
+
+# ---------- PDF serialisation ----------
+
+def _pdf_string(text: str) -> str:
+    return "(" + _escape(_encode(text)).decode("latin-1") + ")"
+
+
+def _serialize(pages: List[_Page]) -> bytes:
+    objects: List[bytes] = []
+
+    def add(body: Union[str, bytes]) -> int:
+        objects.append(body.encode("latin-1") if isinstance(body, str) else body)
+        return len(objects)
+
+    catalog = add("")  # placeholders, filled in once page ids are known
+    pages_id = add("")
+    font_ids = {
+        resource: add(f"<< /Type /Font /Subtype /Type1 /BaseFont /{base} /Encoding /WinAnsiEncoding >>")
+        for resource, base in FONTS.values()
+    }
+    fonts = " ".join(f"/{resource} {object_id} 0 R" for resource, object_id in font_ids.items())
+
+    page_ids = []
+    for page in pages:
+        content = zlib.compress("\n".join(page.ops).encode("latin-1"))
+        content_id = add(
+            f"<< /Length {len(content)} /Filter /FlateDecode >>\nstream\n".encode("latin-1")
+            + content + b"\nendstream"
+        )
+        annots = [
+            add(
+                f"<< /Type /Annot /Subtype /Link /Rect [{x1:.2f} {y1:.2f} {x2:.2f} {y2:.2f}] "
+                f"/Border [0 0 0] /A << /S /URI /URI {_pdf_string(url)} >> >>"
+            )
+            for x1, y1, x2, y2, url in page.links
+        ]
+        annots_entry = f" /Annots [{' '.join(f'{a} 0 R' for a in annots)}]" if annots else ""
+        page_ids.append(add(
+            f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << {fonts} >> >> /Contents {content_id} 0 R{annots_entry} >>"
+        ))
+
+    objects[catalog - 1] = f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode("latin-1")
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[pages_id - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode("latin-1")
+    info = add("<< /Producer (Smart Resume Generator native renderer) >>")
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode("latin-1") + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root {catalog} 0 R /Info {info} 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode("latin-1")
+    return bytes(out)
+
+
+def render_markdown(markdown_text: str) -> bytes:
+    """Render resume markdown to PDF bytes."""
+    layout = _Layout()
+    for block in parse_blocks(markdown_text):
+        kind = block[0]
+        if kind == "heading":
+            layout.heading(block[1], block[2])
+        elif kind == "bullet":
+            layout.bullet(block[1], block[2], block[3])
+        elif kind == "rule":
+            layout.rule()
+        elif kind == "code":
+            layout.paragraph(block[1], literal=True)
+        elif block[1]:
+            layout.paragraph(block[1])
+    return _serialize(layout.pages)
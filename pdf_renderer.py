@@ -0,0 +1,363 @@
+# pdf_renderer.py
+"""PDF rendering off the event loop.
+
+Rendering runs in a bounded pool of worker processes that are started and
+warmed up (pdfkit imported, wkhtmltopdf located) when the app starts, so a
+request never pays for that and never blocks other requests while a PDF is
+produced. Submissions beyond the queue limit are rejected with
+``RendererBusyError`` instead of piling up.
+
+Two engines are available: ``wkhtmltopdf`` (HTML + theme CSS through pdfkit,
+the most faithful styling) and ``native`` (``native_pdf``, a pure-Python
+writer that skips the HTML step and the subprocess entirely and renders in a
+few milliseconds, with the default look only). ``PDF_ENGINE`` picks the
+default and requests may choose per call.
+
+``render_zip`` renders a batch of documents concurrently on the pool and
+streams them back as a ZIP archive, each file written as soon as it is done.
+
+PDFs are produced in memory and kept in a bounded LRU cache keyed on the
+markdown, theme and engine, so downloading the same resume again is instant.
+With ``PDF_CACHE_PATH`` (or ``SHARED_CACHE_PATH``) set they are also stored
+in SQLite, shared by every server worker process.
+
+Styling comes from theme stylesheets in ``static/css/pdf_themes``. They are
+read once at import, with relative ``url()`` references (the vendored fonts)
+rewritten to absolute ``file://`` URIs, so wkhtmltopdf never goes to the
+network.
+"""
+import asyncio
+import io
+import multiprocessing
+import os
+import posixpath
+import re
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+import native_pdf
+import timing
+from cache import MISSING, LRUCache, SQLiteCache, TieredCache, compute_once, make_key
+from singleflight import SingleFlight
+
+# Worker processes rendering in parallel.
+WORKERS = int(os.getenv("PDF_WORKERS", str(min(os.cpu_count() or 1, 4))))
+# Renders allowed to be running or waiting at once before new ones are refused.
+QUEUE_LIMIT = int(os.getenv("PDF_QUEUE_LIMIT", str(WORKERS * 4)))
+
+DEFAULT_ENGINE = os.getenv("PDF_ENGINE", "wkhtmltopdf")
+
+# Most documents accepted by one batch request.
+BATCH_MAX_DOCUMENTS = int(os.getenv("PDF_BATCH_MAX_DOCUMENTS", "50"))
+
+CACHE_MAX_ENTRIES = int(os.getenv("PDF_CACHE_MAX_ENTRIES", "256"))
+CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_PATH = os.getenv("PDF_CACHE_PATH") or os.getenv("SHARED_CACHE_PATH")
+# How long other worker processes wait for a render already running elsewhere.
+RENDER_LEASE_SECONDS = 60
+
+# Configure PDF rendering options for better quality
+PDF_OPTIONS = {
+    'quiet': '',
+    'encoding': "UTF-8",
+    'enable-local-file-access': '',
+    'margin-top': '12mm',     # 1.2 cm top margin
+    'margin-right': '10mm',   # 1.0 cm right margin
+    'margin-bottom': '12mm',  # 1.2 cm bottom margin
+    'margin-left': '10mm',    # 1.0 cm left margin
+    'page-size': 'Letter',
+    'dpi': '300',
+    'image-quality': '100',
+    'enable-smart-shrinking': '',
+}
+
+
+THEMES_DIR = Path(__file__).resolve().parent / "static" / "css" / "pdf_themes"
+DEFAULT_THEME = "default"
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="utf-8">
+  <style>
+{css}
+  </style>
+</head>
+<body>
+  <div class="resume-container">
+    {body}
+  </div>
+</body>
+</html>
+"""
+
+
+class RendererBusyError(Exception):
+    """Raised when the render queue is full."""
+
+
+class UnknownThemeError(ValueError):
+    """Raised when a request names a theme that does not exist."""
+
+
+class UnknownEngineError(ValueError):
+    """Raised when a request names a PDF engine that does not exist."""
+
+
+_CSS_URL = re.compile(r"""url\((['"]?)(?!data:|https?:|file:)([^'")]+)\1\)""")
+
+
+def load_themes(directory: Path = THEMES_DIR) -> Dict[str, str]:
+    """Read every ``<name>.css`` theme, resolving relative urls against the theme file."""
+    themes = {}
+    for path in sorted(directory.glob("*.css")):
+        css = path.read_text(encoding="utf-8")
+        themes[path.stem] = _CSS_URL.sub(
+            lambda m: f"url('{(path.parent / m.group(2)).resolve().as_uri()}')", css
+        )
+    return themes
+
+
+THEMES = load_themes()
+
+
+def build_html(markdown_text: str, theme: str = DEFAULT_THEME) -> str:
+    """Convert resume markdown into a standalone HTML document styled with ``theme``."""
+    if theme not in THEMES:
+        raise UnknownThemeError(f"Unknown theme '{theme}'. Available themes: {', '.join(THEMES)}")
+    import markdown2  # only the wkhtmltopdf engine needs it, and only in the workers
+
+    # Convert markdown to HTML with extra features enabled
+    with timing.span("markdown"):
+        body = markdown2.markdown(markdown_text, extras=["tables", "cuddled-lists", "header-ids"])
+    return HTML_TEMPLATE.format(css=THEMES[theme], body=body)
+
+
+pdf_cache = TieredCache(
+    LRUCache(max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES),
+    SQLiteCache(CACHE_PATH, "pdfs", max_entries=CACHE_MAX_ENTRIES, dumps=bytes, loads=bytes)
+    if CACHE_PATH else None,
+)
+# Identical renders already in progress are shared rather than repeated.
+in_flight = SingleFlight()
+
+_pool: Optional[ProcessPoolExecutor] = None
+_start_lock = threading.Lock()
+_pending = 0
+
+# Per-worker state, set up once by _init_worker.
+_pdfkit = None
+_pdfkit_config = None
+
+
+def _init_worker() -> None:
+    global _pdfkit, _pdfkit_config
+    import pdfkit
+
+    _pdfkit = pdfkit
+    try:
+        _pdfkit_config = pdfkit.configuration()
+    except OSError:
+        # wkhtmltopdf missing: leave it to render() to report the error per request.
+        _pdfkit_config = None
+
+
+def _warm_up() -> int:
+    return os.getpid()
+
+
+def _render_wkhtmltopdf(markdown_text: str, theme: str) -> bytes:
+    html = build_html(markdown_text, theme)
+    # output_path=False makes pdfkit return the PDF bytes instead of writing a file
+    with timing.span("wkhtmltopdf"):
+        return _pdfkit.from_string(html, False, options=PDF_OPTIONS, configuration=_pdfkit_config)
+
+
+def _render_native(markdown_text: str, theme: str) -> bytes:
+    # The native engine has a single built-in style; the theme only affects wkhtmltopdf.
+    with timing.span("native_render"):
+        return native_pdf.render_markdown(markdown_text)
+
+
+ENGINES = {
+    "wkhtmltopdf": _render_wkhtmltopdf,
+    "native": _render_native,
+}
+
+
+def _render_timed(engine: str, markdown_text: str, theme: str):
+    """Worker entry point: render with ``engine`` and return the PDF plus the worker's spans."""
+    with timing.collect() as spans:
+        pdf = ENGINES[engine](markdown_text, theme)
+    return pdf, spans
+
+
+def start() -> None:
+    """Start the worker pool and warm every worker up; called on app startup.
+
+    Safe to call from several threads: the pool is created once and renders
+    submitted while it warms up simply queue behind the warm-up.
+    """
+    global _pool
+    with _start_lock:
+        if _pool is not None:
+            return
+        # spawn, not fork: the server process has threads running by the time this is called.
+        pool = _pool = ProcessPoolExecutor(
+            max_workers=WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+    for future in [pool.submit(_warm_up) for _ in range(WORKERS)]:
+        future.result()
+
+
+def shutdown() -> None:
+    """Stop the worker pool; called on app shutdown."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def render_pdf(markdown_text: str, theme: str = DEFAULT_THEME, engine: Optional[str] = None) -> bytes:
+    """Return the PDF for ``markdown_text`` styled with ``theme``, from cache when possible.
+
+    ``engine`` defaults to ``PDF_ENGINE``.
+    """
+    engine = engine or DEFAULT_ENGINE
+    validate(theme, engine)
+    # The theme's CSS is part of the key so editing a theme invalidates its PDFs.
+    key = make_key(markdown_text, theme, THEMES[theme], engine)
+    cached = await pdf_cache.aget(key)
+    if cached is not MISSING:
+        return cached
+
+    async def _render_and_store() -> bytes:
+        # pdf_render covers queueing for a worker as well as the worker's own stages.
+        with timing.span("pdf_render"):
+            pdf, spans = await _submit(_render_timed, engine, markdown_text, theme)
+        for name, duration in spans:
+            timing.record(name, duration)
+        await pdf_cache.aset(key, pdf)
+        return pdf
+
+    return await in_flight.do(
+        key, lambda: compute_once(pdf_cache, key, _render_and_store, RENDER_LEASE_SECONDS)
+    )
+
+
+def validate(theme: str, engine: Optional[str] = None) -> None:
+    """Raise ``UnknownThemeError``/``UnknownEngineError`` for names that do not exist."""
+    engine = engine or DEFAULT_ENGINE
+    if engine not in ENGINES:
+        raise UnknownEngineError(f"Unknown PDF engine '{engine}'. Available engines: {', '.join(ENGINES)}")
+    if theme not in THEMES:
+        raise UnknownThemeError(f"Unknown theme '{theme}'. Available themes: {', '.join(THEMES)}")
+
+
+def archive_names(filenames: List[str]) -> List[str]:
+    """Turn requested filenames into safe, unique ``.pdf`` names for a ZIP archive."""
+    names = []
+    seen = set()
+    for i, filename in enumerate(filenames, start=1):
+        base = posixpath.basename(filename.replace("\\", "/")).strip() or f"resume-{i}"
+        stem = base[:-4] if base.lower().endswith(".pdf") else base
+        name = f"{stem}.pdf"
+        n = 2
+        while name.lower() in seen:
+            name = f"{stem} ({n}).pdf"
+            n += 1
+        seen.add(name.lower())
+        names.append(name)
+    return names
+
+
+class _ZipSink(io.RawIOBase):
+    """Unseekable sink for ``zipfile``; written bytes are collected until drained."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def render_zip(documents: List[dict]) -> AsyncIterator[bytes]:
+    """Render ``documents`` concurrently and yield a ZIP archive of the PDFs chunk by chunk.
+
+    Each document is a dict with ``markdown_text``, ``filename``, ``theme`` and
+    ``engine``; call ``validate`` on them first. Files are added in completion
+    order. Documents that fail to render are listed in ``errors.txt`` at the
+    end of the archive instead of aborting the whole batch.
+    """
+    names = archive_names([doc["filename"] for doc in documents])
+    # One slot per worker: the batch keeps every core busy without filling the shared queue.
+    slots = asyncio.Semaphore(WORKERS)
+
+    async def _render_one(index: int, doc: dict):
+        async with slots:
+            try:
+                return index, await render_pdf(doc["markdown_text"], doc["theme"], doc["engine"]), None
+            except Exception as e:
+                return index, None, (str(e).splitlines() or [type(e).__name__])[0]
+
+    tasks = [asyncio.ensure_future(_render_one(i, doc)) for i, doc in enumerate(documents)]
+    sink = _ZipSink()
+    errors = []
+    try:
+        # PDFs are already compressed; deflating them again only costs CPU.
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+            for finished in asyncio.as_completed(tasks):
+                index, pdf, error = await finished
+                if error is not None:
+                    errors.append((index, error))
+                    continue
+                archive.writestr(names[index], pdf)
+                yield sink.drain()
+            if errors:
+                report = "".join(f"{names[index]}: {error}\n" for index, error in sorted(errors))
+                archive.writestr("errors.txt", report)
+        yield sink.drain()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _submit(fn, *args):
+    """Run ``fn(*args)`` on a worker process, refusing work once the queue is full."""
+    global _pending
+    loop = asyncio.get_running_loop()
+    if _pool is None:
+        await loop.run_in_executor(None, start)
+    if _pending >= QUEUE_LIMIT:
+        raise RendererBusyError(f"PDF renderer is busy ({_pending} renders queued), please retry shortly")
+    _pending += 1
+    try:
+        return await loop.run_in_executor(_pool, fn, *args)
+    finally:
+        _pending -= 1
+
+
+def stats() -> dict:
+    """Worker pool occupancy plus PDF cache size and hit rate."""
+    return {
+        "default_engine": DEFAULT_ENGINE,
+        "workers": WORKERS,
+        "queue_limit": QUEUE_LIMIT,
+        "pending": _pending,
+        "cache": pdf_cache.stats(),
+        "single_flight": in_flight.stats(),
+    }
@@ -0,0 +1,126 @@
+# profile_store.py
+"""Persistent store for candidate profiles and their analyzed projects.
+
+A profile holds what ``ResumeData`` carries (personal details, education,
+experience, job description and the analyzed projects) as one JSON document
+in SQLite, addressed by an unguessable ID. Clients create a profile once and
+afterwards send only the fields that changed, and analyzed projects survive
+page reloads so repositories are not re-analyzed.
+"""
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+PROFILE_DB_PATH = os.getenv("PROFILE_DB_PATH", "data/profiles.db")
+
+
+class ProfileNotFoundError(KeyError):
+    """Raised when no profile exists for an ID."""
+
+
+class ProfileStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        with self._lock, self._conn:
+            # WAL: every server worker process can read while another writes.
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS profiles ("
+                "id TEXT PRIMARY KEY, data TEXT NOT NULL, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def create(self, data: dict) -> dict:
+        profile_id = secrets.token_urlsafe(16)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO profiles (id, data, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (profile_id, json.dumps(data), now, now),
+            )
+        return {**data, "id": profile_id}
+
+    def get(self, profile_id: str) -> dict:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM profiles WHERE id = ?", (profile_id,)).fetchone()
+        if row is None:
+            raise ProfileNotFoundError(profile_id)
+        return {**json.loads(row[0]), "id": profile_id}
+
+    def update(self, profile_id: str, changes: dict) -> dict:
+        """Overwrite the given top-level fields and return the merged profile."""
+        with self._lock, self._conn:
+            # Take the write lock before reading so other worker processes cannot interleave.
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute("SELECT data FROM profiles WHERE id = ?", (profile_id,)).fetchone()
+            if row is None:
+                raise ProfileNotFoundError(profile_id)
+            data = {**json.loads(row[0]), **changes}
+            if changes:
+                self._conn.execute(
+                    "UPDATE profiles SET data = ?, updated_at = ? WHERE id = ?",
+                    (json.dumps(data), time.time(), profile_id),
+                )
+        return {**data, "id": profile_id}
+
+    def merge_projects(self, profile_id: str, projects: List[dict]) -> dict:
+        """Add analyzed projects, replacing earlier analyses of the same repository URL."""
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute("SELECT data FROM profiles WHERE id = ?", (profile_id,)).fetchone()
+            if row is None:
+                raise ProfileNotFoundError(profile_id)
+            data = json.loads(row[0])
+            urls = {project.get("url") for project in projects if project.get("url")}
+            kept = [p for p in data.get("projects") or [] if not p.get("url") or p["url"] not in urls]
+            data["projects"] = kept + projects
+            self._conn.execute(
+                "UPDATE profiles SET data = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(data), time.time(), profile_id),
+            )
+        return {**data, "id": profile_id}
+
+    def remove_projects(self, profile_id: str, urls: List[str]) -> dict:
+        """Drop the projects analyzed from the given repository URLs."""
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute("SELECT data FROM profiles WHERE id = ?", (profile_id,)).fetchone()
+            if row is None:
+                raise ProfileNotFoundError(profile_id)
+            data = json.loads(row[0])
+            removed = set(urls)
+            data["projects"] = [p for p in data.get("projects") or [] if p.get("url") not in removed]
+            self._conn.execute(
+                "UPDATE profiles SET data = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(data), time.time(), profile_id),
+            )
+        return {**data, "id": profile_id}
+
+    def delete(self, profile_id: str) -> None:
+        with self._lock, self._conn:
+            deleted = self._conn.execute("DELETE FROM profiles WHERE id = ?", (profile_id,)).rowcount
+        if not deleted:
+            raise ProfileNotFoundError(profile_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+
+_store: Optional[ProfileStore] = None
+
+
+def get_store() -> ProfileStore:
+    """Return the process-wide profile store, opening the database on first use."""
+    global _store
+    if _store is None:
+        _store = ProfileStore(PROFILE_DB_PATH)
+    return _store
@@ -0,0 +1,169 @@
+# prompt_budget.py
+"""Token-budgeted prompt assembly.
+
+Prompts are built from a template with ``{placeholders}`` and the user-supplied
+parts that fill them. ``render`` counts the template's own tokens, hands the
+rest of the budget to the parts in priority order and cuts any part that does
+not fit at the coarsest boundary available: a markdown section, a paragraph, a
+line, a sentence and, only when a single sentence is too long, a word (or,
+for a first word longer than the whole budget, a character). A huge pasted job
+description therefore cannot push a prompt past its budget.
+
+Tokens are counted with a local approximation of Gemini's tokenizer (about
+four characters per token for Latin text, one per character for CJK and other
+scripts written without spaces), which is close enough to size budgets
+without an API round trip.
+"""
+import math
+import re
+import string
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+# Long words are matched in runs of 64 characters so one huge "word" is not scanned whole.
+_TOKEN_RE = re.compile(r"\w{1,64}|[^\w\s]")
+# Characters of a Latin-script word per token.
+CHARS_PER_TOKEN = 4
+
+# Cut points from coarsest to finest; each match ends a piece.
+_BOUNDARIES = [
+    re.compile(r"\n(?=#{1,6}\s)"),  # before a markdown heading
+    re.compile(r"\n\s*\n"),  # paragraph
+    re.compile(r"\n"),  # line
+    re.compile(r"(?<=[.!?;])\s+"),  # sentence
+    re.compile(r"\s+"),  # word
+]
+_WORD_LEVEL = len(_BOUNDARIES) - 1
+
+
+def _cost(word: str) -> int:
+    return math.ceil(len(word) / CHARS_PER_TOKEN) if word.isascii() else len(word)
+
+
+def count_tokens(text: str, limit: Optional[int] = None) -> int:
+    """Approximate number of Gemini tokens in ``text``.
+
+    With ``limit``, counting stops as soon as the count exceeds it.
+    """
+    tokens = 0
+    for match in _TOKEN_RE.finditer(text):
+        tokens += _cost(match.group())
+        if limit is not None and tokens > limit:
+            break
+    return tokens
+
+
+def _pieces(text: str, boundary: "re.Pattern") -> Iterator[str]:
+    start = 0
+    for match in boundary.finditer(text):
+        if match.end() > start:
+            yield text[start:match.end()]
+        start = match.end()
+    if start < len(text):
+        yield text[start:]
+
+
+def _cut_chars(text: str, budget: int) -> str:
+    """Longest prefix of ``text`` within ``budget`` tokens."""
+    # ``text`` is one word and its trailing space, and no character costs less than
+    # 1/CHARS_PER_TOKEN of a token, so longer prefixes cannot fit: only search within that.
+    low, high = 0, min(len(text), (budget + 1) * CHARS_PER_TOKEN)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(text[:middle], budget) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low]
+
+
+def _cut(text: str, budget: int, level: int, has_prefix: bool = False) -> str:
+    # Words are a last resort for a first sentence that alone exceeds the budget,
+    # and characters for a first word that does; after any kept text the cut
+    # ends at a sentence boundary.
+    if budget <= 0 or (level >= _WORD_LEVEL and has_prefix):
+        return ""
+    if level > _WORD_LEVEL:
+        return _cut_chars(text, budget)
+    kept = []
+    used = 0
+    # Pieces are counted lazily so a huge input costs little more than the part kept.
+    for piece in _pieces(text, _BOUNDARIES[level]):
+        tokens = count_tokens(piece, budget - used)
+        if used + tokens <= budget:
+            kept.append(piece)
+            used += tokens
+            continue
+        # Fill the rest from the piece that did not fit, at a finer boundary.
+        kept.append(_cut(piece, budget - used, level + 1, has_prefix or bool(kept)))
+        break
+    return "".join(kept)
+
+
+def _over_budget_at(text: str, budget: int) -> Optional[int]:
+    """End of the token that takes ``text`` over ``budget``, or None if it fits."""
+    tokens = 0
+    for match in _TOKEN_RE.finditer(text):
+        tokens += _cost(match.group())
+        if tokens > budget:
+            return match.end()
+    return None
+
+
+def truncate(text: str, max_tokens: int) -> str:
+    """Shorten ``text`` to at most ``max_tokens`` tokens at the coarsest boundary that fits."""
+    end = _over_budget_at(text, max_tokens)
+    if end is None:
+        return text
+    # Nothing past the first token over budget can be kept, so the cut never scans the rest.
+    return _cut(text[:end], max_tokens, 0).rstrip()
+
+
+@dataclass
+class PromptPart:
+    """User-supplied text for one template placeholder.
+
+    Parts with a lower ``priority`` number are filled first. ``min_tokens`` is
+    reserved for the part before any other part grows, and ``max_tokens`` caps
+    it even when budget is left over.
+    """
+    name: str
+    text: str
+    priority: int = 0
+    min_tokens: int = 0
+    max_tokens: Optional[int] = None
+
+
+def allocate(parts: List[PromptPart], budget: int, copies: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """Split ``budget`` tokens between ``parts`` by priority.
+
+    ``copies`` says how often a part appears in the prompt; each granted token
+    of a part used twice costs two tokens of budget.
+    """
+    copies = copies or {}
+    wanted = {}
+    for part in parts:
+        cap = max(budget, 0) if part.max_tokens is None else min(part.max_tokens, max(budget, 0))
+        wanted[part.name] = min(count_tokens(part.text, cap), cap)
+    ordered = sorted(parts, key=lambda part: part.priority)
+    granted = {part.name: 0 for part in parts}
+    remaining = max(budget, 0)
+    # Reserve each part's minimum first, then hand out the rest in priority order.
+    for limit in ("min_tokens", None):
+        for part in ordered:
+            want = wanted[part.name] if limit is None else min(wanted[part.name], part.min_tokens)
+            times = max(copies.get(part.name, 1), 1)
+            extra = min(want - granted[part.name], remaining // times)
+            if extra > 0:
+                granted[part.name] += extra
+                remaining -= extra * times
+    return granted
+
+
+def render(template: str, budget: int, parts: List[PromptPart]) -> str:
+    """Fill ``template`` with ``parts`` so the whole prompt stays within ``budget`` tokens."""
+    overhead = count_tokens(template.format(**{part.name: "" for part in parts}))
+    copies = Counter(field for _, field, _, _ in string.Formatter().parse(template) if field)
+    granted = allocate(parts, budget - overhead, copies)
+    return template.format(**{part.name: truncate(part.text, granted[part.name]) for part in parts})
@@ -0,0 +1,202 @@
+# readme_fetcher.py
+"""README retrieval from raw.githubusercontent.com.
+
+A single pooled ``httpx.AsyncClient`` is shared by the whole process so
+connections are kept alive between requests. Candidate branches are probed
+concurrently and the first README found wins.
+
+READMEs are cached per owner/repo/branch together with their ETag and
+Last-Modified headers. Fresh entries are served without touching GitHub;
+stale ones are revalidated with a conditional GET, so an unchanged README
+costs a 304 with no body instead of a full download. Behind the memory tier
+the cache is kept in SQLite (``.cache/readmes.sqlite3`` unless configured), so
+it survives restarts.
+"""
+import asyncio
+import os
+import time
+from typing import List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+import timing
+from cache import MISSING, LRUCache, SQLiteCache, TieredCache
+from singleflight import SingleFlight
+
+RAW_BASE_URL = os.getenv("GITHUB_RAW_BASE_URL", "https://raw.githubusercontent.com").rstrip("/")
+BRANCHES = ["main", "master"]
+
+TIMEOUT_SECONDS = float(os.getenv("README_TIMEOUT_SECONDS", "10"))
+MAX_CONNECTIONS = int(os.getenv("README_MAX_CONNECTIONS", "50"))
+
+# Entries younger than this are served without revalidation.
+CACHE_FRESH_SECONDS = float(os.getenv("README_CACHE_FRESH_SECONDS", "600"))
+# Stale entries are kept this long for revalidation before being dropped.
+CACHE_MAX_AGE_SECONDS = float(os.getenv("README_CACHE_MAX_AGE_SECONDS", str(7 * 24 * 3600)))
+CACHE_MAX_ENTRIES = int(os.getenv("README_CACHE_MAX_ENTRIES", "512"))
+CACHE_MAX_BYTES = int(os.getenv("README_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# READMEs persist across restarts by default; set README_CACHE_PATH to "" for a memory-only cache.
+CACHE_PATH = os.getenv("README_CACHE_PATH", os.getenv("SHARED_CACHE_PATH") or ".cache/readmes.sqlite3")
+
+readme_cache = TieredCache(
+    LRUCache(
+        max_entries=CACHE_MAX_ENTRIES,
+        ttl=CACHE_MAX_AGE_SECONDS,
+        max_bytes=CACHE_MAX_BYTES,
+        sizeof=lambda entry: len(entry["content"]),
+    ),
+    SQLiteCache(CACHE_PATH, "readmes", ttl=CACHE_MAX_AGE_SECONDS, max_entries=CACHE_MAX_ENTRIES)
+    if CACHE_PATH else None,
+)
+# Outcomes of conditional revalidation requests.
+revalidations = {"not_modified": 0, "modified": 0, "failed": 0}
+
+# Concurrent README requests for the same repository share one GitHub fetch.
+in_flight = SingleFlight()
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide pooled HTTP client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(TIMEOUT_SECONDS, connect=min(TIMEOUT_SECONDS, 5.0)),
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_CONNECTIONS,
+            ),
+            follow_redirects=True,
+        )
+    return _client
+
+
+async def aclose() -> None:
+    """Close the pooled client; called on application shutdown."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def parse_repo_url(url: str) -> Optional[Tuple[str, str]]:
+    """Return (owner, repo) from a GitHub repository URL, or None if malformed."""
+    path_parts = urlparse(url).path.strip('/').split('/')
+    if len(path_parts) < 2 or not all(path_parts[:2]):
+        return None
+    return path_parts[0], path_parts[1]
+
+
+async def fetch_readme(url: str) -> dict:
+    """Fetch a repository README, returning ``content``/``repo_name`` or ``error``."""
+    repo = parse_repo_url(url)
+    if repo is None:
+        return {"error": "Invalid URL format"}
+    owner, repo_name = repo
+    key = f"{owner}/{repo_name}".lower()
+    with timing.span("readme_fetch"):
+        return await in_flight.do(key, lambda: _fetch_readme_cached(owner, repo_name))
+
+
+def cache_stats() -> dict:
+    """README cache sizes and hit rates plus revalidation outcomes."""
+    return {**readme_cache.stats(), "revalidations": dict(revalidations)}
+
+
+def _cache_key(owner: str, repo_name: str, branch: str) -> str:
+    return f"{owner}/{repo_name}/{branch}".lower()
+
+
+async def _store(owner: str, repo_name: str, branch: str, response: httpx.Response) -> dict:
+    entry = {
+        "content": response.text,
+        "etag": response.headers.get("etag"),
+        "last_modified": response.headers.get("last-modified"),
+        "fetched_at": time.time(),
+    }
+    await readme_cache.aset(_cache_key(owner, repo_name, branch), entry)
+    return entry
+
+
+async def _fetch_readme_cached(owner: str, repo_name: str) -> dict:
+    for branch in BRANCHES:
+        entry = await readme_cache.aget(_cache_key(owner, repo_name, branch))
+        if entry is not MISSING:
+            break
+    else:
+        entry = None
+
+    if entry is not None:
+        if time.time() - entry["fetched_at"] < CACHE_FRESH_SECONDS:
+            return {"content": entry["content"], "repo_name": repo_name}
+        entry = await _revalidate(owner, repo_name, branch, entry)
+        if entry is not None:
+            return {"content": entry["content"], "repo_name": repo_name}
+
+    found = await _fetch_first_branch(owner, repo_name, BRANCHES)
+    if found is None:
+        return {"error": "README not found"}
+    branch, response = found
+    entry = await _store(owner, repo_name, branch, response)
+    return {"content": entry["content"], "repo_name": repo_name}
+
+
+async def _revalidate(owner: str, repo_name: str, branch: str, entry: dict) -> Optional[dict]:
+    """Conditionally re-fetch a stale entry; returns None if the README is gone from that branch."""
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    try:
+        response = await _get_branch(owner, repo_name, branch, headers)
+    except httpx.HTTPError:
+        # GitHub unreachable: a stale README beats no README.
+        revalidations["failed"] += 1
+        return entry
+
+    if response.status_code == 304:
+        revalidations["not_modified"] += 1
+        entry = {**entry, "fetched_at": time.time()}
+        await readme_cache.aset(_cache_key(owner, repo_name, branch), entry)
+        return entry
+    if response.status_code == 200:
+        revalidations["modified"] += 1
+        return await _store(owner, repo_name, branch, response)
+    await readme_cache.adelete(_cache_key(owner, repo_name, branch))
+    return None
+
+
+async def _get_branch(owner: str, repo_name: str, branch: str, headers: Optional[dict] = None) -> httpx.Response:
+    raw_url = f"{RAW_BASE_URL}/{owner}/{repo_name}/{branch}/README.md"
+    return await get_http_client().get(raw_url, headers=headers)
+
+
+async def _fetch_branch(owner: str, repo_name: str, branch: str) -> Optional[Tuple[str, httpx.Response]]:
+    response = await _get_branch(owner, repo_name, branch)
+    return (branch, response) if response.status_code == 200 else None
+
+
+async def _fetch_first_branch(
+    owner: str, repo_name: str, branches: List[str]
+) -> Optional[Tuple[str, httpx.Response]]:
+    """Probe every branch at once; the first README found wins and the rest are cancelled."""
+    tasks = [asyncio.ensure_future(_fetch_branch(owner, repo_name, branch)) for branch in branches]
+    error: Optional[Exception] = None
+    try:
+        for finished in asyncio.as_completed(tasks):
+            try:
+                found = await finished
+            except httpx.HTTPError as e:
+                error = e
+                continue
+            if found is not None:
+                return found
+    finally:
+        for task in tasks:
+            task.cancel()
+    if error is not None:
+        raise error
+    return None
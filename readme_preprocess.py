@@ -0,0 +1,170 @@
+# readme_preprocess.py
+"""Reduce a README to the parts that describe the project.
+
+READMEs spend much of their length on badges, screenshots, raw HTML, install
+scripts, tables of contents and license boilerplate, none of which helps
+describe or categorize the project. ``preprocess`` removes that noise and
+reorders the remaining sections so the most informative ones come first;
+the prompt budget then cuts from the end, dropping the least useful text.
+"""
+import math
+import re
+from typing import List, Tuple
+
+# Longer README input is cut before preprocessing; the prompt only holds a fraction of it anyway.
+MAX_INPUT_CHARS = 100_000
+# Fenced code blocks are cut to this many lines; a short example says what the code does.
+MAX_CODE_BLOCK_LINES = 6
+
+# Sections with no information about the project itself.
+_DROPPED_SECTIONS = re.compile(
+    r"^(licen[cs]e|license and copyright|copyright|table of contents|contents|toc|"
+    r"contributing|contributors|code of conduct|sponsors?|backers|star history)\b",
+    re.IGNORECASE,
+)
+# Relative weight of sections by heading; unlisted headings weigh 1.
+_SECTION_WEIGHTS = [
+    (re.compile(r"overview|about|introduction|description|features|highlights|what", re.I), 1.5),
+    (re.compile(r"architecture|design|how it works|tech(nology)? stack|built with|results|performance|model", re.I), 1.3),
+    (re.compile(r"install|setup|set up|getting started|requirements|prerequisites|usage|running|deploy", re.I), 0.5),
+    (re.compile(r"faq|troubleshoot|changelog|release|roadmap|todo|acknowledg|credits|contact|support|author", re.I), 0.4),
+]
+
+_STOPWORDS = frozenset("""
+a an and are as at be by can for from has have if in into is it its of on or our so that the their then there
+these this to was we will with you your use used using also more which when where how all any not but
+""".split())
+
+# HTML elements that show up in READMEs. Anything else in angle brackets (generics such as
+# List<String>, autolinks such as <https://...>) is text and stays.
+_HTML_ELEMENTS = (
+    "a|abbr|article|audio|b|big|blockquote|br|center|code|dd|details|div|dl|dt|em|figcaption|figure|font|"
+    "footer|h[1-6]|header|hr|i|iframe|img|input|kbd|label|li|main|nav|ol|p|path|picture|pre|s|section|small|"
+    "source|span|strike|strong|sub|summary|sup|svg|table|tbody|td|th|thead|tr|u|ul|video"
+)
+# Every pattern below stops at the next bracket of its kind, so each match attempt is bounded by
+# the distance to the next opening bracket and a whole line is processed in linear time.
+_LINKED_IMAGE = re.compile(r"\[!\[[^\[\]\n]*\]\([^()\n]*\)\]\([^()\n]*\)")
+_IMAGE = re.compile(r"!\[[^\[\]\n]*\](\([^()\n]*\)|\[[^\[\]\n]*\])")
+_HTML_TAG = re.compile(r"</?(?:%s)(?:\s[^<>\n]*)?/?>" % _HTML_ELEMENTS, re.IGNORECASE)
+_EMPTY_LINK = re.compile(r"\[[ \t]*\]\([^()\n]*\)")
+_REFERENCE_DEFINITION = re.compile(r"^\s*\[[^\]]+\]:\s*\S+.*$")
+_ANCHOR_LINK_LINE = re.compile(r"^\s*(?:[-*+]|\d+\.)?\s*\[[^\]]+\]\(#[^)]*\)\s*$")
+# Closing hashes only count after whitespace, so "C#" keeps its "#".
+_HEADING = re.compile(r"^(#{1,6})\s+(.+?)(?:\s+#+)?\s*$")
+_WORD = re.compile(r"[A-Za-z][A-Za-z0-9+#.-]*[A-Za-z0-9+#]|[A-Za-z]|\d+(?:\.\d+)?%?")
+
+
+def _strip_comments(text: str) -> str:
+    # A scan rather than a regex: a lazy ``<!--.*?-->`` is quadratic on unclosed comments.
+    parts = []
+    position = 0
+    while True:
+        start = text.find("<!--", position)
+        end = text.find("-->", start + 4) if start != -1 else -1
+        if end == -1:
+            parts.append(text[position:])
+            return "".join(parts)
+        parts.append(text[position:start])
+        position = end + 3
+
+
+def _fenced(code: List[str], closed: bool) -> List[str]:
+    """A code block (fence lines included), cut to MAX_CODE_BLOCK_LINES lines of code."""
+    body = code[1:-1] if closed else code[1:]
+    if len(body) <= MAX_CODE_BLOCK_LINES:
+        return code if closed else code + [code[0].strip()[:3]]
+    return [code[0]] + body[:MAX_CODE_BLOCK_LINES] + ["..."] + [code[-1] if closed else code[0].strip()[:3]]
+
+
+def _strip_noise(markdown_text: str) -> List[str]:
+    """Drop HTML, images, badges and table-of-contents lines, and shorten long code blocks."""
+    text = _strip_comments(markdown_text[:MAX_INPUT_CHARS])
+    lines: List[str] = []
+    code: List[str] = []
+    in_code = False
+    for line in text.splitlines():
+        if line.lstrip().startswith(("```", "~~~")):
+            if in_code:
+                code.append(line)
+                lines.extend(_fenced(code, closed=True))
+                code = []
+            else:
+                code = [line]
+            in_code = not in_code
+            continue
+        if in_code:
+            code.append(line)
+            continue
+        line = _LINKED_IMAGE.sub("", line)
+        line = _IMAGE.sub("", line)
+        line = _HTML_TAG.sub("", line)
+        line = _EMPTY_LINK.sub("", line)
+        if _REFERENCE_DEFINITION.match(line) or _ANCHOR_LINK_LINE.match(line):
+            continue
+        lines.append(line.rstrip())
+    if in_code:
+        lines.extend(_fenced(code, closed=False))
+    return lines
+
+
+def _split_sections(lines: List[str]) -> Tuple[List[str], List[Tuple[str, List[str]]]]:
+    """Split at headings into the text before the first heading and (heading line, body) pairs."""
+    preamble: List[str] = []
+    sections: List[Tuple[str, List[str]]] = []
+    in_code = False
+    for line in lines:
+        if line.lstrip().startswith(("```", "~~~")):
+            in_code = not in_code
+        heading = None if in_code else _HEADING.match(line)
+        # The document title (the first heading, before any text) belongs to the preamble.
+        if heading and (sections or any(l.strip() for l in preamble) or len(heading.group(1)) > 1):
+            sections.append((line, []))
+        elif sections:
+            sections[-1][1].append(line)
+        else:
+            preamble.append(line)
+    return preamble, sections
+
+
+def _collapse(lines: List[str]) -> str:
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def informativeness(title: str, body: str) -> float:
+    """Score a section: distinct content words, damped for length and weighted by its heading."""
+    words = [word.lower() for word in _WORD.findall(body)]
+    distinct = {word for word in words if word not in _STOPWORDS}
+    if not distinct:
+        return 0.0
+    weight = 1.0
+    for pattern, section_weight in _SECTION_WEIGHTS:
+        if pattern.search(title):
+            weight = section_weight
+            break
+    # Repetitive text (long lists of similar lines) scores below varied prose of the same size.
+    return weight * len(distinct) * math.sqrt(len(distinct) / len(words))
+
+
+def preprocess(markdown_text: str) -> str:
+    """Return the README without noise, its sections ordered from most to least informative."""
+    preamble, sections = _split_sections(_strip_noise(markdown_text))
+    scored = []
+    # Skip a dropped section together with its subsections.
+    dropped_level = None
+    for index, (heading_line, body) in enumerate(sections):
+        level, title = _HEADING.match(heading_line).groups()
+        if dropped_level is not None and len(level) > dropped_level:
+            continue
+        dropped_level = None
+        title = re.sub(r"[*_`:]", "", title).strip()
+        if _DROPPED_SECTIONS.match(title):
+            dropped_level = len(level)
+            continue
+        text = _collapse(body)
+        if not text:
+            continue
+        scored.append((informativeness(title, text), index, f"{heading_line}\n{text}"))
+    ranked = [section for _, _, section in sorted(scored, key=lambda item: (-item[0], item[1]))]
+    parts = [_collapse(preamble)] + ranked
+    return "\n\n".join(part for part in parts if part)
@@ -0,0 +1,116 @@
+# resume_sections.py
+"""Split generated resume markdown into its top-level sections and put it back together.
+
+The resume prompt produces a fixed set of ``#`` sections. Parsing them out
+lets a single section be regenerated and spliced back without touching the
+rest of the document.
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+SECTIONS = [
+    "CONTACT INFORMATION",
+    "OBJECTIVE",
+    "EDUCATION",
+    "WORK EXPERIENCE",
+    "TECHNICAL PROJECTS",
+    "TECHNICAL SKILLS",
+]
+
+_HEADING = re.compile(r"^#{1,2}\s+(.+?)\s*#*\s*$")
+
+
+def normalize_title(title: str) -> Optional[str]:
+    """Map a heading or user-supplied name to its canonical section title, or None."""
+    cleaned = re.sub(r"[*_`:]", "", title).strip().upper()
+    cleaned = re.sub(r"\s+", " ", cleaned)
+    return cleaned if cleaned in SECTIONS else None
+
+
+def _parse(markdown_text: str) -> Tuple[List[str], List[Tuple[str, str, List[str]]]]:
+    """Lines before the first known section and (title, heading line, body lines) triples.
+
+    Lines keep their line endings, so joining everything back gives the input unchanged.
+    """
+    preamble: List[str] = []
+    sections: List[Tuple[str, str, List[str]]] = []
+    in_code = False
+    for line in markdown_text.splitlines(keepends=True):
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+        heading = None if in_code else _HEADING.match(line.rstrip("\r\n"))
+        title = normalize_title(heading.group(1)) if heading else None
+        if title is not None:
+            sections.append((title, line, []))
+        elif sections:
+            sections[-1][2].append(line)
+        else:
+            preamble.append(line)
+    return preamble, sections
+
+
+def split_sections(markdown_text: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """Return the text before the first known section and the (title, body) pairs in order.
+
+    Only headings naming one of ``SECTIONS`` start a new section; any other
+    heading (e.g. a job title under WORK EXPERIENCE) stays in the body.
+    """
+    preamble, sections = _parse(markdown_text)
+    return "".join(preamble).strip(), [(title, "".join(body).strip()) for title, _, body in sections]
+
+
+def _new_body(old_body: str, body: str) -> str:
+    """``body`` wrapped in the whitespace that surrounded ``old_body``."""
+    if not old_body.strip():
+        return body.strip() + "\n" + old_body
+    leading = old_body[:len(old_body) - len(old_body.lstrip())]
+    trailing = old_body[len(old_body.rstrip()):]
+    return leading + body.strip() + trailing
+
+
+def replace_sections(markdown_text: str, replacements: Dict[str, str]) -> str:
+    """Swap the bodies of the given sections, adding missing ones in their usual position.
+
+    Everything else, including each section's own heading line and the blank
+    lines between sections, is kept exactly as it was.
+    """
+    preamble, sections = _parse(markdown_text)
+    # (title, text, added)
+    chunks = []
+    for title, heading_line, body in sections:
+        body_text = "".join(body)
+        if title in replacements:
+            if not heading_line.endswith("\n"):
+                heading_line += "\n"
+            body_text = _new_body(body_text, replacements[title])
+        chunks.append((title, heading_line + body_text, False))
+    present = {title for title, _, _ in sections}
+    for title in SECTIONS:
+        if title in replacements and title not in present:
+            position = SECTIONS.index(title)
+            index = next(
+                (i for i, (other, _, _) in enumerate(chunks) if SECTIONS.index(other) > position),
+                len(chunks),
+            )
+            chunks.insert(index, (title, f"# {title}\n{replacements[title].strip()}\n", True))
+    text = "".join(preamble)
+    previous_added = False
+    for _, chunk, added in chunks:
+        # An added section is set off by a blank line on both sides.
+        if (added or previous_added) and text.strip() and not text.endswith("\n\n"):
+            text = text.rstrip("\n") + "\n\n"
+        text += chunk
+        previous_added = added
+    return text
+
+
+def strip_heading(title: str, text: str) -> str:
+    """Drop a leading ``# TITLE`` line the model may have repeated and any code fences."""
+    text = text.strip()
+    text = re.sub(r"^```(?:markdown)?\s*\n(.*?)\n```$", r"\1", text, flags=re.S).strip()
+    lines = text.splitlines()
+    if lines:
+        heading = _HEADING.match(lines[0])
+        if heading and normalize_title(heading.group(1)) == title:
+            lines = lines[1:]
+    return "\n".join(lines).strip()
@@ -0,0 +1,25 @@
+# server.py
+"""Start the API with uvicorn: ``python server.py`` (``python main.py`` hands over to it).
+
+The app is imported by uvicorn from ``main:app`` rather than being this
+module. The PDF renderer starts its workers with ``spawn``, which re-runs the
+parent's ``__main__`` module in every worker, so keeping ``__main__`` this
+small saves each worker from importing FastAPI and the rest of the app.
+"""
+import os
+
+if __name__ == "__main__":
+    import dotenv
+    import uvicorn
+
+    # Load environment variables from .env file before the settings below are read
+    dotenv.load_dotenv()
+    # Get port from environment variable or use default 8000 7860 FOR HUGGINGFACE SPACES.
+    port = int(os.environ.get("PORT", 7860))
+    workers = int(os.environ.get("SERVER_WORKERS", "1"))
+    if workers > 1:
+        # Worker processes share one SQLite cache so a response fetched by one serves all,
+        # and split the cores between their PDF renderer pools.
+        os.environ.setdefault("SHARED_CACHE_PATH", ".cache/shared.sqlite3")
+        os.environ.setdefault("PDF_WORKERS", str(max(1, (os.cpu_count() or 1) // workers)))
+    uvicorn.run("main:app", host="0.0.0.0", port=port, workers=workers)
@@ -0,0 +1,118 @@
+# singleflight.py
+"""Coalesce concurrent identical async calls into one upstream call.
+
+While a call for a key is in flight, later callers with the same key await
+the same result instead of starting their own. Nothing is remembered once the
+call finishes; pair this with a cache when results should outlive the burst.
+
+Streams are shared the same way: a caller joining a stream in flight is first
+replayed the chunks produced so far, then follows the live stream.
+"""
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class _Broadcast:
+    """Chunks of one upstream stream, kept so late subscribers can replay them."""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.task: Optional[asyncio.Future] = None
+        self._changed = asyncio.Event()
+
+    def notify(self) -> None:
+        # Wake the current waiters; later ones wait on a fresh event.
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait(self) -> None:
+        await self._changed.wait()
+
+
+class SingleFlight:
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._streams: Dict[str, _Broadcast] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Return ``await fn()``, sharing the call with concurrent callers of ``key``.
+
+        The upstream call runs as its own task, so a caller that is cancelled
+        (e.g. the client disconnected) does not cancel it for the others.
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Future) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller went away.
+            task.exception()
+
+    async def stream(self, key: str, fn: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """Yield the chunks of ``fn()``, sharing the stream with concurrent callers of ``key``.
+
+        The upstream stream runs as its own task and is cancelled only when
+        every caller has stopped reading it.
+        """
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            self.calls += 1
+            broadcast = self._streams[key] = _Broadcast()
+            broadcast.task = asyncio.ensure_future(self._produce(key, broadcast, fn))
+        else:
+            self.shared += 1
+        broadcast.subscribers += 1
+        try:
+            position = 0
+            while True:
+                while position < len(broadcast.chunks):
+                    yield broadcast.chunks[position]
+                    position += 1
+                if broadcast.done:
+                    if broadcast.error is not None:
+                        raise broadcast.error
+                    return
+                await broadcast.wait()
+        finally:
+            broadcast.subscribers -= 1
+            if broadcast.subscribers == 0 and not broadcast.done:
+                # Forget it first so a caller arriving now starts a fresh stream.
+                if self._streams.get(key) is broadcast:
+                    del self._streams[key]
+                broadcast.task.cancel()
+
+    async def _produce(self, key: str, broadcast: _Broadcast, fn: Callable[[], AsyncIterator[str]]) -> None:
+        try:
+            async for chunk in fn():
+                broadcast.chunks.append(chunk)
+                broadcast.notify()
+        except Exception as e:
+            broadcast.error = e
+        finally:
+            broadcast.done = True
+            if self._streams.get(key) is broadcast:
+                del self._streams[key]
+            broadcast.notify()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._in_flight) + len(self._streams),
+            "calls": self.calls,
+            "shared": self.shared,
+        }
@@ -14,7 +14,10 @@ document.addEventListener('DOMContentLoaded', function() {
         projects: [],
         resumeMarkdown: null,
         pdfData: null,
-        coverLetter: null
+        coverLetter: null,
+        // Server-side profile: reloads restore from it and only changed fields are sent
+        profileId: localStorage.getItem('profileId'),
+        savedProfile: {}
     };
     
     // DOM Elements
@@ -55,6 +58,8 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
     
+    restoreProfile();
+    
     // Step 1: Personal Information Form
     document.getElementById('personal-info-form').addEventListener('submit', function(e) {
         e.preventDefault();
@@ -90,6 +95,7 @@ document.addEventListener('DOMContentLoaded', function() {
             work_experience: document.getElementById('workExperience').value,
             job_description: document.getElementById('jobDescription').value
         };
+        saveProfile(appState.personalInfo);
         
         // Move to next step
         goToStep(2);
@@ -128,7 +134,8 @@ document.addEventListener('DOMContentLoaded', function() {
         appState.resumeMarkdown = null;
         document.getElementById('resume-content').style.display = 'none';
         document.getElementById('resume-loading').style.display = 'block';
-        generateResume();
+        // Bypass the server response cache so a fresh resume is generated
+        generateResume(true);
     });
     
     document.getElementById('go-to-step4-btn').addEventListener('click', function() {
@@ -212,6 +219,105 @@ document.addEventListener('DOMContentLoaded', function() {
         console.error('Download cover letter button not found!');
     }
     
+    // Fields of profile that differ from what the server last stored
+    function profileChanges(profile) {
+        const changes = {};
+        Object.keys(profile).forEach(key => {
+            if (JSON.stringify(profile[key]) !== JSON.stringify(appState.savedProfile[key])) {
+                changes[key] = profile[key];
+            }
+        });
+        return changes;
+    }
+    
+    // Create the server-side profile, or send it only the fields that changed
+    async function saveProfile(profile) {
+        const changes = profileChanges(profile);
+        if (appState.profileId && Object.keys(changes).length === 0) return;
+        try {
+            let response = null;
+            if (appState.profileId) {
+                response = await fetch(`${API_BASE_URL}/api/profiles/${appState.profileId}`, {
+                    method: 'PATCH',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify(changes)
+                });
+            }
+            if (!response || response.status === 404) {
+                // No profile yet (or it was deleted): create one from everything we have
+                response = await fetch(`${API_BASE_URL}/api/profiles`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ ...appState.personalInfo, projects: appState.projects, ...profile })
+                });
+            }
+            if (!response.ok) {
+                throw new Error(`API Error: ${response.status} ${response.statusText}`);
+            }
+            const saved = await response.json();
+            appState.profileId = saved.id;
+            appState.savedProfile = saved;
+            localStorage.setItem('profileId', saved.id);
+        } catch (error) {
+            // Saving is best effort: the app keeps working from local state
+            console.error('Profile save error:', error);
+        }
+    }
+    
+    // Remove projects from the server-side profile by repository URL, without resending the rest
+    async function removeSavedProjects(urls) {
+        if (!appState.profileId || urls.length === 0) return;
+        try {
+            const query = urls.map(url => `url=${encodeURIComponent(url)}`).join('&');
+            const response = await fetch(`${API_BASE_URL}/api/profiles/${appState.profileId}/projects?${query}`, {
+                method: 'DELETE'
+            });
+            if (!response.ok) {
+                throw new Error(`API Error: ${response.status} ${response.statusText}`);
+            }
+            appState.savedProfile = await response.json();
+        } catch (error) {
+            console.error('Profile save error:', error);
+        }
+    }
+    
+    // Restore the form and analyzed projects from the stored profile after a reload
+    async function restoreProfile() {
+        if (!appState.profileId) return;
+        try {
+            const response = await fetch(`${API_BASE_URL}/api/profiles/${appState.profileId}`);
+            if (response.status === 404) {
+                localStorage.removeItem('profileId');
+                appState.profileId = null;
+                return;
+            }
+            if (!response.ok) {
+                throw new Error(`API Error: ${response.status} ${response.statusText}`);
+            }
+            const profile = await response.json();
+            appState.savedProfile = profile;
+            
+            const fields = {
+                fullName: 'name', email: 'email', phone: 'phone', github: 'github', linkedin: 'linkedin',
+                skills: 'skills', education: 'education', workExperience: 'work_experience', jobDescription: 'job_description'
+            };
+            Object.entries(fields).forEach(([inputId, key]) => {
+                const input = document.getElementById(inputId);
+                if (input && profile[key]) input.value = profile[key];
+            });
+            
+            appState.projects = profile.projects || [];
+            appState.projects.forEach((project, i) => addProjectCard(project, i));
+            if (appState.projects.length > 0) {
+                document.getElementById('repoUrls').value = appState.projects.map(p => p.url).filter(Boolean).join('\n');
+                document.getElementById('preview-heading').classList.remove('d-none');
+                document.getElementById('go-to-step3-btn').disabled = false;
+            }
+        } catch (error) {
+            console.error('Profile restore error:', error);
+        }
+    }
+    
     // API Functions
     async function callAPI(endpoint, method = 'GET', data = null, params = null) {
         try {
@@ -262,6 +368,103 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
     
+    // POST to an NDJSON endpoint and invoke onItem for every line as it arrives
+    async function streamNDJSON(endpoint, data, onItem) {
+        try {
+            const response = await fetch(`${API_BASE_URL}/api${endpoint}`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify(data)
+            });
+            
+            if (!response.ok) {
+                throw new Error(`API Error: ${response.status} ${response.statusText}`);
+            }
+            
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                lines.filter(line => line.trim()).forEach(line => onItem(JSON.parse(line)));
+            }
+            
+            if (buffer.trim()) {
+                onItem(JSON.parse(buffer));
+            }
+        } catch (error) {
+            showAlert(`API Connection Error: ${error.message}`, 'danger');
+            console.error('API error:', error);
+        }
+    }
+    
+    // POST to a Server-Sent Events endpoint, calling onText(chunk, fullText) for each text event.
+    // Resolves to the full text, or null if the request or the generation failed.
+    async function streamSSE(endpoint, data, onText) {
+        let fullText = '';
+        try {
+            const response = await fetch(`${API_BASE_URL}/api${endpoint}`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Accept': 'text/event-stream'
+                },
+                body: JSON.stringify(data)
+            });
+            
+            if (!response.ok) {
+                throw new Error(`API Error: ${response.status} ${response.statusText}`);
+            }
+            
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                
+                buffer += decoder.decode(value, { stream: true });
+                const events = buffer.split('\n\n');
+                buffer = events.pop();
+                
+                for (const rawEvent of events) {
+                    let eventType = 'message';
+                    let payload = '';
+                    rawEvent.split('\n').forEach(line => {
+                        if (line.startsWith('event:')) eventType = line.slice(6).trim();
+                        if (line.startsWith('data:')) payload += line.slice(5).trim();
+                    });
+                    const eventData = payload ? JSON.parse(payload) : {};
+                    
+                    if (eventType === 'error') {
+                        throw new Error(eventData.detail);
+                    }
+                    if (eventType === 'done') {
+                        return fullText;
+                    }
+                    if (eventData.text) {
+                        fullText += eventData.text;
+                        onText(eventData.text, fullText);
+                    }
+                }
+            }
+            return fullText || null;
+        } catch (error) {
+            showAlert(`API Connection Error: ${error.message}`, 'danger');
+            console.error('API error:', error);
+            return null;
+        }
+    }
+    
     // Generate project descriptions
     async function generateProjectDescriptions(urls) {
         // Show loading
@@ -277,57 +480,51 @@ document.addEventListener('DOMContentLoaded', function() {
         
         let successCount = 0;
         
+        const validUrls = [];
         for (const url of urls) {
             if (!url.trim()) continue;
             
-            // Get repository name
-            const repoName = getRepoName(url);
-            if (!repoName) {
+            // Validate repository URL before sending it to the server
+            if (!getRepoName(url)) {
                 showAlert(`Invalid GitHub URL: ${url}`, 'danger');
                 continue;
             }
-            
-            // Fetch README content
-            const readmeResponse = await callAPI('/get_readme', 'GET', null, { url });
-            if (!readmeResponse) continue;
-            
-            if (readmeResponse.error) {
-                showAlert(`Failed to fetch README for ${url}: ${readmeResponse.error}`, 'danger');
-                continue;
-            }
-            
-            const readmeContent = readmeResponse.content;
-            
-            // Generate description
-            const descResponse = await callAPI('/generate_description', 'POST', {
-                readme_content: readmeContent,
-                job_description: appState.personalInfo.job_description
-            });
-            
-            if (!descResponse) continue;
-            
-            const description = descResponse.description;
-            
-            // Generate category
-            const catResponse = await callAPI('/generate_category', 'POST', {
-                readme_content: readmeContent,
-                job_description: appState.personalInfo.job_description
+            validUrls.push(url.trim());
+        }
+        
+        // Analyze all repositories in one request; results stream back as NDJSON lines
+        if (validUrls.length > 0) {
+            await streamNDJSON('/analyze_repos', {
+                repo_urls: validUrls,
+                job_description: appState.personalInfo.job_description,
+                profile_id: appState.profileId
+            }, result => {
+                if (result.error) {
+                    showAlert(`Failed to analyze ${result.url}: ${result.error}`, 'danger');
+                    return;
+                }
+                
+                // Add project
+                const project = {
+                    name: result.name,
+                    description: result.description,
+                    category: result.category,
+                    url: result.url
+                };
+                
+                appState.projects.push(project);
+                addProjectCard(project, appState.projects.length - 1);
+                successCount++;
             });
-            
-            if (!catResponse) continue;
-            
-            const category = catResponse.category;
-            
-            // Add project
-            const project = {
-                name: repoName,
-                description: description,
-                category: category
-            };
-            
-            appState.projects.push(project);
-            addProjectCard(project, appState.projects.length - 1);
-            successCount++;
+            if (appState.profileId) {
+                // The server merged each analyzed project into the profile; drop the earlier ones it still has
+                const analyzed = new Set(appState.projects.map(p => p.url));
+                const stale = (appState.savedProfile.projects || []).map(p => p.url).filter(url => url && !analyzed.has(url));
+                appState.savedProfile.projects = appState.projects.slice();
+                removeSavedProjects(stale);
+            } else {
+                saveProfile({ projects: appState.projects });
+            }
         }
         
         // Update UI
@@ -371,7 +568,12 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Remove project
     function removeProject(index) {
-        appState.projects.splice(index, 1);
+        const [removed] = appState.projects.splice(index, 1);
+        if (appState.profileId) {
+            removeSavedProjects(removed.url ? [removed.url] : []);
+        } else {
+            saveProfile({ projects: appState.projects });
+        }
         
         // Rebuild project cards
         document.getElementById('project-cards-container').innerHTML = '';
@@ -386,21 +588,35 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
     
-    // Generate resume
-    async function generateResume() {
+    // Generate resume, rendering the markdown as it streams in
+    async function generateResume(refresh = false) {
         document.getElementById('resume-loading').style.display = 'block';
         document.getElementById('resume-content').style.display = 'none';
         
-        const resumeData = {
+        // With a stored profile only unsaved changes are sent; otherwise send everything
+        const changes = appState.profileId ? profileChanges({ ...appState.personalInfo, projects: appState.projects }) : null;
+        const endpoint = changes ? `/profiles/${appState.profileId}/generate_resume/stream` : '/generate_resume/stream';
+        const resumeData = changes || {
             ...appState.personalInfo,
             projects: appState.projects
         };
+        if (changes) Object.assign(appState.savedProfile, changes);
         
-        const response = await callAPI('/generate_resume', 'POST', resumeData);
+        const markdownField = document.getElementById('resumeMarkdown');
+        markdownField.value = '';
         
-        if (response) {
-            appState.resumeMarkdown = response.resume_markdown;
-            document.getElementById('resumeMarkdown').value = appState.resumeMarkdown;
+        const resumeMarkdown = await streamSSE(`${endpoint}${refresh ? '?refresh=true' : ''}`, resumeData, (text, fullText) => {
+            if (fullText === text) {
+                // First chunk: swap the spinner for the editor
+                document.getElementById('resume-loading').style.display = 'none';
+                document.getElementById('resume-content').style.display = 'block';
+            }
+            markdownField.value = fullText;
+        });
+        
+        if (resumeMarkdown) {
+            appState.resumeMarkdown = resumeMarkdown;
+            markdownField.value = appState.resumeMarkdown;
             document.getElementById('resume-loading').style.display = 'none';
             document.getElementById('resume-content').style.display = 'block';
         } else {
@@ -436,23 +652,33 @@ document.addEventListener('DOMContentLoaded', function() {
             `${project.name} (${project.category}): ${project.description}`
         ).join('\n');
         
-        // Call the API with all candidate information
-        const response = await callAPI('/generate_cover_letter', 'POST', {
+        const coverLetterField = document.getElementById('coverLetterText');
+        coverLetterField.value = '';
+        
+        // Generating again for a letter we already have asks the server for a fresh one instead of its cached copy
+        const refresh = appState.coverLetter ? '?refresh=true' : '';
+        
+        // Call the API with all candidate information; text streams into the editor as it is generated
+        const coverLetter = await streamSSE(`/generate_cover_letter/stream${refresh}`, {
             company_name: companyName,
             job_description: appState.personalInfo.job_description,
             github_projects: projectsDescription,
             candidate_name: appState.personalInfo.name,
             Candidate_email: appState.personalInfo.email,
             Candidate_phone: appState.personalInfo.phone
+        }, (text, fullText) => {
+            document.getElementById('cover-letter-loading').style.display = 'none';
+            document.getElementById('cover-letter-content').style.display = 'block';
+            coverLetterField.value = fullText;
         });
         
         // Hide loading
         document.getElementById('cover-letter-loading').style.display = 'none';
         document.getElementById('generate-cover-letter-btn').disabled = false;
         
-        if (response && response.cover_letter) {
-            appState.coverLetter = response.cover_letter;
-            document.getElementById('coverLetterText').value = appState.coverLetter;
+        if (coverLetter && coverLetter.trim()) {
+            appState.coverLetter = coverLetter.trim();
+            coverLetterField.value = appState.coverLetter;
             document.getElementById('cover-letter-content').style.display = 'block';
             document.getElementById('download-cover-letter-btn').disabled = false;
             showAlert('Cover letter generated successfully!', 'success');
@@ -0,0 +1,23 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The application modules live at the repository root rather than in a package.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the databases of the app under test out of the working tree.
+_state_dir = tempfile.mkdtemp()
+os.environ.setdefault("PROFILE_DB_PATH", os.path.join(_state_dir, "profiles.db"))
+os.environ.setdefault("README_CACHE_PATH", os.path.join(_state_dir, "readmes.sqlite3"))
+
+
+@pytest.fixture
+def client():
+    """Test client for the app; the lifespan (PDF pool warm-up) is not run."""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    return TestClient(main.app)
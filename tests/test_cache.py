@@ -0,0 +1,173 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from cache import MISSING, LRUCache, SQLiteCache, TieredCache, compute_once, make_key
+
+
+def _shared(tmp_path):
+    """Two processes' views of one shared cache file."""
+    path = str(tmp_path / "shared.sqlite3")
+    return TieredCache(LRUCache(), SQLiteCache(path, "t")), TieredCache(LRUCache(), SQLiteCache(path, "t"))
+
+
+def _lock(path) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("BEGIN EXCLUSIVE")
+    return conn
+
+
+def test_make_key_ignores_dict_order():
+    assert make_key("p", {"a": 1, "b": 2}) == make_key("p", {"b": 2, "a": 1})
+    assert make_key("p", {"a": 1}) != make_key("q", {"a": 1})
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_byte_budget_and_oversized_values():
+    cache = LRUCache(max_bytes=10)
+    cache.set("a", "x" * 6)
+    cache.set("b", "y" * 6)
+    cache.set("huge", "z" * 11)
+    assert cache.get("a") is MISSING
+    assert cache.get("b") == "y" * 6
+    assert cache.get("huge") is MISSING
+    assert cache.stats()["bytes"] == 6
+
+
+def test_lru_ttl_and_falsy_values():
+    cache = LRUCache(ttl=0.05)
+    cache.set("empty", "")
+    cache.set("forever", 0, ttl=0)
+    assert cache.get("empty") == ""
+    time.sleep(0.06)
+    assert cache.get("empty") is MISSING
+    assert cache.get("forever") == 0
+    assert cache.stats()["hit_rate"] == round(2 / 3, 4)
+
+
+def test_sqlite_cache_survives_reopening_and_prunes(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    disk = SQLiteCache(path, "t", max_entries=2)
+    for key in ("a", "b", "c"):
+        disk.set(key, {"key": key})
+    reopened = SQLiteCache(path, "t")
+    assert reopened.get("a") is MISSING
+    assert reopened.get("c") == {"key": "c"}
+    assert len(reopened) == 2
+
+
+def test_sqlite_cache_expires_entries(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "c.sqlite3"), "t", ttl=0.05)
+    disk.set("k", "v")
+    assert disk.get("k") == "v"
+    time.sleep(0.06)
+    assert disk.get("k") is MISSING
+    assert len(disk) == 0
+
+
+def test_sqlite_cache_rejects_unsafe_table_names(tmp_path):
+    with pytest.raises(ValueError):
+        SQLiteCache(str(tmp_path / "c.sqlite3"), "t; DROP TABLE x")
+
+
+def test_tiered_cache_promotes_disk_hits(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    TieredCache(LRUCache(), SQLiteCache(path, "t")).set("k", "v")
+    cache = TieredCache(LRUCache(), SQLiteCache(path, "t"))
+    assert cache.get("k") == "v"
+    assert cache.memory.get("k") == "v"
+    assert cache.stats()["disk"]["hits"] == 1
+
+
+def test_compute_once_waiter_uses_the_holders_value(tmp_path):
+    first, second = _shared(tmp_path)
+    calls = []
+
+    async def compute(cache, value):
+        calls.append(value)
+        await asyncio.sleep(0.05)
+        await cache.aset("k", value)
+        return value
+
+    async def main():
+        holder = asyncio.ensure_future(compute_once(first, "k", lambda: compute(first, "a"), 5, poll_seconds=0.01))
+        await asyncio.sleep(0.01)
+        waiter = compute_once(second, "k", lambda: compute(second, "b"), 5, poll_seconds=0.01)
+        return await asyncio.gather(holder, waiter)
+
+    assert asyncio.run(main()) == ["a", "a"]
+    assert calls == ["a"]
+
+
+def test_compute_once_refresh_waiter_computes_its_own_value(tmp_path):
+    first, second = _shared(tmp_path)
+    first.set("k", "old")
+
+    async def compute(cache, value, delay=0.0):
+        await asyncio.sleep(delay)
+        await cache.aset("k", value)
+        return value
+
+    async def main():
+        holder = asyncio.ensure_future(
+            compute_once(first, "k", lambda: compute(first, "a", 0.05), 5, poll_seconds=0.01)
+        )
+        await asyncio.sleep(0.01)
+        waiter = compute_once(second, "k", lambda: compute(second, "fresh"), 5, poll_seconds=0.01, refresh=True)
+        return await asyncio.gather(holder, waiter)
+
+    assert asyncio.run(main()) == ["a", "fresh"]
+
+
+def test_compute_once_computes_after_an_expired_lease(tmp_path):
+    first, second = _shared(tmp_path)
+    assert first.disk.acquire_lease("k", 0.05)
+
+    async def compute():
+        return "mine"
+
+    assert asyncio.run(compute_once(second, "k", compute, 0.05, poll_seconds=0.01)) == "mine"
+
+
+def test_busy_database_is_a_miss_not_an_error(tmp_path, monkeypatch):
+    monkeypatch.setattr("cache.BUSY_TIMEOUT_SECONDS", 0.05)
+    path = str(tmp_path / "busy.sqlite3")
+    disk = SQLiteCache(path, "t")
+    disk.set("k", "v")
+    conn = _lock(path)
+    try:
+        disk.set("other", "v")
+        disk.delete("k")
+        disk.clear()
+        assert not disk.acquire_lease("k", 1)
+        disk.release_lease("k")
+        assert disk.stats()["entries"] in (None, 1)
+    finally:
+        conn.rollback()
+    assert disk.get("other") is MISSING
+    assert disk.get("k") == "v"
+
+
+def test_async_methods_read_and_write_both_tiers(tmp_path):
+    cache = TieredCache(LRUCache(), SQLiteCache(str(tmp_path / "c.sqlite3"), "t"))
+
+    async def main():
+        await cache.aset("k", {"a": 1})
+        cache.memory.clear()
+        value = await cache.aget("k")
+        await cache.adelete("k")
+        return value, await cache.aget("k")
+
+    assert asyncio.run(main()) == ({"a": 1}, MISSING)
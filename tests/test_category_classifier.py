@@ -0,0 +1,39 @@
+import time
+
+import pytest
+
+from category_classifier import CONFIDENCE_THRESHOLD, classify
+
+
+@pytest.mark.parametrize("readme", [
+    "# Weather App\nA simple app that uses an API",
+    "# Todo\nA todo list built with React",
+    "# utils\nSome helpers.",
+    "# Plant monitor\nArduino firmware reading soil sensors over I2C and publishing over MQTT via ESP32.",
+])
+def test_ambiguous_readmes_fall_back_to_gemini(readme):
+    assert classify(readme).confidence < CONFIDENCE_THRESHOLD
+
+
+@pytest.mark.parametrize("readme, category", [
+    ("# TokenVault\nAn ERC-20 smart contract vault on Ethereum written in Solidity, tested with Hardhat.", "Blockchain"),
+    ("# Notes\nAn Android app written in Kotlin with Jetpack Compose. Available on the Play Store.", "Mobile Dev"),
+    ("# DocBot\nA RAG chatbot using LangChain, OpenAI GPT-4 and embeddings to answer questions.", "AI"),
+    ("# Sales Dashboard\nPower BI and Tableau dashboard tracking sales KPIs and regional trends.", "Data Analyst"),
+])
+def test_clear_readmes_are_answered_locally(readme, category):
+    result = classify(readme)
+    assert result.category == category
+    assert result.confidence >= CONFIDENCE_THRESHOLD
+
+
+def test_no_vocabulary_match_is_other():
+    result = classify("# Misc\nNothing to see here.")
+    assert (result.category, result.confidence) == ("Other", 0.0)
+
+
+def test_huge_raw_readme_is_bounded():
+    raw = "```python\nprint(1)\n```\n" + "lorem ipsum " * 150_000
+    start = time.perf_counter()
+    classify(raw[:20000], raw_readme=raw)
+    assert time.perf_counter() - start < 0.5
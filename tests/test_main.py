@@ -0,0 +1,154 @@
+import json
+
+import pytest
+
+import main
+
+
+def test_analyze_repos_rejects_empty_and_oversized_batches(client):
+    assert client.post("/api/analyze_repos", json={"repo_urls": []}).status_code == 422
+    urls = [f"https://github.com/o/r{i}" for i in range(main.ANALYZE_MAX_REPOS + 1)]
+    assert client.post("/api/analyze_repos", json={"repo_urls": urls}).status_code == 422
+
+
+PROFILE = {"name": "A", "email": "a@example.com", "education": "BSc", "projects": []}
+
+
+def test_generate_resumes_rejects_empty_and_oversized_job_lists(client):
+    assert client.post("/api/generate_resumes", json={"profile": PROFILE, "job_descriptions": []}).status_code == 422
+    jobs = ["Backend engineer"] * (main.MULTI_JOB_MAX_JOBS + 1)
+    assert client.post("/api/generate_resumes", json={"profile": PROFILE, "job_descriptions": jobs}).status_code == 422
+
+
+
+def test_generate_resumes_streams_one_line_per_job(client, monkeypatch):
+    async def generate(prompt, config, **kwargs):
+        if "Data engineer" in prompt:
+            raise RuntimeError("quota exceeded")
+        return "# Resume"
+
+    monkeypatch.setattr(main.llm_gateway, "generate", generate)
+    response = client.post("/api/generate_resumes", json={
+        "profile": PROFILE, "job_descriptions": ["Backend engineer", "Data engineer"],
+    })
+    assert response.headers["content-type"] == "application/x-ndjson"
+    results = sorted((json.loads(line) for line in response.text.splitlines()), key=lambda r: r["index"])
+    assert results == [
+        {"index": 0, "resume_markdown": "# Resume"},
+        {"index": 1, "error": "Error generating resume: quota exceeded"},
+    ]
+
+
+def test_resume_stream_sends_text_events_then_done(client, monkeypatch):
+    async def stream(prompt, config, **kwargs):
+        for chunk in ("# A\n", "Skills"):
+            yield chunk
+
+    monkeypatch.setattr(main.llm_gateway, "stream", stream)
+    response = client.post("/api/generate_resume/stream", json={**PROFILE, "job_description": "jd"})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.text == (
+        'data: {"text": "# A\\n"}\n\n'
+        'data: {"text": "Skills"}\n\n'
+        "event: done\ndata: {}\n\n"
+    )
+
+
+def test_cover_letter_stream_reports_errors_as_an_event(client, monkeypatch):
+    async def stream(prompt, config, **kwargs):
+        yield "Dear"
+        raise RuntimeError("timed out")
+
+    monkeypatch.setattr(main.llm_gateway, "stream", stream)
+    response = client.post("/api/generate_cover_letter/stream", json={"company_name": "Acme", "job_description": "jd"})
+    assert response.status_code == 200
+    assert response.text == (
+        'data: {"text": "Dear"}\n\n'
+        'event: error\ndata: {"detail": "Error generating cover letter: timed out"}\n\n'
+    )
+
+@pytest.mark.parametrize("answer, category", [
+    ("Web Dev", "Web Dev"),
+    (" web dev ", "Web Dev"),
+    ("ar-vr", "AR/VR"),
+    ("Quantum Computing", "Other"),
+])
+def test_project_summary_category_stays_in_the_vocabulary(answer, category):
+    summary = main.ProjectSummary.model_validate_json(json.dumps({"description": "d", "category": answer}))
+    assert summary.category == category
+    assert summary.category in main.PROJECT_CATEGORIES
+
+
+def test_generate_category_llm_fallback_returns_a_known_category(client, monkeypatch):
+    async def generate(prompt, config, **kwargs):
+        return json.dumps({"description": "d", "category": "Quantum Computing"})
+
+    monkeypatch.setattr(main.llm_gateway, "generate", generate)
+    response = client.post("/api/generate_category", json={"readme_content": "A tool.", "job_description": ""})
+    assert response.status_code == 200
+    assert response.json()["category"] == "Other"
+    assert response.json()["source"] == "llm"
+
+
+def test_cover_letter_does_not_log_contact_details(client, monkeypatch, capsys, caplog):
+    async def generate(prompt, config, **kwargs):
+        return " Dear Acme "
+
+    monkeypatch.setattr(main.llm_gateway, "generate", generate)
+    caplog.set_level("DEBUG")
+    response = client.post("/api/generate_cover_letter", json={
+        "company_name": "Acme", "job_description": "jd", "github_projects": "",
+        "candidate_name": "Jane Secret", "Candidate_email": "jane@secret.example", "Candidate_phone": "555-0100",
+    })
+    assert response.json() == {"cover_letter": "Dear Acme"}
+    logged = capsys.readouterr().out + caplog.text
+    assert "Acme" in caplog.text
+    assert "Jane Secret" not in logged and "jane@secret.example" not in logged and "555-0100" not in logged
+
+
+
+async def fake_fetch_readme(url):
+    if url.endswith("/missing"):
+        return {"error": "README not found"}
+    return {"repo_name": url.rsplit("/", 1)[-1], "content": "# Tool\nA web app."}
+
+
+async def fake_project_summary(prompt, config, **kwargs):
+    return json.dumps({"description": " Built it. ", "category": "Web Dev"})
+
+
+def test_analyze_repos_streams_one_line_per_repository(client, monkeypatch):
+    monkeypatch.setattr(main.readme_fetcher, "fetch_readme", fake_fetch_readme)
+    monkeypatch.setattr(main.llm_gateway, "generate", fake_project_summary)
+    response = client.post("/api/analyze_repos", json={
+        "repo_urls": ["https://github.com/o/app", " ", "https://github.com/o/missing"],
+    })
+    assert response.headers["content-type"] == "application/x-ndjson"
+    results = sorted((json.loads(line) for line in response.text.splitlines()), key=lambda r: r["index"])
+    assert results == [
+        {"index": 0, "url": "https://github.com/o/app", "name": "app", "description": "Built it.", "category": "Web Dev"},
+        {"index": 1, "url": "https://github.com/o/missing", "error": "README not found"},
+    ]
+
+
+def test_analyze_repos_saves_projects_to_the_profile(client, monkeypatch):
+    monkeypatch.setattr(main.readme_fetcher, "fetch_readme", fake_fetch_readme)
+    monkeypatch.setattr(main.llm_gateway, "generate", fake_project_summary)
+    profile_id = client.post("/api/profiles", json={"name": "A"}).json()["id"]
+    client.post("/api/analyze_repos", json={
+        "repo_urls": ["https://github.com/o/app", "https://github.com/o/missing"], "profile_id": profile_id,
+    })
+    projects = client.get(f"/api/profiles/{profile_id}").json()["projects"]
+    assert [(p["name"], p["url"]) for p in projects] == [("app", "https://github.com/o/app")]
+    response = client.post("/api/analyze_repos", json={"repo_urls": ["https://github.com/o/app"], "profile_id": "nope"})
+    assert response.status_code == 404
+
+
+def test_generate_pdf_is_503_when_the_render_queue_is_full(client, monkeypatch):
+    monkeypatch.setattr(main.pdf_renderer, "_pool", object())
+    monkeypatch.setattr(main.pdf_renderer, "QUEUE_LIMIT", 0)
+    response = client.post("/api/generate_pdf", json={"markdown_text": "# Queue limit test"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "5"
+    assert "busy" in response.json()["detail"]
@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+import pytest
+
+import metrics
+
+
+def test_counter_renders_sorted_escaped_labels():
+    counter = metrics.Counter("jobs_total", "Jobs.")
+    counter.inc(kind="b")
+    counter.inc(2.5, kind='a "quoted"\\path\n')
+    assert counter.render() == [
+        "# HELP jobs_total Jobs.",
+        "# TYPE jobs_total counter",
+        'jobs_total{kind="a \\"quoted\\"\\\\path\\n"} 2.5',
+        'jobs_total{kind="b"} 1',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram("latency_seconds", "Latency.", (0.1, 1))
+    for value in (0.05, 0.5, 0.5, 3):
+        histogram.observe(value, path="/x")
+    assert histogram.render()[2:] == [
+        'latency_seconds_bucket{path="/x",le="0.1"} 1',
+        'latency_seconds_bucket{path="/x",le="1"} 3',
+        'latency_seconds_bucket{path="/x",le="+Inf"} 4',
+        'latency_seconds_sum{path="/x"} 4.05',
+        'latency_seconds_count{path="/x"} 4',
+    ]
+
+
+def test_llm_call_records_tokens_and_cost(monkeypatch):
+    monkeypatch.setitem(metrics.PRICES_PER_MTOK, "test-model", (1.0, 0.5, 10.0))
+    usage = SimpleNamespace(
+        prompt_token_count=1000, cached_content_token_count=400, candidates_token_count=100, thoughts_token_count=50,
+    )
+    metrics.record_llm_call("test-model", "ok", 0.3, usage)
+    labels = (("endpoint", "none"), ("model", "test-model"))
+    # 600 uncached + 400 cached input tokens, 150 output tokens including thinking.
+    assert metrics.llm_cost._values[labels] == pytest.approx((600 * 1.0 + 400 * 0.5 + 150 * 10.0) / 1e6)
+    assert metrics.llm_tokens._values[labels + (("type", "thinking"),)] == 50
+    assert metrics.llm_requests._values[labels + (("outcome", "ok"),)] == 1
+
+
+def test_metrics_endpoint_counts_requests_by_route(client):
+    client.get("/api/health")
+    client.get("/no/such/page")
+    response = client.get("/api/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert "# TYPE http_requests_total counter" in body
+    assert 'http_requests_total{method="GET",path="/api/health",status="200"}' in body
+    assert 'http_requests_total{method="GET",path="unmatched",status="404"}' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",path="/api/health",le="+Inf"}' in body
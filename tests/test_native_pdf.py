@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+from native_pdf import Span, parse_blocks, parse_inline, render_markdown
+
+
+def test_bold_italic_code_and_links():
+    spans = parse_inline("**Python** and *Go*, `make`, [site](https://x.com) or _Rust_")
+    assert Span("Python", bold=True) in spans
+    assert Span("Go", italic=True) in spans
+    assert Span("make") in spans
+    assert Span("site", url="https://x.com") in spans
+    assert Span("Rust", italic=True) in spans
+
+
+def test_link_url_with_parentheses():
+    spans = parse_inline("[x](https://en.wikipedia.org/wiki/Go_(language)) end")
+    assert spans[0] == Span("x", url="https://en.wikipedia.org/wiki/Go_(language)")
+    assert spans[1] == Span(" end")
+
+
+def test_underscores_inside_words_are_not_italic():
+    assert parse_inline("snake_case_name") == [Span("snake_case_name")]
+
+
+@pytest.mark.parametrize("heading, title", [
+    ("## C#", "C#"),
+    ("## Skills ##", "Skills"),
+    ("### F# and C# #", "F# and C#"),
+])
+def test_heading_keeps_trailing_hash_in_words(heading, title):
+    assert parse_blocks(heading)[0][:3] == ("heading", 2 if heading.startswith("## ") else 3, title)
+
+
+@pytest.mark.parametrize("text", [
+    "_a " * 20000,
+    "*a " * 20000,
+    "[a](" + "(" * 20000,
+], ids=["underscore", "asterisk", "link"])
+def test_unclosed_markers_take_linear_time(text):
+    start = time.perf_counter()
+    parse_inline(text)
+    assert time.perf_counter() - start < 1.0
+
+
+def test_renders_a_pdf():
+    assert render_markdown("# Jane\n\n## Skills\n- **C#**, _Go_\n").startswith(b"%PDF")
@@ -0,0 +1,69 @@
+import pytest
+
+from profile_store import ProfileNotFoundError, ProfileStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ProfileStore(str(tmp_path / "profiles.db"))
+
+
+def test_create_get_and_update(store):
+    profile = store.create({"name": "A", "skills": "Go"})
+    assert store.get(profile["id"]) == profile
+    updated = store.update(profile["id"], {"skills": "Rust", "education": "BSc"})
+    assert updated == {"id": profile["id"], "name": "A", "skills": "Rust", "education": "BSc"}
+    assert store.get(profile["id"]) == updated
+
+
+def test_profiles_survive_reopening(store):
+    profile = store.create({"name": "A"})
+    assert ProfileStore(store.path).get(profile["id"]) == profile
+
+
+def test_merge_projects_replaces_analyses_of_the_same_repository(store):
+    profile_id = store.create({"projects": [
+        {"name": "a", "url": "https://github.com/o/a", "description": "old"},
+        {"name": "manual", "url": None, "description": "kept"},
+    ]})["id"]
+    merged = store.merge_projects(profile_id, [
+        {"name": "a", "url": "https://github.com/o/a", "description": "new"},
+        {"name": "b", "url": "https://github.com/o/b", "description": "b"},
+    ])
+    assert [(p["name"], p["description"]) for p in merged["projects"]] == [
+        ("manual", "kept"), ("a", "new"), ("b", "b"),
+    ]
+
+
+def test_remove_projects(store):
+    profile_id = store.create({"name": "A"})["id"]
+    store.merge_projects(profile_id, [{"name": "a", "url": "u1"}, {"name": "b", "url": "u2"}])
+    assert store.remove_projects(profile_id, ["u1", "missing"])["projects"] == [{"name": "b", "url": "u2"}]
+
+
+def test_delete_and_unknown_ids(store):
+    profile_id = store.create({"name": "A"})["id"]
+    store.delete(profile_id)
+    assert len(store) == 0
+    for call in (
+        lambda: store.get(profile_id),
+        lambda: store.update(profile_id, {"name": "B"}),
+        lambda: store.merge_projects(profile_id, []),
+        lambda: store.remove_projects(profile_id, []),
+        lambda: store.delete(profile_id),
+    ):
+        with pytest.raises(ProfileNotFoundError):
+            call()
+
+
+def test_profile_endpoints(client):
+    created = client.post("/api/profiles", json={"name": "A", "email": "a@example.com"})
+    assert created.status_code == 201
+    profile_id = created.json()["id"]
+    assert client.patch(f"/api/profiles/{profile_id}", json={"education": "BSc"}).json()["name"] == "A"
+    # job_description is still missing, so no resume can be generated from the profile yet.
+    response = client.post(f"/api/profiles/{profile_id}/generate_resume", json={})
+    assert response.status_code == 400
+    assert "job_description" in response.json()["detail"]
+    assert client.delete(f"/api/profiles/{profile_id}").status_code == 204
+    assert client.get(f"/api/profiles/{profile_id}").status_code == 404
@@ -0,0 +1,70 @@
+import random
+import time
+
+import pytest
+
+from prompt_budget import PromptPart, allocate, count_tokens, render, truncate
+
+
+def test_count_tokens():
+    assert count_tokens("") == 0
+    assert count_tokens("hello world") == 4
+    assert count_tokens("a, b.") == 4
+    assert count_tokens("履歴書") == 3
+    assert count_tokens("word " * 1000, limit=10) == 11
+
+
+def test_text_within_budget_is_unchanged():
+    text = "# Title\n\nShort text."
+    assert truncate(text, 100) is text
+
+
+def test_cuts_at_the_coarsest_boundary():
+    text = "## Skills\nPython and Go.\n\n## Projects\nA very long project description. " * 3
+    result = truncate(text, 12)
+    assert result == "## Skills\nPython and Go."
+
+
+def test_first_word_longer_than_budget_keeps_a_prefix():
+    result = truncate("x" * 400 + " tail", 10)
+    assert result == "x" * 40
+    assert truncate("履" * 50, 5) == "履" * 5
+
+
+@pytest.mark.parametrize("budget", [0, 1, 3, 17, 64, 250])
+def test_truncate_never_exceeds_budget(budget):
+    rng = random.Random(budget)
+    words = ["resume", "Kubernetes", "C++", "履歴書", "a", "x" * 90, "end.", "\n", "\n\n", "## Head\n"]
+    text = " ".join(rng.choice(words) for _ in range(2000))
+    result = truncate(text, budget)
+    assert count_tokens(result) <= budget
+    assert text.startswith(result)
+    if budget >= 3:
+        assert result
+
+
+@pytest.mark.parametrize("text", ["x" * 1_000_000, "履" * 1_000_000, "word " * 200_000], ids=["word", "cjk", "words"])
+def test_huge_fields_are_cut_quickly(text):
+    start = time.perf_counter()
+    result = truncate(text, 2000)
+    assert time.perf_counter() - start < 0.2
+    assert 0 < count_tokens(result) <= 2000
+
+
+def test_allocate_respects_priority_minimum_and_copies():
+    parts = [
+        PromptPart("job", "j " * 500, priority=1, min_tokens=50),
+        PromptPart("profile", "p " * 500, priority=0),
+    ]
+    granted = allocate(parts, 300, copies={"profile": 2})
+    assert granted == {"job": 50, "profile": 125}
+    assert granted["job"] + 2 * granted["profile"] <= 300
+
+
+def test_render_stays_within_budget():
+    prompt = render(
+        "Profile:\n{profile}\n\nJob:\n{job}\n\nAgain: {profile}",
+        200,
+        [PromptPart("profile", "Senior engineer. " * 200), PromptPart("job", "Build APIs. " * 200, priority=1)],
+    )
+    assert count_tokens(prompt) <= 200
@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+from readme_preprocess import MAX_CODE_BLOCK_LINES, preprocess
+
+
+def test_strips_badges_images_html_and_boilerplate_sections():
+    readme = (
+        "# Tool\n\n"
+        "[![Build](https://img.shields.io/badge/build-passing-green.svg)](https://ci.example.com)\n"
+        "![screenshot](docs/screen.png)\n"
+        '<p align="center"><img src="logo.png"></p>\n\n'
+        "Tool tracks objects in video.\n\n"
+        "## Table of Contents\n- [Features](#features)\n\n"
+        "## Features\n- Kalman filter tracking\n\n"
+        "## License\nMIT\n### Third party\nApache\n"
+    )
+    result = preprocess(readme)
+    assert "shields.io" not in result
+    assert "screen.png" not in result
+    assert "<img" not in result and "<p" not in result
+    assert "Table of Contents" not in result
+    assert "MIT" not in result and "Apache" not in result
+    assert "Tool tracks objects in video." in result
+    assert "Kalman filter tracking" in result
+
+
+def test_keeps_text_in_angle_brackets_that_is_not_html():
+    result = preprocess("# T\n\nReturns a List<String> from <https://example.com/api>, <b>fast</b>.\n")
+    assert "List<String>" in result
+    assert "<https://example.com/api>" in result
+    assert "<b>" not in result and "fast" in result
+
+
+def test_long_code_blocks_are_shortened_not_dropped():
+    code = "\n".join(f"step_{i}()" for i in range(20))
+    result = preprocess(f"# T\n\nIntro.\n\n## Usage\n```python\n{code}\n```\n")
+    assert "## Usage" in result
+    assert f"step_{MAX_CODE_BLOCK_LINES - 1}()" in result
+    assert f"step_{MAX_CODE_BLOCK_LINES}()" not in result
+    assert result.rstrip().endswith("```")
+
+
+def test_heading_ending_in_hash_is_kept_whole():
+    result = preprocess("# T\n\nIntro.\n\n## C#\nBindings for .NET.\n")
+    assert "## C#" in result
+
+
+def test_ranks_informative_sections_first():
+    readme = (
+        "# T\n\nIntro.\n\n"
+        "## Installation\nRun the installer.\n\n"
+        "## Features\nReal-time tracking, ONNX export, TensorRT inference and a REST API.\n"
+    )
+    result = preprocess(readme)
+    assert result.index("## Features") < result.index("## Installation")
+
+
+@pytest.mark.parametrize("hostile", [
+    "<a" * 50000,
+    "![" * 25000,
+    "[![" * 17000,
+    "[](" * 30000,
+    "<!--" * 30000,
+    "<div " * 30000,
+    "# " * 30000 + "x",
+])
+def test_pathological_input_is_linear(hostile):
+    start = time.perf_counter()
+    preprocess(hostile)
+    assert time.perf_counter() - start < 1.0
+
+
+def test_input_is_capped():
+    start = time.perf_counter()
+    preprocess("word " * 2_000_000)
+    assert time.perf_counter() - start < 2.0
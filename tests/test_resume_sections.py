@@ -0,0 +1,47 @@
+from resume_sections import replace_sections, split_sections, strip_heading
+
+RESUME = (
+    "Jane Doe\n\n"
+    "## Contact Information\n"
+    "jane@example.com\n\n\n"
+    "# **OBJECTIVE** #\n"
+    "Build things.\n"
+    "# WORK EXPERIENCE\n"
+    "### Engineer, Acme\n"
+    "- Shipped it\n"
+    "```\n# TECHNICAL SKILLS\n```\n\n"
+    "# TECHNICAL SKILLS\n"
+    "Python, Go\n"
+)
+
+
+def test_split_sections():
+    preamble, sections = split_sections(RESUME)
+    assert preamble == "Jane Doe"
+    assert [title for title, _ in sections] == [
+        "CONTACT INFORMATION", "OBJECTIVE", "WORK EXPERIENCE", "TECHNICAL SKILLS",
+    ]
+    assert "### Engineer, Acme" in dict(sections)["WORK EXPERIENCE"]
+
+
+def test_round_trip_without_replacements_is_unchanged():
+    assert replace_sections(RESUME, {}) == RESUME
+    assert replace_sections(RESUME.rstrip("\n"), {}) == RESUME.rstrip("\n")
+
+
+def test_replacement_keeps_headings_and_spacing():
+    result = replace_sections(RESUME, {"OBJECTIVE": "Ship things.", "TECHNICAL SKILLS": "Rust"})
+    assert result == RESUME.replace("Build things.", "Ship things.").replace("Python, Go", "Rust")
+
+
+def test_missing_section_is_added_in_its_usual_position():
+    result = replace_sections(RESUME, {"EDUCATION": "BSc, MIT"})
+    assert "Build things.\n\n# EDUCATION\nBSc, MIT\n\n# WORK EXPERIENCE\n" in result
+    assert result.endswith(RESUME[RESUME.index("# WORK EXPERIENCE"):])
+
+    appended = replace_sections("# OBJECTIVE\nBuild things.", {"TECHNICAL SKILLS": "Go"})
+    assert appended == "# OBJECTIVE\nBuild things.\n\n# TECHNICAL SKILLS\nGo\n"
+
+
+def test_strip_heading_drops_repeated_heading_and_fences():
+    assert strip_heading("OBJECTIVE", "```markdown\n# Objective\nBuild things.\n```") == "Build things."
@@ -0,0 +1,67 @@
+import asyncio
+
+from singleflight import SingleFlight
+
+
+def _upstream(calls, chunks=("a", "b", "c"), fail=False):
+    async def produce():
+        calls.append(1)
+        for chunk in chunks:
+            await asyncio.sleep(0.01)
+            yield chunk
+        if fail:
+            raise RuntimeError("upstream failed")
+    return produce
+
+
+async def _read(flight, key, fn, delay=0.0):
+    await asyncio.sleep(delay)
+    return [chunk async for chunk in flight.stream(key, fn)]
+
+
+def test_concurrent_streams_share_one_upstream_and_replay_missed_chunks():
+    async def main():
+        flight, calls = SingleFlight(), []
+        fn = _upstream(calls)
+        return calls, flight, await asyncio.gather(
+            _read(flight, "k", fn), _read(flight, "k", fn, delay=0.015), _read(flight, "other", fn),
+        )
+
+    calls, flight, results = asyncio.run(main())
+    assert results == [["a", "b", "c"]] * 3
+    assert len(calls) == 2
+    assert flight.stats() == {"in_flight": 0, "calls": 2, "shared": 1}
+
+
+def test_stream_error_reaches_every_reader():
+    async def main():
+        flight, calls = SingleFlight(), []
+        fn = _upstream(calls, fail=True)
+        return await asyncio.gather(_read(flight, "k", fn), _read(flight, "k", fn), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_upstream_is_cancelled_when_the_last_reader_leaves():
+    closed = []
+
+    async def produce():
+        try:
+            while True:
+                await asyncio.sleep(0.01)
+                yield "x"
+        finally:
+            closed.append(1)
+
+    async def main():
+        flight = SingleFlight()
+        reader = flight.stream("k", produce)
+        assert await reader.__anext__() == "x"
+        await reader.aclose()
+        await asyncio.sleep(0.02)
+        return flight
+
+    flight = asyncio.run(main())
+    assert closed == [1]
+    assert flight.stats()["in_flight"] == 0
@@ -0,0 +1,224 @@
+# timing.py
+"""Per-request latency breakdown.
+
+Code on the hot path wraps each stage in ``span("name")``. The spans of the
+request being served are collected through a context variable, so helpers
+deep in the call stack (and tasks they start) need no extra arguments.
+``TimingMiddleware`` turns them into a ``Server-Timing`` response header and
+keeps the last ``PROFILE_WINDOW_SIZE`` requests in memory for
+``/api/debug/profile``.
+
+For a streamed response the header can only carry the spans finished before
+the first byte is sent; the rolling window always has the complete set.
+
+The ``/api/debug/profile`` endpoints are only served with
+``DEBUG_ENDPOINTS_ENABLED=1``. With ``PROFILING_ENABLED=1`` as well, sending
+``X-Profile: 1`` with a request also runs a profiler around it (pyinstrument
+when installed, else cProfile) and returns an ``X-Profile-Id`` whose report is
+served by ``/api/debug/profile/{id}``. Only one request is profiled at a time:
+cProfile hooks the whole thread, so concurrent requests on the event loop show
+up in the report too, and a second profiler would replace the first's hook.
+While a profile is running, further ``X-Profile`` requests are served unprofiled.
+"""
+import io
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+WINDOW_SIZE = int(os.getenv("PROFILE_WINDOW_SIZE", "500"))
+DEBUG_ENDPOINTS_ENABLED = os.getenv("DEBUG_ENDPOINTS_ENABLED", "0").lower() in ("1", "true", "yes")
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0").lower() in ("1", "true", "yes")
+# Profiler reports kept for retrieval.
+MAX_PROFILES = 20
+
+_spans: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("timing_spans", default=None)
+
+# Completed requests, newest last.
+window: Deque[dict] = deque(maxlen=WINDOW_SIZE)
+profiles: "OrderedDict[str, str]" = OrderedDict()
+# Held while a request is being profiled.
+_profiling = threading.Lock()
+
+
+def record(name: str, duration_ms: float) -> None:
+    """Add a finished span to the current request, if there is one."""
+    spans = _spans.get()
+    if spans is not None:
+        spans.append((name, duration_ms))
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the enclosed block as stage ``name`` of the current request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, (time.perf_counter() - start) * 1000)
+
+
+@contextmanager
+def collect() -> Iterator[List[Tuple[str, float]]]:
+    """Collect the spans recorded inside the block into a fresh list (e.g. in a worker process)."""
+    spans: List[Tuple[str, float]] = []
+    token = _spans.set(spans)
+    try:
+        yield spans
+    finally:
+        _spans.reset(token)
+
+
+def server_timing_header(spans: List[Tuple[str, float]], total_ms: float) -> str:
+    # Repeated stages (e.g. several LLM calls) are summed into one entry.
+    totals: Dict[str, float] = defaultdict(float)
+    for name, duration in spans:
+        totals[name] += duration
+    entries = [f"{name};dur={duration:.1f}" for name, duration in totals.items()]
+    entries.append(f"app;dur={total_ms:.1f}")
+    return ", ".join(entries)
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def _distribution(values: List[float]) -> dict:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values), 2) if values else 0.0,
+        "p50_ms": round(_percentile(values, 50), 2),
+        "p95_ms": round(_percentile(values, 95), 2),
+        "max_ms": round(values[-1], 2) if values else 0.0,
+    }
+
+
+def summary(path: Optional[str] = None, recent: int = 20) -> dict:
+    """Aggregate the rolling window per endpoint and stage, plus the most recent requests."""
+    requests = [r for r in window if path is None or r["path"] == path]
+    by_path: Dict[str, dict] = defaultdict(lambda: {"total": [], "spans": defaultdict(list), "errors": 0})
+    for request in requests:
+        entry = by_path[f"{request['method']} {request['path']}"]
+        entry["total"].append(request["total_ms"])
+        if request["status"] >= 500:
+            entry["errors"] += 1
+        for name, duration in request["spans"].items():
+            entry["spans"][name].append(duration)
+    return {
+        "window_size": WINDOW_SIZE,
+        "requests": len(requests),
+        "endpoints": {
+            name: {
+                "total": _distribution(entry["total"]),
+                "errors": entry["errors"],
+                "spans": {span_name: _distribution(values) for span_name, values in entry["spans"].items()},
+            }
+            for name, entry in sorted(by_path.items())
+        },
+        "recent": requests[-recent:] if recent else [],
+        "profiling_enabled": PROFILING_ENABLED,
+        "profiles": list(profiles),
+    }
+
+
+class _Profiler:
+    """pyinstrument's sampling profiler when available, else cProfile."""
+
+    def __init__(self):
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            import cProfile
+
+            self.kind = "cprofile"
+            self._profiler = cProfile.Profile()
+        else:
+            self.kind = "pyinstrument"
+            self._profiler = Profiler(async_mode="enabled")
+
+    def start(self) -> None:
+        if self.kind == "pyinstrument":
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self) -> str:
+        if self.kind == "pyinstrument":
+            self._profiler.stop()
+            return self._profiler.output_text(unicode=False, color=False)
+        import pstats
+
+        self._profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(40)
+        return out.getvalue()
+
+
+class TimingMiddleware:
+    """ASGI middleware adding ``Server-Timing`` headers and feeding the rolling window."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        spans: List[Tuple[str, float]] = []
+        token = _spans.set(spans)
+        status = 500
+        profiler = None
+        headers = dict(scope.get("headers") or [])
+        if PROFILING_ENABLED and headers.get(b"x-profile") == b"1" and _profiling.acquire(blocking=False):
+            try:
+                profiler = _Profiler()
+                profiler.start()
+            except BaseException:
+                _profiling.release()
+                raise
+        profile_id = uuid.uuid4().hex[:12] if profiler else None
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed = (time.perf_counter() - start) * 1000
+                extra = [(b"server-timing", server_timing_header(spans, elapsed).encode("latin-1"))]
+                if profile_id:
+                    extra.append((b"x-profile-id", profile_id.encode("ascii")))
+                message = {**message, "headers": list(message.get("headers", [])) + extra}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _spans.reset(token)
+            if profiler is not None:
+                try:
+                    profiles[profile_id] = profiler.stop()
+                finally:
+                    _profiling.release()
+                while len(profiles) > MAX_PROFILES:
+                    profiles.popitem(last=False)
+            route = scope.get("route")
+            totals: Dict[str, float] = defaultdict(float)
+            for name, duration in spans:
+                totals[name] += duration
+            window.append({
+                "method": scope["method"],
+                "path": getattr(route, "path", scope["path"]),
+                "status": status,
+                "total_ms": round((time.perf_counter() - start) * 1000, 2),
+                "spans": {name: round(duration, 2) for name, duration in totals.items()},
+                "at": time.time(),
+            })